@@ -1,8 +1,14 @@
 import bpy
 from enum import Enum
+from anima.primitives.deferred import flush_pending_updates
 from anima.primitives.points import Empty
 
 
+@bpy.app.handlers.persistent
+def _flush_handler(*args):
+    flush_pending_updates()
+
+
 class Updater:
     _pre_frame_set = False
     _post_frame_set = False
@@ -28,10 +34,22 @@ class Updater:
             raise Exception('Unrecognised updater type.')
 
         self.handlers.clear()
+        Updater.register_flush_handlers()
+
+    @staticmethod
+    def register_flush_handlers():
+        """Registers flush_pending_updates() to run before rendering and saving, so that pending geometry
+        updates are applied to Blender. This is idempotent."""
+        for handlers in (bpy.app.handlers.render_init, bpy.app.handlers.save_pre):
+            if _flush_handler not in handlers:
+                handlers.append(_flush_handler)
 
     def add_function(self, function):
-        """Adds a function as a handler.
+        """Adds a function as a handler. Pending geometry updates are flushed after all added functions.
 
         Args:
             function (callable): The function to be added as a handler."""
+        if flush_pending_updates in self.handlers:
+            self.handlers.remove(flush_pending_updates)
         self.handlers.append(function)
+        self.handlers.append(flush_pending_updates)
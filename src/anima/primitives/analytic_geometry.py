@@ -0,0 +1,368 @@
+import math
+import numpy as np
+from abc import ABC, abstractmethod
+from scipy.special import ellipeinc
+from .bezier_utils import as_param_array, bezier_points, bezier_tangents, normalise_rows, planar_normals
+from .curve_geometry import CurveGeometry
+
+MAX_ARC_SEGMENT_ANGLE = math.pi / 4  # Per Bezier curve approximating an arc, which keeps the radial error < 5e-6
+SHAPE_TOL = 1.0e-6  # Relative to the largest coordinate, when checking that the control points match the shape
+ARC_NEWTON_ITERATIONS = 4  # When inverting the mapping from Bezier params to angles
+ELLIPSE_KNOTS = 8  # Per Bezier curve, of the interpolated initial guesses when inverting the arc length of an ellipse
+ELLIPSE_NEWTON_TOL = 1.0e-12  # On the angle, when inverting the arc length of an ellipse
+MAX_ELLIPSE_NEWTON_ITERATIONS = 20
+
+
+class AnalyticGeometry(CurveGeometry, ABC):
+    """The geometry of a shape whose arc length has a closed form, represented in Blender by a Bezier spline (see
+    the subclasses). Queries by length fraction (points, tangents, curvatures, frames, and the spline params of
+    the bevel factors) are computed in closed form, so the arc length lookup table is not built.
+
+    The closed forms only apply while the control points describe the shape. Once the spline points are edited
+    otherwise, all queries fall back onto the generic Bezier implementation.
+    """
+
+    def __init__(self, co, handle_left, handle_right, **kwargs):
+        self.is_analytic = False  # Whether the control points describe the shape, i.e. the closed forms apply
+        super().__init__(co, handle_left, handle_right, **kwargs)
+
+    @property
+    def arc_table(self):
+        """The arc length lookup table of the Bezier spline, which is only built if it is needed."""
+        CurveGeometry.update(self)
+        return self._arc_table
+
+    @property
+    def length(self) -> float:
+        return self._shape_length() if self.is_analytic else super().length
+
+    def mark_stale(self, bzr_indices: list[int] = None):
+        super().mark_stale(bzr_indices)
+        self.is_analytic = self._matches_shape()
+
+    def update(self):
+        return self if self.is_analytic else super().update()
+
+    def spline_param(self, param: float, is_len_fraction: bool = True) -> float:
+        if not (self.is_analytic and is_len_fraction):
+            return super().spline_param(param, is_len_fraction)
+        assert 0.0 <= param <= 1.0, f'Parameter must be in range [0, 1]. Got: {param:.3f}'
+        return float(self._shape_spline_params(np.array([float(param)]))[0])
+
+    def spline_params(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        if not (self.is_analytic and is_len_fraction):
+            return super().spline_params(params, is_len_fraction)
+        return self._shape_spline_params(as_param_array(params))
+
+    def len_fractions(self, spl_params) -> np.ndarray:
+        if not self.is_analytic:
+            return super().len_fractions(spl_params)
+        return np.clip(self._shape_len_fractions(as_param_array(spl_params)), 0.0, 1.0)
+
+    def points(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        if not (self.is_analytic and is_len_fraction):
+            return super().points(params, is_len_fraction)
+        return self._shape_points(as_param_array(params))
+
+    def tangents(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        if not (self.is_analytic and is_len_fraction):
+            return super().tangents(params, normalise, is_len_fraction)
+        tangs = self._shape_tangents(as_param_array(params))
+        return normalise_rows(tangs) if normalise else tangs
+
+    def frames(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if not (self.is_analytic and is_len_fraction and self.planar):
+            return super().frames(params, is_len_fraction)
+        params = as_param_array(params)
+        tangs = normalise_rows(self._shape_tangents(params))
+        return self._shape_points(params), tangs, planar_normals(tangs)
+
+    def curvatures(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        if not (self.is_analytic and is_len_fraction):
+            return super().curvatures(params, is_len_fraction)
+        return self._shape_curvatures(as_param_array(params))
+
+    def length_at(self, spl_param: float = 1.0) -> float:
+        if not self.is_analytic:
+            return super().length_at(spl_param)
+        return float(self.len_fractions([spl_param])[0]) * self._shape_length()
+
+    def u_from_s(self, lengths) -> np.ndarray:
+        if not self.is_analytic:
+            return super().u_from_s(lengths)
+        lengths = np.atleast_1d(np.asarray(lengths, dtype=float))
+        length = self._shape_length()
+        assert np.all((0.0 <= lengths) & (lengths <= length)), 'The lengths are out of bounds.'
+        return self._shape_spline_params(lengths / length if length > 0 else np.zeros_like(lengths))
+
+    # Closed forms, to be implemented by the subclasses ---------------------------------------------------- #
+
+    @abstractmethod
+    def _matches_shape(self) -> bool:
+        """Whether the control points describe the shape."""
+        pass
+
+    @abstractmethod
+    def _shape_length(self) -> float:
+        """The arc length of the shape."""
+        pass
+
+    @abstractmethod
+    def _shape_spline_params(self, fractions: np.ndarray) -> np.ndarray:
+        """Computes the spline params u associated to an array of length fractions (the inverse arc length)."""
+        pass
+
+    @abstractmethod
+    def _shape_len_fractions(self, spl_params: np.ndarray) -> np.ndarray:
+        """Computes the length fractions associated to an array of spline params u."""
+        pass
+
+    @abstractmethod
+    def _shape_points(self, fractions: np.ndarray) -> np.ndarray:
+        """Computes the points at an array of length fractions."""
+        pass
+
+    @abstractmethod
+    def _shape_tangents(self, fractions: np.ndarray) -> np.ndarray:
+        """Computes the tangents at an array of length fractions, as derivatives w.r.t. the Bezier params (as for
+        Bezier splines)."""
+        pass
+
+    @abstractmethod
+    def _shape_curvatures(self, fractions: np.ndarray) -> np.ndarray:
+        """Computes the curvatures at an array of length fractions."""
+        pass
+
+
+class PolylineGeometry(AnalyticGeometry):
+    """The geometry of a polyline, i.e. of straight Bezier curves whose handles lie at a third and two thirds of
+    the way between their points (see polyline_spline_points()). The Bezier params are then the length fractions
+    of the segments, and the arc length is piecewise linear in the spline param."""
+
+    def mark_stale(self, bzr_indices: list[int] = None):
+        self._seg_lengths = np.linalg.norm(np.diff(self.co, axis=0), axis=1)
+        self._cumu_lengths = np.concatenate(([0.0], np.cumsum(self._seg_lengths)))
+        super().mark_stale(bzr_indices)
+
+    def _matches_shape(self) -> bool:
+        p_0, h_0, h_1, p_1 = (self.ctrl_pts[:, i] for i in range(4))
+        vects = (p_1 - p_0) / 3
+        tol = SHAPE_TOL * (1.0 + np.abs(self.ctrl_pts).max())
+        return bool(np.allclose(h_0, p_0 + vects, rtol=0.0, atol=tol) and
+                    np.allclose(h_1, p_1 - vects, rtol=0.0, atol=tol))
+
+    def _shape_length(self) -> float:
+        return float(self._cumu_lengths[-1])
+
+    def _shape_spline_params(self, fractions: np.ndarray) -> np.ndarray:
+        seg_indices, seg_params = self._segment_infos(fractions)
+        return (seg_indices + seg_params) / self.num_curves
+
+    def _shape_len_fractions(self, spl_params: np.ndarray) -> np.ndarray:
+        length = self._shape_length()
+        if length == 0:
+            return np.zeros_like(spl_params)
+        num_segs = self.num_curves
+        val = spl_params * num_segs
+        seg_indices = np.minimum(np.floor(val).astype(int), num_segs - 1)
+        lengths = self._cumu_lengths[seg_indices] + (val - seg_indices) * self._seg_lengths[seg_indices]
+        return lengths / length
+
+    def _shape_points(self, fractions: np.ndarray) -> np.ndarray:
+        seg_indices, seg_params = self._segment_infos(fractions)
+        p_0 = self.co[seg_indices]
+        return p_0 + seg_params[:, None] * (self.co[seg_indices + 1] - p_0)
+
+    def _shape_tangents(self, fractions: np.ndarray) -> np.ndarray:
+        seg_indices, _ = self._segment_infos(fractions)
+        return self.co[seg_indices + 1] - self.co[seg_indices]
+
+    def _shape_curvatures(self, fractions: np.ndarray) -> np.ndarray:
+        return np.zeros(len(fractions))
+
+    def _segment_infos(self, fractions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Locates the segments at the given length fractions. Returns the segment indices and the params along
+        the segments. Degenerate segments are skipped, unless they end the polyline."""
+        cumu_lengths, seg_lengths = self._cumu_lengths, self._seg_lengths
+        lengths = fractions * cumu_lengths[-1]
+        seg_indices = np.clip(np.searchsorted(cumu_lengths, lengths, side='right') - 1, 0, len(seg_lengths) - 1)
+        seg_params = np.divide(lengths - cumu_lengths[seg_indices], seg_lengths[seg_indices],
+                               out=fractions.copy(), where=seg_lengths[seg_indices] > 0)
+        return seg_indices, np.clip(seg_params, 0.0, 1.0)
+
+
+class EllipticalArcGeometry(AnalyticGeometry):
+    """The geometry of an arc of an axis-aligned ellipse, parallel to the xy-plane, i.e. the points
+    centre + (radius_x cos(a), radius_y sin(a), 0) for angles a from angle_0 to angle_1. It is approximated by Bezier
+    curves spanning equal angles of at most MAX_ARC_SEGMENT_ANGLE (see elliptical_arc_points()).
+
+    The arc length is an incomplete elliptic integral of the second kind (linear in the angle for circles), which
+    is inverted with Newton's method. The Bezier params are mapped to angles through the unit circle, of which
+    the ellipse is an affine image.
+    """
+
+    def __init__(self, co, handle_left, handle_right, centre, radius_x: float, radius_y: float, angle_0: float,
+                 angle_1: float, **kwargs):
+        """Initialise the geometry from the spline points and the ellipse they approximate.
+        Args:
+            co: An (n_points, 3) array of spline point locations, see elliptical_arc_points().
+            handle_left: An (n_points, 3) array of left handle locations.
+            handle_right: An (n_points, 3) array of right handle locations.
+            centre: The centre of the ellipse.
+            radius_x: The radius along the x-axis.
+            radius_y: The radius along the y-axis.
+            angle_0: The (parametric) angle at the start of the arc, in radians.
+            angle_1: The angle at the end of the arc, which may be smaller than angle_0 (clockwise arcs).
+            kwargs: Additional keyword arguments for CurveGeometry.
+        """
+        self.centre = np.array(tuple(centre) + (0.0,) * (3 - len(centre)), dtype=float)
+        self.radius_x, self.radius_y = float(radius_x), float(radius_y)
+        self.angle_0, self.angle_1 = float(angle_0), float(angle_1)
+        self._shape_ctrl_pts = elliptical_arc_control_points(self.centre, self.radius_x, self.radius_y,
+                                                             self.angle_0, self.angle_1)
+        num_bzr = len(self._shape_ctrl_pts)
+        self._sweep = (self.angle_1 - self.angle_0) / num_bzr  # Angle spanned by each Bezier curve
+        self._unit_ctrl_pts = _unit_arc_control_points(self._sweep)
+
+        # Elliptic integral parameters: the arc length from angle 0 is sign * major * E(angle - phase | m).
+        major, minor = max(self.radius_x, self.radius_y), min(self.radius_x, self.radius_y)
+        self._major = major
+        self._ellip_m = 1.0 - (minor / major)**2
+        self._phase = 0.5 * math.pi if self.radius_x >= self.radius_y else 0.0
+        self._sign = math.copysign(1.0, self.angle_1 - self.angle_0)
+        self._knot_angles = np.linspace(self.angle_0, self.angle_1, ELLIPSE_KNOTS * num_bzr + 1)
+        self._knot_lengths = self._arc_lengths(self._knot_angles)
+        self._arc_length = float(self._knot_lengths[-1])
+
+        super().__init__(co, handle_left, handle_right, **kwargs)
+
+    def _matches_shape(self) -> bool:
+        if self.ctrl_pts.shape != self._shape_ctrl_pts.shape:
+            return False
+        tol = SHAPE_TOL * (1.0 + np.abs(self._shape_ctrl_pts).max())
+        return bool(np.allclose(self.ctrl_pts, self._shape_ctrl_pts, rtol=0.0, atol=tol))
+
+    def _shape_length(self) -> float:
+        return self._arc_length
+
+    def _shape_spline_params(self, fractions: np.ndarray) -> np.ndarray:
+        angles = self._angles_from_lengths(fractions * self._arc_length)
+        num_bzr = self.num_curves
+        bzr_indices = np.clip(np.floor((angles - self.angle_0) / self._sweep), 0, num_bzr - 1)
+        local_angles = angles - self.angle_0 - (bzr_indices + 0.5) * self._sweep
+
+        # Newton's method on the angles of the unit Bezier curve, starting from the linear approximation.
+        half_sweep = 0.5 * self._sweep
+        t = 0.5 + 0.5 * local_angles / half_sweep
+        for _ in range(ARC_NEWTON_ITERATIONS):
+            ctrl_pts = np.broadcast_to(self._unit_ctrl_pts, (len(t), 4, 3))
+            pts, tangs = bezier_points(ctrl_pts, t), bezier_tangents(ctrl_pts, t)
+            rates = (pts[:, 0] * tangs[:, 1] - pts[:, 1] * tangs[:, 0]) / np.einsum('ij,ij->i', pts, pts)
+            t = np.clip(t - (np.arctan2(pts[:, 1], pts[:, 0]) - local_angles) / rates, 0.0, 1.0)
+        return (bzr_indices + t) / num_bzr
+
+    def _shape_len_fractions(self, spl_params: np.ndarray) -> np.ndarray:
+        num_bzr = self.num_curves
+        val = spl_params * num_bzr
+        bzr_indices = np.minimum(np.floor(val), num_bzr - 1)
+        pts = bezier_points(np.broadcast_to(self._unit_ctrl_pts, (len(val), 4, 3)), val - bzr_indices)
+        angles = self.angle_0 + (bzr_indices + 0.5) * self._sweep + np.arctan2(pts[:, 1], pts[:, 0])
+        return self._arc_lengths(angles) / self._arc_length
+
+    def _shape_points(self, fractions: np.ndarray) -> np.ndarray:
+        angles = self._angles_from_lengths(fractions * self._arc_length)
+        offsets = np.stack((self.radius_x * np.cos(angles), self.radius_y * np.sin(angles), np.zeros_like(angles)),
+                           axis=1)
+        return self.centre + offsets
+
+    def _shape_tangents(self, fractions: np.ndarray) -> np.ndarray:
+        angles = self._angles_from_lengths(fractions * self._arc_length)
+        return self._sweep * np.stack((-self.radius_x * np.sin(angles), self.radius_y * np.cos(angles),
+                                       np.zeros_like(angles)), axis=1)
+
+    def _shape_curvatures(self, fractions: np.ndarray) -> np.ndarray:
+        angles = self._angles_from_lengths(fractions * self._arc_length)
+        return self.radius_x * self.radius_y / self._speeds(angles)**3
+
+    def _speeds(self, angles: np.ndarray) -> np.ndarray:
+        """The derivatives of the arc length w.r.t. the angles (unsigned)."""
+        return np.hypot(self.radius_x * np.sin(angles), self.radius_y * np.cos(angles))
+
+    def _arc_lengths(self, angles: np.ndarray) -> np.ndarray:
+        """The arc lengths from angle_0 to the given angles along the arc."""
+        if self._ellip_m == 0.0:
+            return self._sign * self._major * (angles - self.angle_0)
+        e_0 = ellipeinc(self.angle_0 - self._phase, self._ellip_m)
+        return self._sign * self._major * (ellipeinc(angles - self._phase, self._ellip_m) - e_0)
+
+    def _angles_from_lengths(self, lengths: np.ndarray) -> np.ndarray:
+        """The angles at the given arc lengths from the start of the arc (the inverse of _arc_lengths())."""
+        if self._ellip_m == 0.0:
+            return self.angle_0 + lengths / self._arc_length * (self.angle_1 - self.angle_0)
+
+        # Newton's method, starting from the cubic Hermite interpolation between the knots (whose slopes are the
+        # exact derivatives of the angles w.r.t. the arc length).
+        knot_lengths, knot_angles = self._knot_lengths, self._knot_angles
+        idx = np.clip(np.searchsorted(knot_lengths, lengths, side='right') - 1, 0, len(knot_lengths) - 2)
+        h = knot_lengths[idx + 1] - knot_lengths[idx]
+        x = (lengths - knot_lengths[idx]) / h
+        slopes = self._sign / self._speeds(knot_angles)
+        angles = (2*x**3 - 3*x**2 + 1) * knot_angles[idx] + (x**3 - 2*x**2 + x) * h * slopes[idx] + \
+            (3*x**2 - 2*x**3) * knot_angles[idx + 1] + (x**3 - x**2) * h * slopes[idx + 1]
+        lo, hi = sorted((self.angle_0, self.angle_1))
+        for _ in range(MAX_ELLIPSE_NEWTON_ITERATIONS):
+            steps = (self._arc_lengths(angles) - lengths) / (self._sign * self._speeds(angles))
+            angles = np.clip(angles - steps, lo, hi)
+            if np.abs(steps).max(initial=0.0)**2 < ELLIPSE_NEWTON_TOL:  # The next error is about the step squared
+                break
+        return angles
+
+
+def elliptical_arc_control_points(centre, radius_x: float, radius_y: float, angle_0: float,
+                                  angle_1: float) -> np.ndarray:
+    """Computes the control points of the Bezier curves approximating an arc of an axis-aligned ellipse, which span
+    equal angles of at most MAX_ARC_SEGMENT_ANGLE. The handles of each curve are tangent to the ellipse, with the
+    lengths that make the curves approximate circles best (4/3 tan(angle / 4)), scaled along the axes.
+    Args:
+        centre: The centre of the ellipse (2D or 3D).
+        radius_x: The radius along the x-axis.
+        radius_y: The radius along the y-axis.
+        angle_0: The (parametric) angle at the start of the arc, in radians.
+        angle_1: The angle at the end of the arc.
+    Returns:
+        The (n_curves, 4, 3) array of control points.
+    """
+    assert radius_x > 0 and radius_y > 0, 'The radii must be positive.'
+    assert angle_0 != angle_1, 'The arc must span a non-zero angle.'
+    num_bzr = max(1, math.ceil(abs(angle_1 - angle_0) / MAX_ARC_SEGMENT_ANGLE - 1e-9))
+    angles = np.linspace(angle_0, angle_1, num_bzr + 1)
+    handle_len = 4 / 3 * math.tan((angle_1 - angle_0) / num_bzr / 4)
+    cos, sin = np.cos(angles), np.sin(angles)
+    ctrl_pts = np.zeros((num_bzr, 4, 3))
+    ctrl_pts[:, 0, :2] = np.stack((cos[:-1], sin[:-1]), axis=1)
+    ctrl_pts[:, 1, :2] = ctrl_pts[:, 0, :2] + handle_len * np.stack((-sin[:-1], cos[:-1]), axis=1)
+    ctrl_pts[:, 3, :2] = np.stack((cos[1:], sin[1:]), axis=1)
+    ctrl_pts[:, 2, :2] = ctrl_pts[:, 3, :2] - handle_len * np.stack((-sin[1:], cos[1:]), axis=1)
+    centre = np.array(tuple(centre) + (0.0,) * (3 - len(centre)), dtype=float)
+    return centre + ctrl_pts * (radius_x, radius_y, 1.0)
+
+
+def polyline_spline_points(vertices) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Computes the spline points of the Bezier spline of a polyline, whose handles lie at a third and two thirds
+    of the way along each segment. The outer handles of the end points mirror the inner ones.
+    Args:
+        vertices: An (N, 3) array of vertices, with N > 1.
+    Returns:
+        The (N, 3) arrays of spline points and of their left and right handles.
+    """
+    co = np.asarray(vertices, dtype=float)
+    vects = np.diff(co, axis=0) / 3
+    handle_left = co - np.concatenate((vects[:1], vects))
+    handle_right = co + np.concatenate((vects, vects[-1:]))
+    return co, handle_left, handle_right
+
+
+def _unit_arc_control_points(sweep: float) -> np.ndarray:
+    """The (4, 3) control points of the Bezier curve approximating the arc of the unit circle that spans the given
+    angle, symmetrically about the x-axis."""
+    return elliptical_arc_control_points((0.0, 0.0), 1.0, 1.0, -0.5 * sweep, 0.5 * sweep)[0]
@@ -0,0 +1,365 @@
+import copy
+import time
+import hashlib
+import weakref
+import numpy as np
+from .bezier_utils import bezier_lengths, bezier_points, bezier_speeds
+
+DEFAULT_LOOKUP_TOL = 1.0e-5  # Relative to the total length of the spline
+MAX_LOOKUP_REFINEMENTS = 20
+NUM_INITIAL_INTERVALS = 2  # Per Bezier curve
+
+
+class ArcLengthTable:
+    """A lookup table that maps between the spline parameter u and the arc length s of a cubic Bezier spline.
+    The spline parameter is distributed uniformly over the Bezier curves, i.e. u in [i/n, (i+1)/n] maps to
+    the i-th of n curves.
+
+    The inverse mapping u(s) is interpolated with monotone cubic Hermite polynomials, whose slopes are the
+    exact derivatives du/ds limited according to Fritsch-Carlson. The sample points are refined adaptively,
+    where the interpolant is least accurate (i.e. where the curvature is high), until the positional error
+    is within the given tolerance. Simple curves therefore only require a few sample points.
+
+    Each Bezier curve is sampled independently and its length is stored, so that when only a few curves change
+    the table can be updated in place (see update_curves()) rather than rebuilt.
+
+    Splines with identical control points can share one table (see shared_table()). Shared tables are immutable:
+    they are copied rather than updated in place, and deep copies of them are the tables themselves.
+    """
+
+    def __init__(self, ctrl_pts: np.ndarray, tol: float = DEFAULT_LOOKUP_TOL):
+        """Build the lookup table for a Bezier spline.
+        Args:
+            ctrl_pts: An (n_curves, 4, 3) array of control points (p0, h0, h1, p1) of each Bezier curve.
+            tol: The tolerance on the positional error of u_from_s(), relative to the total length.
+        """
+        assert len(ctrl_pts) > 0, 'A spline must contain at least 1 Bezier curve.'
+        self._ctrl_pts = ctrl_pts
+        self._tol = tol
+        self.spl_params: np.ndarray = None  # Sorted sample parameters u
+        self.len_params: np.ndarray = None  # Arc lengths s at the sample parameters
+        self.cumu_lengths: np.ndarray = None  # Arc lengths at the start of each Bezier curve
+        self.curve_lengths: np.ndarray = None  # Arc lengths of each Bezier curve
+        self._slopes: np.ndarray = None  # (n_intervals, 2) limited slopes du/ds at the interval ends
+        self._knot_starts: np.ndarray = None  # Index of the first sample of each Bezier curve, and the last index
+        self.is_shared = False  # Whether the table is registered for sharing, hence immutable
+        self.build_time = 0.0  # Time taken to build the table, in seconds
+
+        start = time.perf_counter()
+        self._build()
+        self.build_time = time.perf_counter() - start
+
+    @property
+    def length(self) -> float:
+        """The total length of the spline."""
+        return float(self.len_params[-1])
+
+    @property
+    def num_curves(self) -> int:
+        """The number of Bezier curves in the spline."""
+        return len(self._ctrl_pts)
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the arrays of the table, in bytes."""
+        return sum(a.nbytes for a in (self._ctrl_pts, self.spl_params, self.len_params, self.cumu_lengths,
+                                      self.curve_lengths, self._slopes, self._knot_starts))
+
+    def u_from_s(self, lengths) -> np.ndarray:
+        """Computes the spline parameters associated to an array of arc lengths.
+        Args:
+            lengths: An array of arc lengths in [0, length].
+        Returns:
+            An array of spline parameters in [0, 1].
+        """
+        s = np.atleast_1d(np.asarray(lengths, dtype=float))
+        u_knots, s_knots = self.spl_params, self.len_params
+        idx = np.clip(np.searchsorted(s_knots, s, side='right') - 1, 0, len(s_knots) - 2)
+        return self._hermite(s, u_knots[idx], u_knots[idx + 1], s_knots[idx], s_knots[idx + 1],
+                             self._slopes[idx, 0], self._slopes[idx, 1])
+
+    def u_at(self, length: float) -> float:
+        """Scalar version of u_from_s(), which avoids the overhead of array operations for single queries."""
+        length = float(length)
+        s_knots = self.len_params
+        idx = min(max(int(np.searchsorted(s_knots, length, side='right')) - 1, 0), len(s_knots) - 2)
+        s_0 = float(s_knots[idx])
+        h = float(s_knots[idx + 1]) - s_0
+        u_0 = float(self.spl_params[idx])
+        if h <= 0:
+            return u_0
+
+        u_1 = float(self.spl_params[idx + 1])
+        m_0, m_1 = self._slopes[idx].tolist()
+        x = min(max((length - s_0) / h, 0.0), 1.0)
+        x_sq = x * x
+        x_cb = x * x_sq
+        return (2*x_cb - 3*x_sq + 1) * u_0 + (x_cb - 2*x_sq + x) * h * m_0 + \
+            (3*x_sq - 2*x_cb) * u_1 + (x_cb - x_sq) * h * m_1
+
+    def s_from_u(self, spl_params) -> np.ndarray:
+        """Computes the (exact) arc lengths associated to an array of spline parameters.
+        Args:
+            spl_params: An array of spline parameters in [0, 1].
+        Returns:
+            An array of arc lengths.
+        """
+        u = np.atleast_1d(np.asarray(spl_params, dtype=float))
+        u_knots = self.spl_params
+        idx = np.clip(np.searchsorted(u_knots, u, side='right') - 1, 0, len(u_knots) - 2)
+        bzr_indices, t_0, t = self._local_params(u_knots[idx], u_knots[idx + 1], u)
+        return self.len_params[idx] + bezier_lengths(self._ctrl_pts[bzr_indices], t_0, t)
+
+    def update_curves(self, ctrl_pts: np.ndarray, bzr_indices):
+        """Updates the table after some of the Bezier curves changed. Only the changed curves are re-integrated
+        and re-sampled, and the lengths of all subsequent samples are offset by the change in length.
+        Args:
+            ctrl_pts: The updated (n_curves, 4, 3) array of control points. The number of curves must not change.
+            bzr_indices: The indices of the Bezier curves that changed.
+        """
+        assert not self.is_shared, 'Shared tables are immutable; update a copy (see unshared()) instead.'
+        assert ctrl_pts.shape == self._ctrl_pts.shape, 'The number of Bezier curves must not change.'
+        self._ctrl_pts = ctrl_pts
+        bzr_indices = np.unique(np.asarray(bzr_indices, dtype=int))
+        if len(bzr_indices) == 0:
+            return
+        assert 0 <= bzr_indices[0] and bzr_indices[-1] < self.num_curves, 'Bezier curve index out of range.'
+
+        # Only the samples between the first and last changed curves are spliced. Within this range, the
+        # intervals of the unchanged curves are kept.
+        first, last = bzr_indices[0], bzr_indices[-1]
+        k_0, k_1 = self._knot_starts[first], self._knot_starts[last + 1]
+        counts = np.diff(self._knot_starts[first:last + 2])
+        kept = np.arange(k_0, k_1)[~np.isin(np.repeat(np.arange(first, last + 1), counts), bzr_indices)]
+
+        other_length = self.length - self.curve_lengths[bzr_indices].sum()
+        u_0, _, sub_lens, slopes, new_counts = self._sample_curves(bzr_indices, other_length)
+        u_0 = np.concatenate((self.spl_params[kept], u_0))
+        sub_lens = np.concatenate((self.len_params[kept + 1] - self.len_params[kept], sub_lens))
+        slopes = np.concatenate((self._slopes[kept], slopes))
+        order = np.argsort(u_0, kind='stable')
+        counts[bzr_indices - first] = new_counts
+
+        # Splice the range into the table, and offset the tail by the change in length.
+        s_range = self.len_params[k_0] + np.concatenate(([0.0], np.cumsum(sub_lens[order])))
+        offset = s_range[-1] - self.len_params[k_1]
+        self.spl_params = np.concatenate((self.spl_params[:k_0], u_0[order], self.spl_params[k_1:]))
+        self.len_params = np.concatenate((self.len_params[:k_0], s_range[:-1], self.len_params[k_1:] + offset))
+        self._slopes = np.concatenate((self._slopes[:k_0], slopes[order], self._slopes[k_1:]))
+
+        range_starts = np.concatenate(([0], np.cumsum(counts)))
+        self._knot_starts[last + 2:] += range_starts[-1] - (k_1 - k_0)
+        self._knot_starts[first + 1:last + 2] = k_0 + range_starts[1:]
+        self.curve_lengths[first:last + 1] = np.diff(s_range[range_starts])
+        self.cumu_lengths[first + 1:last + 1] = s_range[range_starts[1:-1]]
+        self.cumu_lengths[last + 1:] += offset
+
+    def unshared(self) -> 'ArcLengthTable':
+        """Returns the table itself if it is not shared, otherwise a private copy of it that can be updated."""
+        if not self.is_shared:
+            return self
+        sharing_stats.copies += 1
+        table = copy.copy(self)
+        for k in ('_ctrl_pts', 'spl_params', 'len_params', 'cumu_lengths', 'curve_lengths', '_slopes',
+                  '_knot_starts'):
+            setattr(table, k, getattr(self, k).copy())
+        table.is_shared = False
+        return table
+
+    def __len__(self) -> int:
+        """The number of sample points in the table."""
+        return len(self.spl_params)
+
+    def __deepcopy__(self, memo):
+        """Shared tables are immutable, so they are not copied (e.g. by the copies of a curve that make up the
+        dashes of a DashedCurve)."""
+        if self.is_shared:
+            sharing_stats.record_share(self)
+            return self
+        table = copy.copy(self)
+        memo[id(self)] = table
+        table.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return table
+
+    # Private methods -------------------------------------------------------------------------------------- #
+
+    def _build(self):
+        u_0, u_1, sub_lens, slopes, counts = self._sample_curves(np.arange(self.num_curves))
+        self.spl_params = np.append(u_0, 1.0)
+        self.len_params = np.concatenate(([0.0], np.cumsum(sub_lens)))
+        self._slopes = slopes
+        self._knot_starts = np.concatenate(([0], np.cumsum(counts)))
+        self.cumu_lengths = self.len_params[self._knot_starts[:-1]]
+        self.curve_lengths = np.diff(self.len_params[self._knot_starts])
+
+    def _sample_curves(self, bzr_indices: np.ndarray, other_length: float = 0.0):
+        """Adaptively samples the given Bezier curves. The intervals are treated independently, so that any
+        subset of the curves can be (re-)sampled.
+        Args:
+            bzr_indices: A sorted array of the indices of the Bezier curves to sample.
+            other_length: The total length of the remaining curves, which determines the absolute tolerance.
+        Returns:
+            The sorted interval start and end parameters, the interval lengths, the (n_intervals, 2) slopes and
+            the number of intervals of each sampled curve.
+        """
+        n_crvs = self.num_curves
+        n_init = NUM_INITIAL_INTERVALS
+        knots = (bzr_indices[:, None] + np.arange(n_init + 1) / n_init) / n_crvs
+        knots[:, -1] = (bzr_indices + 1) / n_crvs  # Spline points must be sampled exactly
+        u_0, u_1 = knots[:, :-1].ravel(), knots[:, 1:].ravel()
+
+        # Integrate all initial intervals in one batch.
+        crv_indices, t_0, t_1 = self._local_params(u_0, u_1)
+        sub_lens = bezier_lengths(self._ctrl_pts[crv_indices], t_0, t_1)
+
+        # Refine the intervals whose interpolation error is too large by bisecting them. The first half replaces
+        # the interval and the second half is appended, and only the resulting halves are re-checked.
+        abs_tol = self._tol * (other_length + sub_lens.sum())
+        pending = np.arange(len(u_0))
+        for _ in range(MAX_LOOKUP_REFINEMENTS):
+            if len(pending) == 0:
+                break
+            u_mid, s_mid, bad = self._check_intervals(u_0[pending], u_1[pending], sub_lens[pending], abs_tol)
+            split = pending[bad]
+            if len(split) == 0:
+                break
+
+            appended = np.arange(len(u_0), len(u_0) + len(split))
+            u_0 = np.concatenate((u_0, u_mid[bad]))
+            u_1 = np.concatenate((u_1, u_1[split]))
+            sub_lens = np.concatenate((sub_lens, np.maximum(sub_lens[split] - s_mid[bad], 0.0)))
+            u_1[split] = u_mid[bad]
+            sub_lens[split] = np.minimum(s_mid[bad], sub_lens[split])
+            pending = np.concatenate((split, appended))
+
+        order = np.argsort(u_0, kind='stable')
+        u_0, u_1, sub_lens = u_0[order], u_1[order], sub_lens[order]
+        crv_indices = self._local_params(u_0, u_1)[0]
+        counts = np.bincount(crv_indices, minlength=n_crvs)[bzr_indices]
+        return u_0, u_1, sub_lens, self._compute_slopes(u_0, u_1, sub_lens), counts
+
+    def _check_intervals(self, u_0: np.ndarray, u_1: np.ndarray, sub_lens: np.ndarray, abs_tol: float):
+        """Compares the interpolated and exact points at the quarter points of the given intervals. Returns the
+        midpoint parameters and lengths (relative to the interval starts), and whether each interval must be
+        refined."""
+        slopes = self._compute_slopes(u_0, u_1, sub_lens)
+
+        # Evaluate all check points of all intervals in one batch, with a row per fraction.
+        fracs = np.array([0.5, 0.25, 0.75])[:, None]
+        u_check = u_0 + fracs * (u_1 - u_0)
+        bzr_indices, t_0, t_check = self._local_params(u_0, u_1, u_check)
+        ctrl_pts = np.tile(self._ctrl_pts[bzr_indices], (len(fracs), 1, 1))
+        t_check = t_check.ravel()
+        s_check = bezier_lengths(ctrl_pts, np.tile(t_0, len(fracs)), t_check).reshape(u_check.shape)
+
+        u_interp = self._hermite(s_check, u_0, u_1, 0.0, sub_lens, slopes[:, 0], slopes[:, 1])
+        _, _, t_interp = self._local_params(u_0, u_1, u_interp)
+        errors = np.linalg.norm(bezier_points(ctrl_pts, t_interp.ravel()) - bezier_points(ctrl_pts, t_check),
+                                axis=1).reshape(u_check.shape)
+        return u_check[0], s_check[0], errors.max(axis=0) > abs_tol
+
+    def _local_params(self, u_0: np.ndarray, u_1: np.ndarray, u: np.ndarray = None):
+        """Maps spline parameters within intervals [u_0, u_1] (each lying within a single Bezier curve) to
+        the Bezier curve indices and local Bezier parameters. The curve is identified using the midpoint."""
+        n_crvs = self.num_curves
+        bzr_indices = np.minimum(np.floor(0.5 * n_crvs * (u_0 + u_1)).astype(int), n_crvs - 1)
+        t_0 = n_crvs * u_0 - bzr_indices
+        t_1 = n_crvs * (u_1 if u is None else u) - bzr_indices
+        return bzr_indices, t_0, np.clip(t_1, 0.0, 1.0)
+
+    def _compute_slopes(self, u_0: np.ndarray, u_1: np.ndarray, ds: np.ndarray) -> np.ndarray:
+        """Computes the slopes du/ds at both ends of the intervals [u_0, u_1] of lengths ds, limited to 3 times
+        the secant slope so that the Hermite interpolant is monotone (Fritsch-Carlson)."""
+        bzr_indices, t_0, t_1 = self._local_params(u_0, u_1)
+        speeds = self.num_curves * bezier_speeds(self._ctrl_pts[bzr_indices], np.stack((t_0, t_1), axis=1))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            secants = np.where(ds > 0, (u_1 - u_0) / ds, 0.0)
+            slopes = np.where(speeds > 0, 1.0 / speeds, np.inf)
+        return np.minimum(slopes, 3.0 * secants[:, None])
+
+    @staticmethod
+    def _hermite(s, u_0, u_1, s_0, s_1, m_0, m_1) -> np.ndarray:
+        """Evaluates the cubic Hermite interpolants of u(s) over the intervals [s_0, s_1]."""
+        h = s_1 - s_0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.where(h > 0, (s - s_0) / h, 0.0)
+        x = np.clip(x, 0.0, 1.0)
+        x_sq = x * x
+        x_cb = x * x_sq
+        return (2*x_cb - 3*x_sq + 1) * u_0 + (x_cb - 2*x_sq + x) * h * m_0 + \
+            (3*x_sq - 2*x_cb) * u_1 + (x_cb - x_sq) * h * m_1
+
+
+class SharingStats:
+    """
+    Counts how many arc length tables were built and how many were shared instead, and the memory and build time
+    that sharing saved (estimated from the tables that were shared).
+
+    Usage:
+        sharing_stats.reset()
+        # ... create curves ...
+        sharing_stats.print_stats()
+    """
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.builds = 0
+        self.shares = 0
+        self.copies = 0  # Shared tables copied because a spline sharing them was edited
+        self.saved_bytes = 0
+        self.saved_time = 0.0
+
+    def record_share(self, table: ArcLengthTable):
+        """Records that the given table was shared rather than built again."""
+        self.shares += 1
+        self.saved_bytes += table.nbytes
+        self.saved_time += table.build_time
+
+    def reset(self):
+        """Reset all counters."""
+        self.__init__()
+
+    def print_stats(self):
+        """Print the number of built, shared and copied tables, and the savings."""
+        print(f'arc length tables: {self.builds} built, {self.shares} shared, {self.copies} copied on write; '
+              f'saved {self.saved_bytes / 1024:.1f} KiB and {1000 * self.saved_time:.2f} ms')
+
+
+# Single instance for global access
+sharing_stats = SharingStats()
+
+_shared_tables: weakref.WeakValueDictionary[tuple[bytes, float], ArcLengthTable] = weakref.WeakValueDictionary()
+
+
+def control_points_hash(ctrl_pts: np.ndarray) -> bytes:
+    """Computes a content hash of an (n_curves, 4, 3) array of control points."""
+    ctrl_pts = np.ascontiguousarray(ctrl_pts, dtype=float)
+    h = hashlib.blake2b(np.array(ctrl_pts.shape).tobytes(), digest_size=16)
+    h.update(ctrl_pts.tobytes())
+    return h.digest()
+
+
+def shared_table(ctrl_pts: np.ndarray, tol: float = DEFAULT_LOOKUP_TOL, content_hash: bytes = None) \
+        -> ArcLengthTable:
+    """Returns the shared lookup table of a Bezier spline with the given control points, building it only if no
+    spline with the same control points (and tolerance) holds one. The table is immutable (see
+    ArcLengthTable.unshared()), and released once no spline holds it.
+    Args:
+        ctrl_pts: An (n_curves, 4, 3) array of control points (p0, h0, h1, p1) of each Bezier curve.
+        tol: The tolerance on the positional error of u_from_s(), relative to the total length.
+        content_hash: The content hash of the control points, if already known (see control_points_hash()).
+    Returns:
+        The shared lookup table.
+    """
+    key = (control_points_hash(ctrl_pts) if content_hash is None else content_hash, tol)
+    table = _shared_tables.get(key)
+    if table is not None:
+        sharing_stats.record_share(table)
+        return table
+
+    sharing_stats.builds += 1
+    table = ArcLengthTable(np.array(ctrl_pts, dtype=float), tol)
+    table.is_shared = True
+    _shared_tables[key] = table
+    return table
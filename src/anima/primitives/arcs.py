@@ -0,0 +1,60 @@
+import math
+from anima.globals.general import Vector
+from .analytic_geometry import EllipticalArcGeometry, elliptical_arc_control_points
+from .bezier_spline import BezierSpline
+from .bezier_utils import spline_points_from_control_points
+from .curves import DEFAULT_LINE_WIDTH
+
+
+class EllipticalArc(BezierSpline):
+    """An arc of an axis-aligned ellipse, parallel to the xy-plane. In Blender, it is a Bezier spline whose curves
+    each span at most 45 degrees, while its length, points, tangents and params are computed in closed form (see
+    EllipticalArcGeometry), as long as its spline points are not edited.
+    """
+
+    def __init__(self, centre: Vector | tuple, radius_x: float, radius_y: float, angle_0: float = 0.0,
+                 angle_1: float = 2 * math.pi, width: float = DEFAULT_LINE_WIDTH, bias: float = 0.0,
+                 name: str = 'EllipticalArc', **kwargs):
+        """Initialise an elliptical arc, i.e. the points centre + (radius_x cos(a), radius_y sin(a)) for angles a
+        from angle_0 to angle_1.
+        Args:
+            centre: The centre of the ellipse.
+            radius_x: The radius along the x-axis.
+            radius_y: The radius along the y-axis.
+            angle_0: The (parametric) angle at the start of the arc, in radians.
+            angle_1: The angle at the end of the arc. Arcs with angle_1 < angle_0 run clockwise, and the default
+                arc is the whole ellipse.
+            width: The width of the arc.
+            bias: The bias of the arc.
+            name: The name of the arc object.
+            kwargs: Additional keyword arguments for BezierSpline.
+        """
+        self._ellipse = (tuple(centre), radius_x, radius_y, angle_0, angle_1)
+        ctrl_pts = elliptical_arc_control_points(*self._ellipse)
+        co, handle_left, handle_right = spline_points_from_control_points(ctrl_pts)
+        super().__init__(co, width=width, bias=bias, name=name, handle_left=handle_left,
+                         handle_right=handle_right, **kwargs)
+
+    def _create_geometry(self, co, handle_left, handle_right, **kwargs) -> EllipticalArcGeometry:
+        return EllipticalArcGeometry(co, handle_left, handle_right, *self._ellipse, **kwargs)
+
+
+class Arc(EllipticalArc):
+    """A circular arc, parallel to the xy-plane."""
+
+    def __init__(self, centre: Vector | tuple, radius: float, angle_0: float = 0.0, angle_1: float = 2 * math.pi,
+                 width: float = DEFAULT_LINE_WIDTH, bias: float = 0.0, name: str = 'Arc', **kwargs):
+        """Initialise a circular arc, i.e. the points centre + radius (cos(a), sin(a)) for angles a from angle_0
+        to angle_1.
+        Args:
+            centre: The centre of the circle.
+            radius: The radius of the circle.
+            angle_0: The angle at the start of the arc, in radians.
+            angle_1: The angle at the end of the arc. Arcs with angle_1 < angle_0 run clockwise, and the default
+                arc is the whole circle.
+            width: The width of the arc.
+            bias: The bias of the arc.
+            name: The name of the arc object.
+            kwargs: Additional keyword arguments for BezierSpline.
+        """
+        super().__init__(centre, radius, radius, angle_0, angle_1, width=width, bias=bias, name=name, **kwargs)
@@ -0,0 +1,128 @@
+import numpy as np
+from .bezier_utils import (as_point_array, bezier_closest_params, bezier_points, normalise_rows,
+                           spline_points_from_control_points)
+
+MAX_REPARAMETERISATIONS = 4  # Per fitting attempt, before splitting
+REPARAMETERISATION_FACTOR = 4.0  # Multiple of the tolerance below which reparameterising is attempted
+
+
+def fit_bezier_spline(points, tolerance: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fits a cubic Bezier spline to a sequence of sample points, so that every sample lies within the given
+    distance of the spline (Schneider's algorithm). Each span of samples is fitted with one Bezier curve by
+    least squares, with its end tangents fixed, and reparameterised with Newton's method a few times. Spans
+    that still do not fit are split at the sample with the largest error, keeping the spline G1 continuous.
+    All pending spans are fitted together, as batches of flattened samples.
+    Args:
+        points: An (N, 2|3) array of sample points, with N >= 2.
+        tolerance: The maximum distance between the samples and the spline.
+    Returns:
+        The (M, 3) arrays of spline points and of their left and right handles. The outer handles of the end
+        points mirror the inner ones.
+    """
+    pts = as_point_array(points)
+    keep = np.concatenate(([True], np.linalg.norm(np.diff(pts, axis=0), axis=1) > 0))
+    pts = pts[keep]
+    assert len(pts) > 1, 'At least 2 distinct points are required.'
+    assert tolerance > 0, 'The tolerance must be positive.'
+
+    # Pending spans: sample index ranges [starts, ends], and unit tangents pointing inwards at both ends.
+    starts, ends = np.array([0]), np.array([len(pts) - 1])
+    tangs_0 = normalise_rows(pts[[1]] - pts[[0]])
+    tangs_1 = normalise_rows(pts[[-2]] - pts[[-1]])
+    fitted_starts, fitted_ctrl_pts = [], []
+    while True:
+        ctrl_pts, errors, indices, span_ids = _fit_spans(pts, starts, ends, tangs_0, tangs_1, tolerance)
+        max_errors = np.full(len(starts), -1.0)
+        np.maximum.at(max_errors, span_ids, errors)
+        done = max_errors <= tolerance
+        fitted_starts.append(starts[done])
+        fitted_ctrl_pts.append(ctrl_pts[done])
+        if done.all():
+            break
+
+        # Split the remaining spans at their (interior) samples with the largest errors.
+        interior = (indices > starts[span_ids]) & (indices < ends[span_ids]) & ~done[span_ids]
+        order = np.lexsort((-errors[interior], span_ids[interior]))
+        first = np.concatenate(([True], np.diff(span_ids[interior][order]) > 0))
+        split_spans = span_ids[interior][order][first]
+        splits = indices[interior][order][first]
+        tangs = normalise_rows(pts[splits - 1] - pts[splits + 1])
+        starts = np.concatenate((starts[split_spans], splits))
+        ends = np.concatenate((splits, ends[split_spans]))
+        tangs_0, tangs_1 = np.concatenate((tangs_0[split_spans], -tangs)), \
+            np.concatenate((tangs, tangs_1[split_spans]))
+
+    order = np.argsort(np.concatenate(fitted_starts))
+    return spline_points_from_control_points(np.concatenate(fitted_ctrl_pts)[order])
+
+
+def _fit_spans(pts: np.ndarray, starts: np.ndarray, ends: np.ndarray, tangs_0: np.ndarray, tangs_1: np.ndarray,
+               tolerance: float) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Fits one Bezier curve to each span of samples. Returns the (K, 4, 3) control points of the curves, and
+    the errors, sample indices and span indices of the flattened samples of all spans."""
+    counts = ends - starts + 1
+    span_ids = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    indices = starts[span_ids] + np.arange(len(span_ids)) - offsets[span_ids]
+    samples = pts[indices]
+
+    # Chord length parameterisation.
+    dists = np.linalg.norm(samples - pts[np.maximum(indices - 1, 0)], axis=1)
+    dists[offsets] = 0.0
+    cumu = np.cumsum(dists)
+    cumu -= cumu[offsets][span_ids]
+    chords = cumu[offsets + counts - 1]
+    params = cumu / chords[span_ids]
+
+    active = np.ones(len(starts), dtype=bool)
+    ctrl_pts = np.empty((len(starts), 4, 3))
+    errors = np.empty(len(samples))
+    for i in range(MAX_REPARAMETERISATIONS + 1):
+        mask = active[span_ids]
+        spans = np.flatnonzero(active)
+        ctrl_pts[spans] = _fit_curves(pts, starts[spans], ends[spans], tangs_0[spans], tangs_1[spans],
+                                      chords[spans], samples[mask], params[mask],
+                                      np.searchsorted(spans, span_ids[mask]))
+        curves = ctrl_pts[span_ids[mask]]
+        errors[mask] = np.linalg.norm(bezier_points(curves, params[mask]) - samples[mask], axis=1)
+
+        # Only reparameterise the spans that nearly fit.
+        max_errors = np.zeros(len(starts))
+        np.maximum.at(max_errors, span_ids[mask], errors[mask])
+        active &= (max_errors > tolerance) & (max_errors <= REPARAMETERISATION_FACTOR * tolerance)
+        if not active.any() or i == MAX_REPARAMETERISATIONS:
+            break
+        mask = active[span_ids]
+        params[mask] = bezier_closest_params(ctrl_pts[span_ids[mask]], params[mask], samples[mask], iterations=1)
+    return ctrl_pts, errors, indices, span_ids
+
+
+def _fit_curves(pts: np.ndarray, starts: np.ndarray, ends: np.ndarray, tangs_0: np.ndarray, tangs_1: np.ndarray,
+                chords: np.ndarray, samples: np.ndarray, params: np.ndarray, span_ids: np.ndarray) -> np.ndarray:
+    """Computes the lengths of the handles along the given end tangents that fit the samples of each span best,
+    in the least squares sense. Degenerate solutions are replaced by handles of a third of the chord length.
+    Returns the (K, 4, 3) control points."""
+    p_0, p_1 = pts[starts], pts[ends]
+    t = params[:, None]
+    _t = 1 - t
+    b_0, b_1, b_2, b_3 = _t**3, 3 * _t**2 * t, 3 * _t * t**2, t**3
+    a_0 = b_1 * tangs_0[span_ids]
+    a_1 = b_2 * tangs_1[span_ids]
+    rest = samples - (b_0 + b_1) * p_0[span_ids] - (b_2 + b_3) * p_1[span_ids]
+
+    def span_sums(values):
+        return np.bincount(span_ids, weights=values, minlength=len(starts))
+
+    c_00 = span_sums(np.einsum('ij,ij->i', a_0, a_0))
+    c_01 = span_sums(np.einsum('ij,ij->i', a_0, a_1))
+    c_11 = span_sums(np.einsum('ij,ij->i', a_1, a_1))
+    x_0 = span_sums(np.einsum('ij,ij->i', a_0, rest))
+    x_1 = span_sums(np.einsum('ij,ij->i', a_1, rest))
+    det = c_00 * c_11 - c_01 * c_01
+    safe = np.where(np.abs(det) > 1e-12, det, 1.0)
+    alpha_0 = np.where(np.abs(det) > 1e-12, (x_0 * c_11 - x_1 * c_01) / safe, 0.0)
+    alpha_1 = np.where(np.abs(det) > 1e-12, (c_00 * x_1 - c_01 * x_0) / safe, 0.0)
+    degenerate = (alpha_0 < 1e-6 * chords) | (alpha_1 < 1e-6 * chords)
+    alpha_0 = np.where(degenerate, chords / 3, alpha_0)
+    alpha_1 = np.where(degenerate, chords / 3, alpha_1)
+    return np.stack((p_0, p_0 + alpha_0[:, None] * tangs_0, p_1 + alpha_1[:, None] * tangs_1, p_1), axis=1)
@@ -1,58 +1,73 @@
-import math
 import numpy as np
 import bpy
 from typing import Any, Optional
-from array import array
-from scipy import integrate
-from anima.globals.general import (SMALL_OFFSET, Vector, add_line_segment,
-                                   add_object, deepcopy_object, disable_print, enable_print,
-                                   make_3d_vector, rotate_90)
+from anima.globals.general import Vector, add_object, clip, make_3d_vector, reciprocal
+from .arc_length import DEFAULT_LOOKUP_TOL
+from .bezier_fit import fit_bezier_spline
+from .bezier_utils import as_point_array, auto_handles
+from .curve_geometry import CurveGeometry
 from .curves import DEFAULT_LINE_WIDTH, Curve
-from .endcaps import Endcap
+from .profiles import profile_cache
 
 DEFAULT_RESOLUTION = 100
-RELATIVE_LENGTH_ERR = 1.0e-3  # 0.1% of the length
-NUM_PARAM_LOOKUP_PTS = 40
+DEFAULT_CHORD_TOLERANCE = 1.0e-3  # Maximum distance between the spline and its tessellation, in Blender units
+DEFAULT_FIT_TOLERANCE = 1.0e-3  # Maximum distance between fitted samples and the spline, in Blender units
+MAX_RESOLUTION = 1024  # Upper limit of Blender's resolution_u
+HANDLE_TYPES = {'FREE': 0, 'AUTO': 1, 'VECTOR': 2, 'ALIGNED': 3}  # Blender's enum values, used by foreach_set()
 
 
 class BezierSpline(Curve):
     """A Bezier spline is a curve defined by a series of spline points and each connected segment is represented by a Bezier curve. We only support cubic Bezier curves, currently.
     """
 
-    def __init__(self, spline_points: list[Vector | tuple], width: float = DEFAULT_LINE_WIDTH,
-                 bias: float = 0.0, name: str = 'BezierSpline', **kwargs):
+    def __init__(self, spline_points: list[Vector | tuple] | np.ndarray, width: float = DEFAULT_LINE_WIDTH,
+                 bias: float = 0.0, name: str = 'BezierSpline', handle_left: np.ndarray = None,
+                 handle_right: np.ndarray = None, handle_types: str | list[str] = None, **kwargs):
         """Initialise a Bezier spline with the given points.
         Args:
-            spline_points: A list of 2D or 3D points defining the spline.
+            spline_points: A list of 2D or 3D points, or an (N, 2|3) array, defining the spline.
             width: The width of the spline.
             bias: The bias of the spline.
             name: The name of the spline object.
-            kwargs: Additional keyword arguments for the Curve base class.
+            handle_left: An optional (N, 2|3) array of left handle locations. If no handles are given, they are
+                computed as Blender's 'AUTO' handles.
+            handle_right: An optional (N, 2|3) array of right handle locations.
+            handle_types: The handle type of all spline points, or a list of one type per point. Defaults to
+                'FREE' if the handles are given, and must be 'AUTO' otherwise. Given handles of any other type
+                than 'FREE' are adjusted by Blender according to their type.
+            kwargs: Additional keyword arguments for the Curve base class. The tolerance of the arc length
+                lookup table, relative to the spline's length, can be set using 'lookup_tol'.
         """
-        self._spl_params: 'np.ndarray'[float] = None
-        self._len_params: 'np.ndarray'[float] = None
-        self._cumu_bzr_lens: array[float] = None
-        self._num_lookup_pts = \
-            kwargs.pop('num_lookup_pts', NUM_PARAM_LOOKUP_PTS)
+        lookup_tol = kwargs.pop('lookup_tol', DEFAULT_LOOKUP_TOL)
+
+        co = as_point_array(spline_points)
+        assert len(co) > 1, 'A spline must contain at least 2 points.'
+        assert (handle_left is None) == (handle_right is None), 'Expected either both handles or neither.'
+        handles_given = handle_left is not None
+        if not handles_given:
+            type_values = self._handle_type_values('AUTO' if handle_types is None else handle_types, len(co))
+            assert all(v == HANDLE_TYPES['AUTO'] for v in type_values), "Only 'AUTO' handles can be computed."
+            handle_left, handle_right = auto_handles(co)
+        else:
+            type_values = self._handle_type_values('FREE' if handle_types is None else handle_types, len(co))
+            handle_left, handle_right = as_point_array(handle_left), as_point_array(handle_right)
+
+        # Blender stores single precision floats, which the geometry must mirror.
+        co, handle_left, handle_right = (a.astype(np.float32).astype(float) for a in (co, handle_left, handle_right))
+        adjust = handles_given and any(v != HANDLE_TYPES['FREE'] for v in type_values)
 
-        # Create a new curve object
+        # Create a new curve object. Blender flattens 2D curves, so splines leaving the xy-plane must be 3D.
+        planar = not any(a[:, 2].any() for a in (co, handle_left, handle_right))
         curve_data = bpy.data.curves.new(name=name, type='CURVE')
-        curve_data.dimensions = '2D'
+        curve_data.dimensions = '2D' if planar else '3D'
         curve_data.resolution_u = DEFAULT_RESOLUTION
 
-        # Create a Bezier spline and add it to the curve
-        assert len(spline_points) > 1, 'A spline must contain at least 2 points.'
-        spline = curve_data.splines.new(type='BEZIER')
-        spline.bezier_points.add(
-            count=len(spline_points)-1)  # contains 1 already
+        co, handle_left, handle_right = self._create_spline(curve_data, co, handle_left, handle_right, type_values,
+                                                            adjust)
 
-        # Set the bezier points and handle types to 'auto'.
-        for i, pt in enumerate(spline_points):
-            assert isinstance(pt, (Vector, tuple)), 'Expected a 2D/3D vector.'
-            bpt = spline.bezier_points[i]
-            bpt.co = make_3d_vector(pt)
-            bpt.handle_left_type = 'AUTO'
-            bpt.handle_right_type = 'AUTO'
+        # Seed the geometry directly from the (possibly adjusted) input arrays.
+        self._geometry = self._create_geometry(co, handle_left, handle_right, planar=planar, lookup_tol=lookup_tol)
+        self._chord_tol: float = None  # Chord tolerance of the automatic resolution; None if disabled
 
         # Create a new object with the curve data and initialise base class (can only be done at this stage
         # because length must be computable).
@@ -62,25 +77,49 @@ class BezierSpline(Curve):
         # Set width and bias
         self.set_width(width)
         self.set_bias(bias)
+        self.compression_ratio: float = 1.0  # Number of fitted samples per spline point (see fit())
+
+    @classmethod
+    def from_arrays(cls, co: np.ndarray, handle_left: np.ndarray = None, handle_right: np.ndarray = None,
+                    handle_types: str | list[str] = None, **kwargs):
+        """Creates a spline from arrays of spline points and handles, which are written to Blender in bulk. This
+        is the fastest way to create long splines, e.g. imported paths or sampled plots.
+        Args:
+            co: An (N, 2|3) array of spline point locations.
+            handle_left: An optional (N, 2|3) array of left handle locations.
+            handle_right: An optional (N, 2|3) array of right handle locations.
+            handle_types: The handle type of all spline points, or a list of one type per point.
+            kwargs: Additional keyword arguments for the constructor, e.g. the width.
+        Returns:
+            The new spline.
+        """
+        return cls(co, handle_left=handle_left, handle_right=handle_right, handle_types=handle_types, **kwargs)
+
+    @classmethod
+    def fit(cls, points, tolerance: float = DEFAULT_FIT_TOLERANCE, **kwargs):
+        """Creates a spline with few points that passes within the given distance of dense samples, e.g. of a
+        plot, a traced path or imported data (see fit_bezier_spline()). The number of samples per spline point
+        is stored in the spline's compression_ratio.
+        Args:
+            points: An (N, 2|3) array of sample points.
+            tolerance: The maximum distance between the samples and the spline.
+            kwargs: Additional keyword arguments for the constructor, e.g. the width.
+        Returns:
+            The new spline.
+        """
+        points = as_point_array(points)
+        co, handle_left, handle_right = fit_bezier_spline(points, tolerance)
+        spline = cls.from_arrays(co, handle_left, handle_right, **kwargs)
+        spline.compression_ratio = len(points) / len(co)
+        return spline
 
     def set_width(self, width):
         super().set_width(width)
 
         assert self.object is not None, 'The base object has not yet been set.'
-        profile = self.object.data.bevel_object
-        hw = 0.5 * width
-        pts = [(-hw, 0), (hw, 0)]  # Centred about the origin
-
-        if profile is not None:
-            bpts = profile.data.splines[0].bezier_points
-            assert len(bpts) == 2, 'Expected a segment as the bevel profile.'
-            for i, pt in enumerate(pts):
-                bpts[i].co = make_3d_vector(pt)
-        else:
-            line_obj = add_line_segment('profile', *pts)
-            self.object.data.bevel_mode = 'OBJECT'
-            self.object.data.bevel_object = line_obj
-            line_obj.parent = self.object
+        # Curves of the same width share a profile, so the profile is swapped rather than edited.
+        self.object.data.bevel_mode = 'OBJECT'
+        self.object.data.bevel_object = profile_cache.swap(self.object.data.bevel_object, width)
 
         # Set same width for all children that are curves.
         for c in self.children:
@@ -98,15 +137,8 @@ class BezierSpline(Curve):
             if isinstance(c, Curve):
                 c.set_bias(bias)
 
-        update_params = (self._update_param_0, self._update_param_1)
-        for i, att in enumerate(self._attachments()):
-            if att is not None:
-                from .joints import Joint
-                if isinstance(att, Joint):
-                    update_params[i]()
-
-        # If there is an end attachment, update its location and orientation.
-        self._update_attachments()
+        # If there are end attachments, their placement must be updated.
+        self._defer_update('attachments')
 
         return self
 
@@ -130,23 +162,102 @@ class BezierSpline(Curve):
         return tangent.normalized() if normalise else tangent
 
     def normal(self, param: float, normalise=False) -> Vector:
-        assert self.object.data.dimensions == '2D'
+        if not self.geometry.planar:
+            return Vector(self.geometry.normals([param], normalise)[0])
         tang = self.tangent(param, normalise)
         return Vector((-tang.y, tang.x, tang.z))
 
-    def length(self, spl_param: float = 1.0) -> float:
-        bzr_param, bzr_index = \
-            self._bezier_curve_info(spl_param, is_len_fraction=False)
-        arc_len = self._bezier_length(bzr_index, bzr_param)
+    def points(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        return self.geometry.points(params, is_len_fraction)
+
+    def tangents(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        return self.geometry.tangents(params, normalise, is_len_fraction)
+
+    def normals(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        return self.geometry.normals(params, normalise, is_len_fraction)
+
+    def frames(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.geometry.frames(params, is_len_fraction)
+
+    def frame_at(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, ...]:
+        return self.geometry.frame_at(params, is_len_fraction)
+
+    def curvatures(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        return self.geometry.curvatures(params, is_len_fraction)
+
+    def resample_uniform(self, n: int = None, spacing: float = None, include_tangents: bool = True):
+        return self.geometry.resample_uniform(n, spacing, include_tangents)
+
+    def is_closed(self) -> bool:
+        return self._geometry.is_closed
 
-        cumu_len = self._cumu_bzr_lens[bzr_index]
-        assert cumu_len >= 0, 'Cumulative length not yet computed.'
+    def length(self, spl_param: float = 1.0) -> float:
+        return self.geometry.length_at(spl_param)
 
-        return cumu_len + arc_len
+    def u_from_s(self, lengths) -> np.ndarray:
+        """Computes the spline parameters associated to an array of arc lengths in [0, length]."""
+        return self.geometry.u_from_s(lengths)
 
     def spline_point(self, pt_index: int):
         return self._spline_points()[pt_index]
 
+    def sync_from_blender(self):
+        """Re-reads the spline points from the underlying Blender spline into the geometry. This must be called
+        after the spline is edited directly through Blender, i.e. outside of Anima."""
+        self._geometry.set_points(*self._read_spline_points())
+        self._geometry.planar = self.object.data.dimensions == '2D'
+        self._defer_update('length')
+        return self
+
+    def sync_to_blender(self):
+        """Writes the geometry's spline points to the underlying Blender spline. This must be called after the
+        geometry is edited directly, i.e. outside of Blender. The existing handle types are kept (new points get
+        'FREE' handles), so Blender adjusts any handles that are not 'FREE', which are then read back into the
+        geometry."""
+        geom = self._geometry
+        num_pts = geom.num_points
+        bpts = self._spline_points()
+        type_values = []
+        for side in ('left', 'right'):
+            values = np.full(len(bpts), HANDLE_TYPES['FREE'], dtype=np.int32)
+            bpts.foreach_get(f'handle_{side}_type', values)
+            values = np.concatenate((values, np.full(max(0, num_pts - len(values)), HANDLE_TYPES['FREE'])))
+            type_values.append(values[:num_pts].tolist())
+
+        # Blender splines cannot lose points, so the spline is replaced if the geometry has fewer.
+        if num_pts < len(bpts):
+            bpts = self._replace_spline(num_pts)
+        elif num_pts > len(bpts):
+            bpts.add(count=num_pts - len(bpts))
+
+        recompute = any(v != HANDLE_TYPES['FREE'] for values in type_values for v in values)
+        self._write_spline_points(bpts, geom.co, geom.handle_left, geom.handle_right, *type_values,
+                                  recompute=recompute)
+        if recompute:
+            geom.set_points(*self._read_spline_points(bpts))
+        self.object.data.update_tag()
+        self._defer_update('length')
+        return self
+
+    def reverse(self):
+        """Reverses the direction of the spline, so that its start point becomes its end point. The left and
+        right handles (and their types) of each spline point are swapped, so the shape is unchanged. The params
+        and attachments are not swapped."""
+        geom = self.geometry
+        bpts = self._spline_points()
+        type_values = []
+        for side in ('left', 'right'):
+            values = np.empty(len(bpts), dtype=np.int32)
+            bpts.foreach_get(f'handle_{side}_type', values)
+            type_values.append(values[::-1].tolist())
+
+        co, handle_left, handle_right = geom.co[::-1], geom.handle_right[::-1], geom.handle_left[::-1]
+        self._write_spline_points(bpts, co, handle_left, handle_right, type_values[1], type_values[0])
+        geom.set_points(co, handle_left, handle_right)
+        self.object.data.update_tag()
+        self._defer_update('length')
+        return self
+
     # Bezier geometry modifiers ---------------------------------------------------------------------------- #
 
     def set_left_handle(self, point_index: int, location, relative: bool = True):
@@ -173,14 +284,39 @@ class BezierSpline(Curve):
         return self
 
     def set_resolution(self, res: int):
+        self._chord_tol = None
         self.object.data.resolution_u = res
         return self
 
+    def auto_resolution(self, chord_tol: float = DEFAULT_CHORD_TOLERANCE):
+        """Sets the resolution to the smallest one for which Blender's tessellation of the spline deviates from
+        it by at most the given chord tolerance, so that straight and gently curved splines are not tessellated as
+        finely as tightly curved ones. The resolution is kept up to date as the geometry changes, until it is set
+        explicitly.
+        Args:
+            chord_tol: The maximum distance between the spline and its tessellation, in Blender units.
+        """
+        assert chord_tol > 0, 'The chord tolerance must be positive.'
+        self._chord_tol = chord_tol
+        self._update_resolution()
+        return self
+
     # Property getters/setters ----------------------------------------------------------------------------- #
 
+    @property
+    def geometry(self) -> CurveGeometry:
+        """Get the spline's geometry, which is independent of Blender. Any pending length update is performed
+        first."""
+        if self._pending_updates:
+            self._flush_updates('length')
+        return self._geometry
+
     @property
     def resolution(self) -> int:
-        """Get the curve's resolution (number of sub-division intervals)."""
+        """Get the curve's resolution (number of sub-division intervals). A pending automatic resolution is
+        applied first."""
+        if self._pending_updates:
+            self._flush_updates('length')
         return self.object.data.resolution_u
 
     @resolution.setter
@@ -196,40 +332,127 @@ class BezierSpline(Curve):
             A new BezierSpline object with the same properties as the original.
         """
         new_copy = super().__deepcopy__(memo)
-        new_bl_obj = new_copy.object
-        new_bl_obj.data.bevel_object = \
-            deepcopy_object(self.object.data.bevel_object)
-        new_bl_obj.data.bevel_object.parent = new_bl_obj
+        new_copy.object.data.bevel_object = profile_cache.acquire(self._width)
         return new_copy
 
     # Private methods -------------------------------------------------------------------------------------- #
 
-    def _control_points(self, bzr_index: int):
-        bpt0 = self.spline_point(bzr_index)
-        bpt1 = self.spline_point(bzr_index + 1)
-
-        p0 = bpt0.co
-        h0 = bpt0.handle_right
-        h1 = bpt1.handle_left
-        p1 = bpt1.co
+    def _create_spline(self, curve_data, co: np.ndarray, handle_left: np.ndarray, handle_right: np.ndarray,
+                       type_values: list[int], adjust: bool) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Creates the Blender spline and adds it to the curve data, writing its points in bulk. Returns the
+        spline points and handles, which Blender adjusted according to their types if requested."""
+        spline = curve_data.splines.new(type='BEZIER')
+        spline.bezier_points.add(count=len(co)-1)  # contains 1 already
+        self._write_spline_points(spline.bezier_points, co, handle_left, handle_right, type_values, type_values,
+                                  recompute=adjust)
+        if adjust:
+            co, handle_left, handle_right = self._read_spline_points(spline.bezier_points)
+        return co, handle_left, handle_right
+
+    def _create_geometry(self, co: np.ndarray, handle_left: np.ndarray, handle_right: np.ndarray,
+                         **kwargs) -> CurveGeometry:
+        """Creates the spline's geometry. Shapes with closed forms override this to return an AnalyticGeometry."""
+        return CurveGeometry(co, handle_left, handle_right, **kwargs)
 
+    def _control_points(self, bzr_index: int):
+        p0, h0, h1, p1 = (Vector(pt) for pt in self._geometry.ctrl_pts[bzr_index])
         return p0, h0, h1, p1
 
+    def _read_spline_points(self, bpts=None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Reads the locations and handles of all spline points from the Blender spline in bulk."""
+        bpts = self._spline_points() if bpts is None else bpts
+        num_pts = len(bpts)
+        co, handle_left, handle_right = (np.empty(3 * num_pts) for _ in range(3))
+        bpts.foreach_get('co', co)
+        bpts.foreach_get('handle_left', handle_left)
+        bpts.foreach_get('handle_right', handle_right)
+        return co.reshape(num_pts, 3), handle_left.reshape(num_pts, 3), handle_right.reshape(num_pts, 3)
+
+    @staticmethod
+    def _handle_type_values(handle_types: str | list[str], num_pts: int) -> list[int]:
+        """Converts a handle type, or a list of one handle type per point, into a list of Blender enum values."""
+        if isinstance(handle_types, str):
+            handle_types = [handle_types] * num_pts
+        assert len(handle_types) == num_pts, 'Expected a handle type for each spline point.'
+        for t in handle_types:
+            assert t.upper() in HANDLE_TYPES, f'Unrecognised handle type: {t}'
+        return [HANDLE_TYPES[t.upper()] for t in handle_types]
+
+    @staticmethod
+    def _write_spline_points(bpts, co: np.ndarray, handle_left: np.ndarray, handle_right: np.ndarray,
+                             left_types: list[int], right_types: list[int], recompute: bool = False):
+        """Writes the handle types, locations and handles of all spline points to the Blender spline in bulk.
+        Bulk writes do not make Blender recompute the handles, unless requested, in which case the handles that
+        are not 'FREE' are adjusted according to their types (and must be read back)."""
+        bpts.foreach_set('handle_left_type', left_types)
+        bpts.foreach_set('handle_right_type', right_types)
+        bpts.foreach_set('co', co.ravel())
+        bpts.foreach_set('handle_left', handle_left.ravel())
+        bpts.foreach_set('handle_right', handle_right.ravel())
+        if recompute:
+            # Writing a single point makes Blender recompute the handles of the whole spline.
+            bpts[0].co = bpts[0].co
+
+    def _replace_spline(self, num_pts: int):
+        """Replaces the Blender spline by a new one with the given number of points, keeping its settings.
+        Returns the new spline's points."""
+        splines = self.object.data.splines
+        old = splines[0]
+        settings = {k: getattr(old, k) for k in ('use_cyclic_u', 'use_smooth', 'resolution_u')}
+        splines.remove(old)
+        spline = splines.new(type='BEZIER')
+        for k, v in settings.items():
+            setattr(spline, k, v)
+        spline.bezier_points.add(count=num_pts - 1)
+        return spline.bezier_points
+
+    def _sync_point_from_blender(self, pt_index: int):
+        """Re-reads a single spline point and its handles from the Blender spline into the geometry."""
+        bpt = self.spline_point(pt_index)
+        self._geometry.set_point(pt_index, bpt.co, bpt.handle_left, bpt.handle_right)
+        self._defer_update('length')
+
+    def _num_bezier_curves(self) -> int:
+        return self._geometry.num_curves
+
     def _spline_points(self):
         return self.object.data.splines[0].bezier_points
 
+    def _set_spline_points(self, points: list[Vector | tuple]):
+        """Moves all spline points to the given locations and updates the stored geometry."""
+        bpts = self._spline_points()
+        assert len(points) == len(bpts), 'Expected a location for each spline point.'
+        points = [make_3d_vector(pt) for pt in points]
+        if any(pt.z != 0 for pt in points):
+            self.object.data.dimensions = '3D'
+        for bpt, pt in zip(bpts, points):
+            bpt.co = pt
+
+        # Geometry changed, so update stored values.
+        self.sync_from_blender()
+
+    def _closest_params(self, points) -> tuple[np.ndarray, np.ndarray]:
+        return self.geometry.closest_params(points)
+
+    def _bezier_control_points(self) -> np.ndarray:
+        return self.geometry.ctrl_pts
+
+    def _params_from_bezier(self, bzr_indices: np.ndarray, bzr_params: np.ndarray) -> np.ndarray:
+        geom = self.geometry
+        return geom.len_fractions((bzr_indices + bzr_params) / geom.num_curves)
+
     def _compute_spline_param(self, param: float, is_len_fraction: bool = True) -> float:
-        assert 0.0 <= param <= 1.0, f'Parameter must be in range [0, 1]. Got: {param:.3f}'
-        return self._get_u_from_s(param * self._length) if is_len_fraction else param
+        return self.geometry.spline_param(param, is_len_fraction)
 
     def _bezier_curve_info(self, param: float, is_len_fraction: bool = True) -> tuple[float, int]:
-        num_bzr = len(self._spline_points()) - 1
-        u = self._compute_spline_param(param, is_len_fraction)
-        val = u * num_bzr
-        bzr_index = min(math.floor(val), num_bzr - 1)
-        bzr_param = val - bzr_index
+        return self.geometry.curve_info(param, is_len_fraction)
+
+    def _compute_spline_params(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        return self.geometry.spline_params(params, is_len_fraction)
 
-        return bzr_param, bzr_index
+    def _bezier_curve_infos(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorised version of _bezier_curve_info(). Returns arrays of Bezier params and indices."""
+        return self.geometry.curve_infos(params, is_len_fraction)
 
     def _get_handle(self, side: str, point_index: int, relative: bool = True) -> Vector:
         assert side in ['LEFT', 'RIGHT']
@@ -246,17 +469,17 @@ class BezierSpline(Curve):
         setattr(pt, handle_str, pt.co + loc if relative else loc)
 
         # Length possibly changed, so update stored value.
-        self._update_length()
+        self._sync_point_from_blender(point_index)
 
     def _set_handle_type(self, side: str, point_index: int, type: str):
         pt = self.spline_point(point_index)
         assert side in ['LEFT', 'RIGHT']
-        assert type.upper() in ['FREE', 'ALIGNED', 'VECTOR', 'AUTO']
+        assert type.upper() in HANDLE_TYPES
         handle_type_str = 'handle_' + side.lower() + '_type'
         setattr(pt, handle_type_str, type.upper())
 
         # Length possibly changed, so update stored value.
-        self._update_length()
+        self._sync_point_from_blender(point_index)
 
     def _set_param(self, param: float, end_idx: int):
         super()._set_param(param, end_idx)
@@ -271,41 +494,18 @@ class BezierSpline(Curve):
             bf = self._compute_spline_param(param_offs)
             self.object.data.bevel_factor_end = bf
 
-    def _update_attachment(self, end_idx: int):
-        if end_idx == 0:
-            param = self._param_0
-            attmt = self._attachment_0
-            param_offs = self._compute_offset_param_0(param)
-        else:
-            param = self.param_1
-            attmt = self._attachment_1
-            param_offs = self._compute_offset_param_1(param)
-
-        if attmt is None:
-            return
-
-        if isinstance(attmt, Endcap):
-            # Set location
-            pt = self.point(param)
-            pt.z += SMALL_OFFSET
-            nm = self.normal(param_offs, normalise=True)
-            bias_offs = -self._bias * 0.5 * self._width * nm
-            attmt.location = pt + bias_offs
-
-            # Set orientation
-            pt_offs = self.point(param_offs)
-            pt_offs.z += SMALL_OFFSET  # appear above the curve
-            y_dir = pt - pt_offs
-            sgn = 1 if end_idx == 1 else -1
-            if math.isclose(param, param_offs, rel_tol=1e-4):
-                y_dir = sgn * self.tangent(param_offs)
+    def _update_attachments(self):
+        # Joints terminate the curve, so the end params must be re-applied.
+        from .joints import Joint
+        for i, att in enumerate(self._attachments()):
+            if isinstance(att, Joint):
+                getattr(self, f'_update_param_{i}')()
 
-            if self._dimension() == 2:
-                x_dir = rotate_90(y_dir, clockwise=True)
-            else:
-                x_dir = -sgn * self.normal(param_offs)
+        # If there is an end attachment, update its location and orientation.
+        super()._update_attachments()
 
-            attmt.set_orientation(x_dir, y_dir)
+    def _update_attachment(self, end_idx: int):
+        self._place_endcap(end_idx)
 
     def _bezier_tangent(self, bzr_index: int, param: float) -> Vector:
         p0, h0, h1, p1 = self._control_points(bzr_index)
@@ -314,69 +514,16 @@ class BezierSpline(Curve):
         return -3 * (1 - t)**2 * p0 + 3 * (1 - 4*t + 3*t_sq) * h0 + \
             3 * (2*t - 3*t_sq) * h1 + 3 * t_sq * p1
 
-    def _bezier_length(self, bzr_index: int, param: float = 1.0) -> float:
-        def integrand(t):
-            return self._bezier_tangent(bzr_index, t).magnitude
-
-        disable_print()  # Disable output regarding round-off errors
-        l = self._length
-        eps = RELATIVE_LENGTH_ERR * l if l > 0 else 1e-5
-        arc_len, err = integrate.quad(integrand, 0.0, param, epsabs=eps)
-        enable_print()
-
-        assert err < eps, 'Arc length computation failed.'
-        return arc_len
-
-    def _map_u_to_s(self):
-        num_pts = self._num_lookup_pts
-        spl_params = [-1.0]*num_pts
-        len_params = [-1.0]*num_pts
-
-        # Compute the lengths at uniformly distributed points.
-        du = 1.0 / (num_pts - 1)
-        for i in range(num_pts):
-            u = min(i*du, 1)
-            spl_params[i] = u
-            len_params[i] = self.length(u)
-
-        # Compute the extra parameters at spline points.
-        n_bzr_crv = len(self._spline_points()) - 1
-        num_bzr_pts = n_bzr_crv - 1  # Only the intermediate points are inserted
-        extra_spl_params = [-1.0]*num_bzr_pts
-        extra_len_params = [-1.0]*num_bzr_pts
-        du = 1 / n_bzr_crv
-        for i in range(num_bzr_pts):
-            u = (i + 1) * du
-            extra_spl_params[i] = u
-            extra_len_params[i] = self.length(u)
-        spl_params.extend(extra_spl_params)
-        len_params.extend(extra_len_params)
-
-        # Zip the lists together, sort based on first list, and unzip and then convert back to lists.
-        sorted_lists = zip(*sorted(zip(spl_params, len_params)))
-        spl_params, len_params = map(list, sorted_lists)
-
-        # Lastly, convert to numpy arrays.
-        self._spl_params = np.array(spl_params, dtype=float)
-        self._len_params = np.array(len_params, dtype=float)
-
-    def _get_u_from_s(self, s):
-        if not (0 <= s <= self._length):
-            raise Exception('The length parameter is out of bounds.')
-        return float(np.interp(s, self._len_params, self._spl_params))
-
-    def _dimension(self) -> int:
-        return int(self.object.data.dimensions[0])
-
     def _update_length(self):
-        n_bezier = len(self._spline_points()) - 1
-        self._cumu_bzr_lens = array('f', [-1]*n_bezier)
-        cumu_lens = self._cumu_bzr_lens
-
-        cumu_lens[0] = 0
-        for i in range(1, n_bezier):
-            cumu_lens[i] = cumu_lens[i - 1] + self._bezier_length(i - 1)
-
-        self._map_u_to_s()
-
-        super()._update_length()
+        # Updates the geometry's lookup table (only the stale Bezier curves in it). The total length is taken
+        # from the table so that a length fraction of 1 maps exactly onto the end of the spline.
+        self._length = self._geometry.update().length
+        self._length_inverse = reciprocal(self._length)
+        if self._chord_tol is not None:
+            self._update_resolution()
+
+    def _update_resolution(self):
+        """Sets the resolution required by the chord tolerance. Blender is only updated if it changed."""
+        res = clip(self._geometry.min_resolution(self._chord_tol), 1, MAX_RESOLUTION)
+        if self.object.data.resolution_u != res:
+            self.object.data.resolution_u = res
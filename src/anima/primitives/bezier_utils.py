@@ -0,0 +1,545 @@
+import numpy as np
+from functools import cache
+
+AUTO_HANDLE_FACTOR = 2.5614  # Blender's scaling of 'AUTO' handle lengths
+BROAD_PHASE_CHUNK = 1024  # Rows of curves per block of bounding box overlap tests
+DEFAULT_CURVATURE_SAMPLES = 17  # Per Bezier curve, for bounding its curvature
+DEFAULT_INTERSECTION_TOL = 1e-6
+DEFAULT_NEWTON_ITERATIONS = 8  # For closest point refinement
+DEFAULT_QUADRATURE_ORDER = 8
+DEFAULT_QUADRATURE_TOL = 1.0e-9  # Relative to the length of each integration interval
+MAX_QUADRATURE_DEPTH = 12
+MAX_SUBDIVISION_DEPTH = 40  # For intersections
+INTERSECTION_PARAM_TOL = 1e-7  # Bezier param distance below which two intersections are merged
+
+
+def bezier_points(ctrl_pts: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluate a batch of cubic Bezier curves at the given parameters.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1) for each evaluation.
+        t: An (N,) array of Bezier parameters in [0, 1].
+    Returns:
+        An (N, 3) array of points.
+    """
+    t = t[:, None]
+    _t = 1 - t
+    return _t**3 * ctrl_pts[:, 0] + 3 * _t**2 * t * ctrl_pts[:, 1] + \
+        3 * _t * t**2 * ctrl_pts[:, 2] + t**3 * ctrl_pts[:, 3]
+
+
+def bezier_tangents(ctrl_pts: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluate the (non-normalised) first derivatives of a batch of cubic Bezier curves.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1) for each evaluation.
+        t: An (N,) array of Bezier parameters in [0, 1].
+    Returns:
+        An (N, 3) array of tangents.
+    """
+    t = t[:, None]
+    t_sq = t * t
+    return -3 * (1 - t)**2 * ctrl_pts[:, 0] + 3 * (1 - 4*t + 3*t_sq) * ctrl_pts[:, 1] + \
+        3 * (2*t - 3*t_sq) * ctrl_pts[:, 2] + 3 * t_sq * ctrl_pts[:, 3]
+
+
+def bezier_second_derivatives(ctrl_pts: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluate the second derivatives of a batch of cubic Bezier curves.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1) for each evaluation.
+        t: An (N,) array of Bezier parameters in [0, 1].
+    Returns:
+        An (N, 3) array of second derivatives.
+    """
+    t = t[:, None]
+    return 6 * (1 - t) * (ctrl_pts[:, 0] - 2 * ctrl_pts[:, 1] + ctrl_pts[:, 2]) + \
+        6 * t * (ctrl_pts[:, 1] - 2 * ctrl_pts[:, 2] + ctrl_pts[:, 3])
+
+
+def bezier_curvatures(ctrl_pts: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluate the (unsigned) curvatures of a batch of cubic Bezier curves. The curvature is zero wherever the
+    first derivative vanishes.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1) for each evaluation.
+        t: An (N,) array of Bezier parameters in [0, 1].
+    Returns:
+        An (N,) array of curvatures.
+    """
+    d1 = bezier_tangents(ctrl_pts, t)
+    d2 = bezier_second_derivatives(ctrl_pts, t)
+    cross = np.linalg.norm(np.cross(d1, d2), axis=1)
+    speed_cb = np.linalg.norm(d1, axis=1)**3
+    return np.divide(cross, speed_cb, out=np.zeros_like(cross), where=speed_cb > 0)
+
+
+def bezier_closest_params(ctrl_pts: np.ndarray, t: np.ndarray, queries: np.ndarray,
+                          iterations: int = DEFAULT_NEWTON_ITERATIONS) -> np.ndarray:
+    """Refine initial guesses of the parameters of the points on a batch of cubic Bezier curves closest to the
+    given query points, using Newton's method on the squared distance. Parameters are clamped to [0, 1], and
+    steps are skipped wherever the squared distance is not locally convex.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1) for each query.
+        t: An (N,) array of initial Bezier parameters in [0, 1].
+        queries: An (N, 3) array of query points.
+        iterations: The number of Newton iterations.
+    Returns:
+        An (N,) array of refined Bezier parameters.
+    """
+    t = np.array(t, dtype=float)
+    for _ in range(iterations):
+        diff = bezier_points(ctrl_pts, t) - queries
+        d1 = bezier_tangents(ctrl_pts, t)
+        d2 = bezier_second_derivatives(ctrl_pts, t)
+        grad = np.einsum('ij,ij->i', diff, d1)
+        hess = np.einsum('ij,ij->i', d1, d1) + np.einsum('ij,ij->i', diff, d2)
+        step = np.divide(grad, hess, out=np.zeros_like(grad), where=hess > 0)
+        t = np.clip(t - step, 0.0, 1.0)
+    return t
+
+
+def bezier_split(ctrl_pts: np.ndarray, t: float = 0.5) -> tuple[np.ndarray, np.ndarray]:
+    """Split a batch of cubic Bezier curves at the given parameter, using de Casteljau's algorithm.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1).
+        t: The Bezier parameter in [0, 1] at which to split.
+    Returns:
+        The (N, 4, 3) arrays of control points of the curves before and after the split.
+    """
+    p0, h0, h1, p1 = (ctrl_pts[:, i] for i in range(4))
+    a = p0 + t * (h0 - p0)
+    b = h0 + t * (h1 - h0)
+    c = h1 + t * (p1 - h1)
+    ab = a + t * (b - a)
+    bc = b + t * (c - b)
+    mid = ab + t * (bc - ab)
+    return np.stack([p0, a, ab, mid], axis=1), np.stack([mid, bc, c, p1], axis=1)
+
+
+def bezier_intersections(ctrl_pts_0: np.ndarray, ctrl_pts_1: np.ndarray, tol: float = DEFAULT_INTERSECTION_TOL,
+                         max_depth: int = MAX_SUBDIVISION_DEPTH) \
+        -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Find the points where the curves of two batches of cubic Bezier curves cross. Candidate pairs of curves
+    are found by overlapping bounding boxes of their control points. The pairs are then subdivided together,
+    discarding sub-pairs whose boxes are disjoint, until both curves are flat within the tolerance. The chords
+    of flat pairs are intersected and the results refined with Newton's method. Overlapping (collinear)
+    stretches are not reported.
+    Args:
+        ctrl_pts_0: An (N, 4, 3) array of control points of the first batch.
+        ctrl_pts_1: An (M, 4, 3) array of control points of the second batch.
+        tol: The distance below which curves are considered to touch.
+        max_depth: The maximum number of subdivisions.
+    Returns:
+        The (K,) arrays of the curve indices and Bezier params of the intersections in the first batch, and
+        of those in the second batch. Intersections shared by consecutive curves (at common end points) are
+        reported once.
+    """
+    ctrl_pts_0 = np.asarray(ctrl_pts_0, dtype=float)
+    ctrl_pts_1 = np.asarray(ctrl_pts_1, dtype=float)
+    indices_0, indices_1 = _overlapping_boxes(ctrl_pts_0, ctrl_pts_1, tol)
+
+    # Subdivide the candidate pairs, keeping track of the Bezier param range of each sub-curve.
+    sub_0, sub_1 = ctrl_pts_0[indices_0], ctrl_pts_1[indices_1]
+    lo_0, lo_1 = np.zeros(len(indices_0)), np.zeros(len(indices_1))
+    size = 1.0
+    found = []
+    for depth in range(max_depth + 1):
+        if not len(indices_0):
+            break
+        flat = _are_flat(sub_0, tol) & _are_flat(sub_1, tol)
+        if depth == max_depth:
+            flat[:] = True
+        if flat.any():
+            s_0, s_1, hit = _chord_intersections(sub_0[flat], sub_1[flat], tol)
+            found.append((indices_0[flat][hit], lo_0[flat][hit] + size * s_0[hit],
+                          indices_1[flat][hit], lo_1[flat][hit] + size * s_1[hit]))
+        keep = ~flat
+        size *= 0.5
+        halves_0 = bezier_split(sub_0[keep])
+        halves_1 = bezier_split(sub_1[keep])
+        sub_0 = np.concatenate([halves_0[0], halves_0[0], halves_0[1], halves_0[1]])
+        sub_1 = np.concatenate([halves_1[0], halves_1[1], halves_1[0], halves_1[1]])
+        lo_0 = np.concatenate([lo_0[keep], lo_0[keep], lo_0[keep] + size, lo_0[keep] + size])
+        lo_1 = np.concatenate([lo_1[keep], lo_1[keep] + size, lo_1[keep], lo_1[keep] + size])
+        indices_0 = np.tile(indices_0[keep], 4)
+        indices_1 = np.tile(indices_1[keep], 4)
+        overlap = _boxes_overlap(_bounding_boxes(sub_0), _bounding_boxes(sub_1), tol)
+        sub_0, sub_1, lo_0, lo_1 = sub_0[overlap], sub_1[overlap], lo_0[overlap], lo_1[overlap]
+        indices_0, indices_1 = indices_0[overlap], indices_1[overlap]
+
+    if not found:
+        empty = np.zeros(0)
+        return empty.astype(int), empty, empty.astype(int), empty
+    indices_0, t_0, indices_1, t_1 = (np.concatenate(arrs) for arrs in zip(*found))
+    t_0, t_1 = _refine_intersections(ctrl_pts_0[indices_0], ctrl_pts_1[indices_1], t_0, t_1)
+
+    # Several sub-pairs (or consecutive curves) may find the same intersection. Compare them by their
+    # positions along each batch, seen as a spline. Near tangential intersections are poorly conditioned, so
+    # consecutive ones on the same pair of curves are also merged if the curves stay in contact between them.
+    order = np.lexsort((indices_1 + t_1, indices_0 + t_0))
+    indices_0, t_0, indices_1, t_1 = indices_0[order], t_0[order], indices_1[order], t_1[order]
+    u_0, u_1 = indices_0 + t_0, indices_1 + t_1
+    same = (np.abs(np.diff(u_0)) <= INTERSECTION_PARAM_TOL) & (np.abs(np.diff(u_1)) <= INTERSECTION_PARAM_TOL)
+    pair = (np.diff(indices_0) == 0) & (np.diff(indices_1) == 0)
+    if pair.any():
+        mid_gaps = np.linalg.norm(bezier_points(ctrl_pts_0[indices_0[1:]], 0.5 * (t_0[1:] + t_0[:-1])) -
+                                  bezier_points(ctrl_pts_1[indices_1[1:]], 0.5 * (t_1[1:] + t_1[:-1])), axis=1)
+        same |= pair & (mid_gaps <= tol)
+    keep = np.concatenate([[True], ~same])
+    return indices_0[keep], t_0[keep], indices_1[keep], t_1[keep]
+
+
+def bezier_resolutions(ctrl_pts: np.ndarray, chord_tol: float,
+                       num_samples: int = DEFAULT_CURVATURE_SAMPLES) -> np.ndarray:
+    """Compute the smallest number of uniform sub-divisions of each cubic Bezier curve for which the chords
+    deviate from the curve by at most the given tolerance. The deviation over a parameter interval of width h is
+    bounded by h^2 / 8 * K, where K is the maximum curvature times the maximum squared speed of the curve (so
+    straight curves need a single sub-division). The curvature is sampled, and K is capped by max|B''|, which
+    bounds the deviation strictly and is attained at one of the curve's ends, since B'' is linear.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1).
+        chord_tol: The maximum distance between the curve and its chords.
+        num_samples: The number of parameters at which the curvature of each curve is sampled.
+    Returns:
+        An (N,) array of resolutions, each at least 1.
+    """
+    assert chord_tol > 0, 'The chord tolerance must be positive.'
+    num_crvs = len(ctrl_pts)
+    d2_0 = np.linalg.norm(ctrl_pts[:, 0] - 2 * ctrl_pts[:, 1] + ctrl_pts[:, 2], axis=1)
+    d2_1 = np.linalg.norm(ctrl_pts[:, 1] - 2 * ctrl_pts[:, 2] + ctrl_pts[:, 3], axis=1)
+    max_d2 = 6 * np.maximum(d2_0, d2_1)
+
+    t = np.linspace(0, 1, num_samples)
+    sample_pts = np.repeat(ctrl_pts, num_samples, axis=0)
+    curvs = bezier_curvatures(sample_pts, np.tile(t, num_crvs)).reshape(num_crvs, num_samples)
+    speeds = bezier_speeds(ctrl_pts, np.broadcast_to(t, (num_crvs, num_samples)))
+    bound = np.minimum(max_d2, curvs.max(axis=1) * speeds.max(axis=1)**2)
+    return np.maximum(1, np.ceil(np.sqrt(bound / (8 * chord_tol)))).astype(int)
+
+
+def bezier_speeds(ctrl_pts: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Evaluate the speeds (i.e. the tangent magnitudes) of a batch of cubic Bezier curves at several
+    parameters each.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1).
+        t: An (N, K) array of Bezier parameters, with K parameters per curve.
+    Returns:
+        An (N, K) array of speeds.
+    """
+    # Control points of the (quadratic) derivative curve.
+    d0 = 3 * (ctrl_pts[:, None, 1] - ctrl_pts[:, None, 0])
+    d1 = 3 * (ctrl_pts[:, None, 2] - ctrl_pts[:, None, 1])
+    d2 = 3 * (ctrl_pts[:, None, 3] - ctrl_pts[:, None, 2])
+
+    t = t[..., None]
+    _t = 1 - t
+    return np.linalg.norm(_t * _t * d0 + 2 * _t * t * d1 + t * t * d2, axis=-1)
+
+
+def bezier_lengths(ctrl_pts: np.ndarray, t_0=0.0, t_1=1.0, tol: float = DEFAULT_QUADRATURE_TOL,
+                   order: int = DEFAULT_QUADRATURE_ORDER) -> np.ndarray:
+    """Compute the arc lengths of a batch of cubic Bezier curves over the parameter intervals [t_0, t_1]
+    using Gauss-Legendre quadrature. Intervals whose length estimate does not meet the tolerance are
+    adaptively bisected.
+    Args:
+        ctrl_pts: An (N, 4, 3) array of control points (p0, h0, h1, p1).
+        t_0: The start parameter(s) of the intervals. Either a scalar or an (N,) array.
+        t_1: The end parameter(s) of the intervals. Either a scalar or an (N,) array.
+        tol: The tolerance relative to each interval's length. If None, no subdivision is performed.
+        order: The number of quadrature points per interval.
+    Returns:
+        An (N,) array of arc lengths.
+    """
+    num_crvs = len(ctrl_pts)
+    t_0 = np.broadcast_to(np.asarray(t_0, dtype=float), (num_crvs,))
+    t_1 = np.broadcast_to(np.asarray(t_1, dtype=float), (num_crvs,))
+
+    lengths = _gauss_legendre_lengths(ctrl_pts, t_0, t_1, order)
+    if tol is None or num_crvs == 0:
+        return lengths
+    return _refine_lengths(ctrl_pts, t_0, t_1, lengths, tol, order, MAX_QUADRATURE_DEPTH)
+
+
+def planar_normals(tangents: np.ndarray) -> np.ndarray:
+    """Rotate a batch of 2D tangents by 90 degrees counter-clockwise about the z-axis.
+    Args:
+        tangents: An (N, 3) array of tangents lying in the xy-plane.
+    Returns:
+        An (N, 3) array of normals.
+    """
+    return np.stack((-tangents[:, 1], tangents[:, 0], tangents[:, 2]), axis=1)
+
+
+def rotation_minimising_normals(tangents: np.ndarray, normal_0: np.ndarray) -> np.ndarray:
+    """Transport a normal along a sequence of unit tangents by the minimal rotations between consecutive
+    tangents (i.e. parallel transport), which gives rotation minimising frames. Rather than composing the
+    rotations, the normals are expressed as angles about the tangents, relative to reference normals, and the
+    twists between consecutive reference normals are accumulated.
+    Args:
+        tangents: An (N, 3) array of unit tangents, e.g. at increasing params along a curve.
+        normal_0: A unit normal orthogonal to the first tangent.
+    Returns:
+        An (N, 3) array of unit normals, orthogonal to the tangents.
+    """
+    # Reference normals, orthogonal to the coordinate axes along which the tangents are smallest.
+    axes = np.zeros_like(tangents, dtype=float)
+    axes[np.arange(len(tangents)), np.abs(tangents).argmin(axis=1)] = 1.0
+    refs = normalise_rows(np.cross(axes, tangents))
+
+    # Apply the minimal rotations to the reference normals, then measure their twists w.r.t. the next ones.
+    t_0, t_1, r_0, r_1 = tangents[:-1], tangents[1:], refs[:-1], refs[1:]
+    axes = np.cross(t_0, t_1)
+    denoms = 1.0 + np.einsum('ij,ij->i', t_0, t_1)
+    scales = np.divide(np.einsum('ij,ij->i', axes, r_0), denoms, out=np.zeros_like(denoms), where=denoms > 1e-12)
+    rotated = (denoms - 1.0)[:, None] * r_0 + np.cross(axes, r_0) + scales[:, None] * axes
+    twists = np.arctan2(np.einsum('ij,ij->i', np.cross(rotated, r_1), t_1), np.einsum('ij,ij->i', rotated, r_1))
+
+    # Angles of the normals about the tangents, from the reference normals.
+    angle_0 = np.arctan2(np.dot(np.cross(refs[0], normal_0), tangents[0]), np.dot(refs[0], normal_0))
+    angles = angle_0 - np.concatenate(([0.0], np.cumsum(twists)))
+    return np.cos(angles)[:, None] * refs + np.sin(angles)[:, None] * np.cross(tangents, refs)
+
+
+def normalise_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normalise each row of an (N, 3) array. Zero rows are left untouched.
+    Args:
+        vectors: An (N, 3) array of vectors.
+    Returns:
+        An (N, 3) array of unit vectors.
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.array(vectors, dtype=float), where=norms > 0)
+
+
+def fill_degenerate_rows(vectors: np.ndarray, tol: float = 1e-12) -> np.ndarray:
+    """Replace the (near) zero rows of an (N, 3) array with the nearest preceding non-zero row, or the nearest
+    following one at the start. Rows are left untouched if all of them are zero.
+    Args:
+        vectors: An (N, 3) array of vectors, e.g. sampled tangents.
+        tol: The norm below which a row is considered to be zero.
+    Returns:
+        An (N, 3) array of vectors.
+    """
+    valid = np.linalg.norm(vectors, axis=1) > tol
+    if valid.all() or not valid.any():
+        return vectors
+    indices = np.where(valid, np.arange(len(vectors)), 0)
+    indices = np.maximum.accumulate(indices)
+    indices[:np.argmax(valid)] = np.argmax(valid)
+    return vectors[indices]
+
+
+def as_point_array(points) -> np.ndarray:
+    """Convert a sequence or array of 2D and/or 3D points into an (N, 3) float array, with z = 0 for 2D points.
+    Args:
+        points: An (N, 2) or (N, 3) array, or a sequence of 2D/3D points (e.g. tuples or Vectors).
+    Returns:
+        An (N, 3) float array of points.
+    """
+    try:
+        points = np.asarray(points, dtype=float)
+    except ValueError:  # A mix of 2D and 3D points
+        points = np.array([tuple(pt) + (0.0,) * (3 - len(pt)) for pt in points], dtype=float)
+    assert points.ndim == 2 and points.shape[1] in (2, 3), 'Expected an (N, 2) or (N, 3) array of points.'
+    if points.shape[1] == 2:
+        points = np.column_stack((points, np.zeros(len(points))))
+    return points
+
+
+def auto_handles(co: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the handles of an open spline whose points all have 'AUTO' handles, as Blender does. The
+    computation is carried out in single precision, like Blender's, so that the results are identical.
+    Args:
+        co: An (N, 3) array of spline point locations, with N > 1.
+    Returns:
+        The (N, 3) arrays of left and right handle locations.
+    """
+    f32 = np.float32
+    co = co.astype(f32)
+
+    # The missing neighbours of the end points are mirrored.
+    prev_co = np.concatenate((f32(2) * co[:1] - co[1:2], co[:-1]))
+    next_co = np.concatenate((co[1:], f32(2) * co[-1:] - co[-2:-1]))
+    d_a = co - prev_co
+    d_b = next_co - co
+    len_a = np.sqrt((d_a * d_a).sum(axis=1, dtype=f32))
+    len_b = np.sqrt((d_b * d_b).sum(axis=1, dtype=f32))
+    len_a[len_a == 0] = 1
+    len_b[len_b == 0] = 1
+
+    tangs = d_b / len_b[:, None] + d_a / len_a[:, None]
+    tang_len = np.sqrt((tangs * tangs).sum(axis=1, dtype=f32)) * f32(AUTO_HANDLE_FACTOR)
+    tang_len[tang_len == 0] = 1
+
+    # The handle lengths are limited to five times the length of the opposite handle.
+    len_a, len_b = np.minimum(len_a, f32(5) * len_b), np.minimum(len_b, f32(5) * len_a)
+    handle_left = co + tangs * (-len_a / tang_len)[:, None]
+    handle_right = co + tangs * (len_b / tang_len)[:, None]
+    return handle_left.astype(float), handle_right.astype(float)
+
+
+def as_spline_points(spline) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert the points of a spline, given either as an (N, 2|3) array of spline points (whose handles are
+    computed as Blender's 'AUTO' handles) or as a tuple of such arrays of points and of their left and right
+    handles, into (N, 3) float arrays.
+    Args:
+        spline: The spline points, or a tuple of the spline points and their left and right handles.
+    Returns:
+        The (N, 3) arrays of spline points and of their left and right handles.
+    """
+    if isinstance(spline, tuple):
+        co, handle_left, handle_right = (as_point_array(a) for a in spline)
+        assert len(co) == len(handle_left) == len(handle_right), 'Expected both handles for each spline point.'
+        return co, handle_left, handle_right
+    co = as_point_array(spline)
+    return (co,) + auto_handles(co)
+
+
+def spline_points_from_control_points(ctrl_pts: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert the control points of consecutive Bezier curves into the spline points of a Bezier spline.
+    Args:
+        ctrl_pts: An (n_curves, 4, 3) array of control points (p0, h0, h1, p1) of each Bezier curve.
+    Returns:
+        The (n_curves + 1, 3) arrays of spline points and of their left and right handles. The outer handles of
+        the end points mirror the inner ones.
+    """
+    co = np.concatenate((ctrl_pts[:, 0], ctrl_pts[-1:, 3]))
+    handle_left = np.concatenate((2 * ctrl_pts[:1, 0] - ctrl_pts[:1, 1], ctrl_pts[:, 2]))
+    handle_right = np.concatenate((ctrl_pts[:, 1], 2 * ctrl_pts[-1:, 3] - ctrl_pts[-1:, 2]))
+    return co, handle_left, handle_right
+
+
+def as_param_array(params) -> np.ndarray:
+    """Convert a scalar or sequence of curve parameters into a 1D float array, checking their range.
+    Args:
+        params: A scalar, sequence or array of parameters.
+    Returns:
+        A 1D float array of parameters.
+    """
+    params = np.atleast_1d(np.asarray(params, dtype=float))
+    assert params.ndim == 1, 'Expected a 1D array of parameters.'
+    assert np.all((0.0 <= params) & (params <= 1.0)), \
+        'Parameters must be in range [0, 1].'
+    return params
+
+
+@cache
+def _gauss_legendre_rule(order: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the Gauss-Legendre nodes and weights on [-1, 1] for the given order."""
+    return np.polynomial.legendre.leggauss(order)
+
+
+def _gauss_legendre_lengths(ctrl_pts: np.ndarray, t_0: np.ndarray, t_1: np.ndarray, order: int) -> np.ndarray:
+    """Fixed-order Gauss-Legendre arc lengths of each curve over its interval [t_0, t_1]."""
+    nodes, weights = _gauss_legendre_rule(order)
+    half = 0.5 * (t_1 - t_0)
+    t = (0.5 * (t_0 + t_1))[:, None] + half[:, None] * nodes
+    return half * (bezier_speeds(ctrl_pts, t) @ weights)
+
+
+def _refine_lengths(ctrl_pts: np.ndarray, t_0: np.ndarray, t_1: np.ndarray, coarse: np.ndarray, tol: float,
+                    order: int, depth: int) -> np.ndarray:
+    """Bisects each interval and recurses on those whose halves disagree with the coarse estimate."""
+    t_mid = 0.5 * (t_0 + t_1)
+    left = _gauss_legendre_lengths(ctrl_pts, t_0, t_mid, order)
+    right = _gauss_legendre_lengths(ctrl_pts, t_mid, t_1, order)
+    fine = left + right
+
+    bad = np.abs(fine - coarse) > tol * np.abs(fine)
+    if depth == 0 or not bad.any():
+        return fine
+
+    fine[bad] = \
+        _refine_lengths(ctrl_pts[bad], t_0[bad], t_mid[bad], left[bad], tol, order, depth - 1) + \
+        _refine_lengths(ctrl_pts[bad], t_mid[bad], t_1[bad], right[bad], tol, order, depth - 1)
+    return fine
+
+
+def _bounding_boxes(ctrl_pts: np.ndarray) -> np.ndarray:
+    """Computes the (N, 2, 3) axis-aligned bounding boxes of the control points of a batch of Bezier curves."""
+    return np.stack([ctrl_pts.min(axis=1), ctrl_pts.max(axis=1)], axis=1)
+
+
+def _boxes_overlap(boxes_0: np.ndarray, boxes_1: np.ndarray, tol: float) -> np.ndarray:
+    """Tests whether the (broadcastable) boxes overlap, within the given tolerance."""
+    return np.all((boxes_0[..., 0, :] <= boxes_1[..., 1, :] + tol) &
+                  (boxes_1[..., 0, :] <= boxes_0[..., 1, :] + tol), axis=-1)
+
+
+def _overlapping_boxes(ctrl_pts_0: np.ndarray, ctrl_pts_1: np.ndarray, tol: float) -> tuple[np.ndarray, np.ndarray]:
+    """Finds the index pairs of the curves of two batches whose bounding boxes overlap. The pairs are tested in
+    blocks, to bound the memory use."""
+    boxes_0 = _bounding_boxes(ctrl_pts_0)
+    boxes_1 = _bounding_boxes(ctrl_pts_1)
+    indices_0, indices_1 = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)]
+    for start in range(0, len(boxes_0), BROAD_PHASE_CHUNK):
+        block = boxes_0[start:start + BROAD_PHASE_CHUNK]
+        rows, cols = np.nonzero(_boxes_overlap(block[:, None], boxes_1[None], tol))
+        indices_0.append(rows + start)
+        indices_1.append(cols)
+    return np.concatenate(indices_0), np.concatenate(indices_1)
+
+
+def _are_flat(ctrl_pts: np.ndarray, tol: float) -> np.ndarray:
+    """Tests whether the handles of a batch of Bezier curves lie within the given distance of their chords,
+    which bounds the distance of the curves to their chords."""
+    p0, p1 = ctrl_pts[:, 0], ctrl_pts[:, 3]
+    chord = p1 - p0
+    chord_sq = np.einsum('ij,ij->i', chord, chord)
+    dists_sq = []
+    for h in (ctrl_pts[:, 1], ctrl_pts[:, 2]):
+        rel = h - p0
+        proj = np.divide(np.einsum('ij,ij->i', rel, chord), chord_sq, out=np.zeros_like(chord_sq),
+                         where=chord_sq > 0)
+        off = rel - np.clip(proj, 0.0, 1.0)[:, None] * chord
+        dists_sq.append(np.einsum('ij,ij->i', off, off))
+    return np.maximum(*dists_sq) <= tol * tol
+
+
+def _chord_intersections(ctrl_pts_0: np.ndarray, ctrl_pts_1: np.ndarray, tol: float) \
+        -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Intersects the chords of pairs of Bezier curves. Returns the params along both chords of their closest
+    points, and whether these are within the tolerance. Parallel chords are never considered to intersect."""
+    p, d = ctrl_pts_0[:, 0], ctrl_pts_0[:, 3] - ctrl_pts_0[:, 0]
+    q, e = ctrl_pts_1[:, 0], ctrl_pts_1[:, 3] - ctrl_pts_1[:, 0]
+    r = p - q
+    dd = np.einsum('ij,ij->i', d, d)
+    ee = np.einsum('ij,ij->i', e, e)
+    de = np.einsum('ij,ij->i', d, e)
+    dr = np.einsum('ij,ij->i', d, r)
+    er = np.einsum('ij,ij->i', e, r)
+    denom = dd * ee - de * de
+    valid = denom > 1e-12 * dd * ee
+    safe = np.where(valid, denom, 1.0)
+    s = np.clip((de * er - ee * dr) / safe, 0.0, 1.0)
+    t = np.clip((dd * er - de * dr) / safe, 0.0, 1.0)
+    gap = p + s[:, None] * d - q - t[:, None] * e
+    hit = valid & (np.einsum('ij,ij->i', gap, gap) <= tol * tol)
+    return s, t, hit
+
+
+def _refine_intersections(ctrl_pts_0: np.ndarray, ctrl_pts_1: np.ndarray, t_0: np.ndarray, t_1: np.ndarray,
+                          iterations: int = DEFAULT_NEWTON_ITERATIONS) -> tuple[np.ndarray, np.ndarray]:
+    """Refines the params of intersections of pairs of Bezier curves with Gauss-Newton steps, which minimise
+    the distance between the points of both curves. Steps that would increase the distance are rejected."""
+    def gaps(s, t):
+        return bezier_points(ctrl_pts_0, s) - bezier_points(ctrl_pts_1, t)
+
+    gap = gaps(t_0, t_1)
+    for _ in range(iterations):
+        d_0 = bezier_tangents(ctrl_pts_0, t_0)
+        d_1 = -bezier_tangents(ctrl_pts_1, t_1)
+        a = np.einsum('ij,ij->i', d_0, d_0)
+        b = np.einsum('ij,ij->i', d_0, d_1)
+        c = np.einsum('ij,ij->i', d_1, d_1)
+        g_0 = np.einsum('ij,ij->i', d_0, gap)
+        g_1 = np.einsum('ij,ij->i', d_1, gap)
+        det = a * c - b * b
+        safe = np.where(det > 0, det, 1.0)
+        step_0 = np.where(det > 0, (c * g_0 - b * g_1) / safe, 0.0)
+        step_1 = np.where(det > 0, (a * g_1 - b * g_0) / safe, 0.0)
+        new_0 = np.clip(t_0 - step_0, 0.0, 1.0)
+        new_1 = np.clip(t_1 - step_1, 0.0, 1.0)
+        new_gap = gaps(new_0, new_1)
+        better = np.einsum('ij,ij->i', new_gap, new_gap) < np.einsum('ij,ij->i', gap, gap)
+        t_0 = np.where(better, new_0, t_0)
+        t_1 = np.where(better, new_1, t_1)
+        gap = np.where(better[:, None], new_gap, gap)
+    return t_0, t_1
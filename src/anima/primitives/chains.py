@@ -1,9 +1,19 @@
 import math
-import bisect
+import numpy as np
+from scipy.spatial import cKDTree
+from .bezier_utils import as_param_array, as_point_array, fill_degenerate_rows, normalise_rows
+from .curve_geometry import locate_lengths, uniform_params
+from .bezier_spline import DEFAULT_CHORD_TOLERANCE, BezierSpline
 from .curves import Curve, DEFAULT_LINE_WIDTH
 from .joints import Joint, RoundJoint, DEFAULT_LINE_WIDTH
+from .merged_chain import MergedCurveChain
 from anima.globals.general import Vector, are_vectors_close, reciprocal, clip
 
+CLOSEST_SAMPLES = 16  # Per entity, in the index of the nearest point queries
+CLOSEST_CANDIDATES = 3  # Number of indexed samples whose entities are searched per nearest point query
+FRAME_SIZES = {'frames': 3, 'frame_at': 4}  # Number of arrays returned by the entities' frame queries
+DEFAULT_ASSEMBLY_TOL = 1e-6  # Maximum distance between the end points of curves that are joined by assemble()
+
 
 class CurveChain(Curve):
     def __init__(self, curves: list[type[Curve]], width: float = DEFAULT_LINE_WIDTH, bias: float = 0.0,
@@ -13,9 +23,16 @@ class CurveChain(Curve):
                 "The curves in a curve chain cannot be joints."
         self._curves: list[type[Curve]] = curves
         self._joints: list[type[Joint]] = []
-        self._cumu_lengths: list[float] = []
+        self._entities: tuple[type[Curve], ...] = ()  # Curves interleaved with the joints between them
+        self._cumu_lengths: np.ndarray = None  # Arc length (excluding end offsets) at the start of each entity
+        self._entity_lengths: np.ndarray = None  # Length of each entity
+        self._length_inverses: np.ndarray = None  # Inverse length of each entity
+        self._start_offsets: np.ndarray = None  # Distance by which the start of each entity is offset
+        self._end_offsets: np.ndarray = None  # Distance by which the end of each entity is offset
+        self._entity_revisions: np.ndarray = None  # Revisions of the entities when their lengths were stored
         self._curve_0_idx: int = None
         self._curve_1_idx: int = None
+        self._closest_index: tuple[cKDTree, np.ndarray] = None  # Sample tree, entity indices
 
         # Initialise joints.
         for curve_1, curve_2 in zip(curves, curves[1:]):
@@ -23,6 +40,7 @@ class CurveChain(Curve):
                 f"The end-point of the first curve must be the start-point for the second."
             joint = RoundJoint(curve_1, curve_2)
             self._joints.append(joint)
+        self._entities = tuple(crv for pair in zip(curves, self._joints) for crv in pair) + tuple(curves[-1:])
 
         # Set indices of curves 0 and 1.
         self._curve_0_idx = 0
@@ -38,15 +56,92 @@ class CurveChain(Curve):
         self.set_width(width)
         self.set_bias(bias)
 
+    @classmethod
+    def assemble(cls, curves: list[type[Curve]], tol: float = DEFAULT_ASSEMBLY_TOL, **kwargs) -> list['CurveChain']:
+        """Assembles unordered curves (e.g. the segments of imported paths or traced contours) into chains. The
+        end points of all curves are indexed in a k-d tree, and the closest pairs of end points within the
+        tolerance are joined, each end point to at most one other. Curves are reversed where necessary, and the
+        start point of each joined curve is snapped onto the end point of the previous one.
+        Args:
+            curves: The curves, which must be Bezier splines (e.g. segments, arcs or polylines).
+            tol: The maximum distance between two end points that are joined.
+            kwargs: Additional keyword arguments for the constructor of each chain, e.g. the width.
+        Returns:
+            A list of chains, one per connected set of curves: first the open chains, then the closed ones. The
+            curves of a closed chain start and end at the same point (where no joint is added).
+        """
+        assert len(curves) > 0, 'At least 1 curve is required.'
+        for c in curves:
+            assert isinstance(c, BezierSpline), 'Only Bezier splines can be assembled into chains.'
+
+        # End point 2i (2i + 1) is the start (end) point of curve i. Each end point is paired with the closest
+        # available one, so that branches are cut rather than merged.
+        ends = np.concatenate([c.points([0.0, 1.0]) for c in curves])
+        pairs = cKDTree(ends).query_pairs(tol, output_type='ndarray')
+        pairs = pairs[np.argsort(np.linalg.norm(ends[pairs[:, 0]] - ends[pairs[:, 1]], axis=1), kind='stable')]
+        partners = np.full(len(ends), -1)
+        for i, j in pairs.tolist():
+            if partners[i] < 0 and partners[j] < 0:
+                partners[i], partners[j] = j, i
+
+        # Walk the open sequences from their free end points, then the cycles from any of their curves.
+        visited = np.zeros(len(curves), dtype=bool)
+        sequences = []
+        starts = np.concatenate((np.flatnonzero(partners < 0), 2 * np.arange(len(curves))))
+        for start in starts.tolist():
+            if visited[start // 2]:
+                continue
+            sequence = []
+            end = start
+            while end >= 0 and not visited[end // 2]:
+                visited[end // 2] = True
+                sequence.append(end)
+                end = partners[end ^ 1]
+            sequences.append(sequence)
+
+        chains = []
+        for sequence in sequences:
+            ordered = []
+            for end in sequence:
+                crv = curves[end // 2]
+                if end % 2:
+                    crv.reverse()
+                if ordered:
+                    cls._snap_start(crv, ordered[-1].geometry.co[-1])
+                ordered.append(crv)
+            if len(ordered) > 1 and partners[sequence[-1] ^ 1] == sequence[0]:
+                cls._snap_start(ordered[0], ordered[-1].geometry.co[-1])
+            chains.append(cls(ordered, **kwargs))
+        return chains
+
+    @staticmethod
+    def merged(curves: list, **kwargs) -> MergedCurveChain:
+        """Creates a chain of the given curves merged into a single Blender spline (see MergedCurveChain), which
+        is much lighter than a CurveChain for chains of many curves.
+        Args:
+            curves: The consecutive curves, as Bezier splines or arrays of spline points.
+            kwargs: Additional keyword arguments for the MergedCurveChain constructor, e.g. the width.
+        Returns:
+            The merged chain.
+        """
+        return MergedCurveChain(curves, **kwargs)
+
     def set_width(self, width: float):
         for c in self._all_entities:
             c.set_width(width)
-        self._update_length()
+        self._defer_update('length')
 
     def set_bias(self, bias: float):
         for c in self._all_entities:
             c.set_bias(bias)
-        self._update_length()
+        self._defer_update('length')
+
+    def auto_resolution(self, chord_tol: float = DEFAULT_CHORD_TOLERANCE):
+        """Keeps the resolution of each curve in the chain adapted to its curvature. See
+        BezierSpline.auto_resolution()."""
+        for c in self._curves:
+            c.auto_resolution(chord_tol)
+        return self
 
     def point(self, t: float) -> Vector:
         crv, _, t = self._compute_curve_info(t)
@@ -60,17 +155,43 @@ class CurveChain(Curve):
         crv, _, t = self._compute_curve_info(t)
         return crv.normal(t, normalise)
 
+    def points(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        return self._dispatch_to_entities(('points',), params, is_len_fraction)[0]
+
+    def tangents(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        return self._dispatch_to_entities(('tangents',), params, is_len_fraction, normalise=normalise)[0]
+
+    def normals(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        return self._dispatch_to_entities(('normals',), params, is_len_fraction, normalise=normalise)[0]
+
+    def frames(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._dispatch_to_entities(('frames',), params, is_len_fraction)
+
+    def frame_at(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, ...]:
+        return self._dispatch_to_entities(('frame_at',), params, is_len_fraction)
+
+    def curvatures(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        return self._dispatch_to_entities(('curvatures',), params, is_len_fraction)[0][:, 0]
+
+    def resample_uniform(self, n: int = None, spacing: float = None, include_tangents: bool = True):
+        # Locate all samples in one pass, and evaluate each entity once. Samples at degenerate points (e.g. the
+        # ends of a zero-length joint path) take their tangents from the neighbouring samples.
+        params = uniform_params(self._length, n, spacing, self.is_closed())
+        methods = ('points', 'tangents') if include_tangents else ('points',)
+        res = self._dispatch_to_entities(methods, params)
+        if not include_tangents:
+            return res[0]
+        return res[0], normalise_rows(fill_degenerate_rows(res[1]))
+
     def length(self, t: float = 1.0) -> float:
         assert 0.0 <= t <= 1.0, f'Parameter must be in range [0, 1]. Got: {t:.3f}'
         return t * self._length
 
     # Private methods -------------------------------------------------------------------------------------- #
     @property
-    def _all_entities(self) -> list[type[Curve]]:
-        """Attributes to exclude from deep copying"""
-        curves = self._curves
-        joints = self._joints
-        return [crv for pair in zip(curves, joints) for crv in pair] + curves[-1:]
+    def _all_entities(self) -> tuple[type[Curve], ...]:
+        """The curves interleaved with the joints between them."""
+        return self._entities
 
     def _set_param(self, param: float, end_idx: int):
         param_old = getattr(self, f'param_{end_idx}')
@@ -90,48 +211,171 @@ class CurveChain(Curve):
             for c in curves[idx_: idx]:
                 c._set_param(1, end_idx)
 
+    @staticmethod
+    def _snap_start(crv: BezierSpline, point: np.ndarray):
+        """Moves the start point of a curve, together with its handles, onto the given point."""
+        geom = crv.geometry
+        offset = point - geom.co[0]
+        if not offset.any():
+            return
+        co, handle_left, handle_right = geom.co.copy(), geom.handle_left.copy(), geom.handle_right.copy()
+        for a in (co, handle_left, handle_right):
+            a[0] += offset
+        geom.set_points(co, handle_left, handle_right)
+        crv.sync_to_blender()
+
+    def _begin_batch(self):
+        for c in self._all_entities:
+            c._begin_batch()
+        super()._begin_batch()
+
+    def _end_batch(self):
+        # The joints depend on the curves, and the chain depends on both.
+        for c in self._curves + self._joints:
+            c._end_batch()
+        super()._end_batch()
+
     def _update_attachment(self, end_index: int):
-        # todo
-        super()._update_attachment(end_index)
+        self._place_endcap(end_index)
 
     def _compute_curve_info(self, param: float) -> tuple[type[Curve], int, float]:
+        arc_len = param * self._length
         cumu_lens = self._cumu_lengths
-        sz = len(cumu_lens)
+        idx = int(np.searchsorted(cumu_lens, arc_len, side='left')) - 1
+        idx = clip(idx, 0, len(cumu_lens) - 1)
+        crv_param = (arc_len + self._start_offsets[idx] - cumu_lens[idx]) * self._length_inverses[idx]
+        crv_param = clip(float(crv_param), 0, 1)
+        return self._entities[idx], idx, crv_param
 
-        arc_len = param * self._length
-        idx = bisect.bisect_left(cumu_lens, arc_len) - 1
-        idx = clip(idx, 0, sz - 1)
+    def _compute_curve_infos(self, params, is_len_fraction: bool = True) \
+            -> tuple[list[type[Curve]], np.ndarray, np.ndarray]:
+        """Vectorised version of _compute_curve_info(). Returns the candidate entities, and the entity index
+        and local parameter for each of the given parameters. If the parameters are not length fractions, they
+        are distributed uniformly over the curves (excluding joints), analogous to a Bezier spline's segments."""
+        params = as_param_array(params)
+        if not is_len_fraction:
+            curves = self._curves
+            val = params * len(curves)
+            indices = np.minimum(np.floor(val).astype(int), len(curves) - 1)
+            return curves, indices, val - indices
+
+        arc_lens = params * self._length
+        indices, crv_params = locate_lengths(arc_lens, self._cumu_lengths, self._start_offsets,
+                                             self._length_inverses)
+        return self._entities, indices, crv_params
+
+    def _dispatch_to_entities(self, methods: tuple[str, ...], params, is_len_fraction: bool = True, **kwargs) \
+            -> tuple[np.ndarray, ...]:
+        """Evaluates the given batch methods once per entity over the parameters that map to it, and scatters the
+        results back into (N, 3) arrays (in order, with 'frames' and 'frame_at' producing three and four). Scalar
+        results (e.g. curvatures) are stored in the first column."""
+        entities, indices, crv_params = self._compute_curve_infos(params, is_len_fraction)
+        num_outputs = sum(FRAME_SIZES.get(m, 1) for m in methods)
+        outputs = tuple(np.empty((len(indices), 3)) for _ in range(num_outputs))
+        for idx in np.unique(indices):
+            mask = indices == idx
+            res = []
+            for m in methods:
+                r = getattr(entities[idx], m)(crv_params[mask], is_len_fraction=is_len_fraction, **kwargs)
+                res.extend(r if isinstance(r, tuple) else (r,))
+            for out, r in zip(outputs, res):
+                out[mask] = r if r.ndim == 2 else r[:, None]
+        return outputs
+
+    def _closest_params(self, points) -> tuple[np.ndarray, np.ndarray]:
+        # Only search the entities of the indexed samples nearest to each query point, and only within their
+        # visible parts.
+        queries = as_point_array(points)
+        num_queries = len(queries)
+        tree, sample_indices = self._get_closest_index()
+        num_cands = min(CLOSEST_CANDIDATES, len(sample_indices))
+        _, cands = tree.query(queries, k=num_cands)
+        cand_indices = sample_indices[np.reshape(cands, (num_queries, num_cands))]
+
+        entities = self._all_entities
+        params = np.zeros(num_queries)
+        dists = np.full(num_queries, np.inf)
+        for idx in np.unique(cand_indices):
+            mask = (cand_indices == idx).any(axis=1)
+            crv = entities[idx]
+            crv_params, crv_dists = crv._closest_params(queries[mask])
+            clipped = np.clip(crv_params, *self._visible_range(idx))
+            moved = clipped != crv_params
+            if moved.any():
+                crv_dists[moved] = np.linalg.norm(crv.points(clipped[moved]) - queries[mask][moved], axis=1)
+            chain_params = self._chain_params(idx, clipped)
+            better = crv_dists < dists[mask]
+            params[np.flatnonzero(mask)[better]] = chain_params[better]
+            dists[np.flatnonzero(mask)[better]] = crv_dists[better]
+        return np.clip(params, 0.0, 1.0), dists
+
+    def _bezier_control_points(self) -> np.ndarray:
+        return np.concatenate([c._bezier_control_points() for c in self._all_entities])
+
+    def _params_from_bezier(self, bzr_indices: np.ndarray, bzr_params: np.ndarray) -> np.ndarray:
+        entities = self._all_entities
+        starts = np.cumsum([0] + [len(c._bezier_control_points()) for c in entities])
+        indices = np.searchsorted(starts, bzr_indices, side='right') - 1
+        params = np.full(len(indices), np.nan)
+        for idx in np.unique(indices):
+            mask = indices == idx
+            crv_params = entities[idx]._params_from_bezier(bzr_indices[mask] - starts[idx], bzr_params[mask])
+            lo, hi = self._visible_range(idx)
+            visible = (crv_params >= lo) & (crv_params <= hi)
+            params[mask] = np.where(visible, self._chain_params(idx, crv_params), np.nan)
+        return params
+
+    def _visible_range(self, idx: int) -> tuple[float, float]:
+        """Returns the range of the params (length fractions) of the entity with the given index that are not
+        covered by its attachments."""
+        crv = self._all_entities[idx]
+        crv_len_inv = crv._length_inverse
+        return (crv._compute_end_offset(0, is_distance=True) * crv_len_inv,
+                1.0 - crv._compute_end_offset(1, is_distance=True) * crv_len_inv)
+
+    def _chain_params(self, idx: int, crv_params: np.ndarray) -> np.ndarray:
+        """Converts params (length fractions) of the entity with the given index to params of the chain."""
         crv = self._all_entities[idx]
+        length_inverse = self._length_inverse
+        return (self._cumu_lengths[idx] + crv_params * crv._length - self._start_offsets[idx]) * length_inverse
 
-        end_offs = crv._compute_end_offset(0, is_distance=True)
-        crv_param = (arc_len + end_offs - cumu_lens[idx]) * \
-            crv._length_inverse
-        crv_param = clip(crv_param, 0, 1)
-        return crv, idx, crv_param
+    def _get_closest_index(self) -> tuple[cKDTree, np.ndarray]:
+        """Returns the k-d tree of points sampled along the chain, and the entity index of each sample,
+        building them if necessary."""
+        if self._closest_index is None:
+            samples = np.linspace(0.0, 1.0, CLOSEST_SAMPLES * len(self._all_entities))
+            _, indices, _ = self._compute_curve_infos(samples)
+            self._closest_index = (cKDTree(self.points(samples)), indices)
+        return self._closest_index
 
     def _update_length(self):
-        # Compute and store curve lengths, cumulative lengths, and total length.
-        curves = self._all_entities
-        sz = len(curves)
-        self._cumu_lengths = [0] * sz
-        true_len = 0
-        cumu_len = 0
-        for i, c in enumerate(curves):
-            # First update length of this curve.
-            c._update_length()
-
-            # Update true length (i.e. without joints).
-            l = c._length
-            if not isinstance(c, Joint):
-                true_len += l
-
-            # Subtract both end offset lengths from the curve length.
-            for j in range(2):
-                l -= c._compute_end_offset(j, is_distance=True)
-
-            # Update cumulative length.
-            self._cumu_lengths[i] = cumu_len
-            cumu_len += l
+        # Only the lengths and end offsets of the entities that changed since the last update are read again,
+        # together with those of their neighbours, whose end offsets depend on the joints between them. E.g.
+        # a width change only changes the joints, so no curve is integrated again.
+        entities = self._entities
+        revisions = np.fromiter((c._revision for c in entities), dtype=np.int64, count=len(entities))
+        if self._entity_revisions is None:
+            self._entity_lengths, self._length_inverses, self._start_offsets, self._end_offsets = \
+                (np.empty(len(entities)) for _ in range(4))
+            changed = np.arange(len(entities))
+        else:
+            changed = np.flatnonzero(revisions != self._entity_revisions)
+            changed = np.unique(np.clip(np.concatenate((changed - 1, changed, changed + 1)), 0, len(entities) - 1))
+
+        # Any pending update of an entity's length is performed on access, which may change its revision.
+        for i in changed.tolist():
+            c = entities[i]
+            self._entity_lengths[i] = c._length
+            self._length_inverses[i] = c._length_inverse
+            self._start_offsets[i] = c._compute_end_offset(0, is_distance=True)
+            self._end_offsets[i] = c._compute_end_offset(1, is_distance=True)
+        self._entity_revisions = np.fromiter((c._revision for c in entities), dtype=np.int64, count=len(entities))
+
+        # Subtract both end offset lengths from the entity lengths, and refresh the cumulative lengths.
+        true_len = self._entity_lengths[0::2].sum()  # Without joints
+        visible_lens = np.cumsum(self._entity_lengths - self._start_offsets - self._end_offsets)
+        self._cumu_lengths = np.concatenate(([0.0], visible_lens[:-1]))
+        cumu_len = float(visible_lens[-1])
 
         # Need to override super()._update_length() to avoid a cycle. This is because the latter invokes
         # self.length(), which requires self._length to have already been set.
@@ -139,3 +383,4 @@ class CurveChain(Curve):
             f'Inconsistent total length. Abs Error: {abs(cumu_len - true_len)}'
         self._length = cumu_len
         self._length_inverse = reciprocal(cumu_len)
+        self._closest_index = None
@@ -0,0 +1,436 @@
+import math
+import numpy as np
+from scipy.spatial import cKDTree
+from .arc_length import DEFAULT_LOOKUP_TOL, ArcLengthTable, control_points_hash, shared_table
+from .bezier_utils import (as_param_array, as_point_array, bezier_closest_params, bezier_curvatures,
+                           bezier_points, bezier_resolutions, bezier_tangents, fill_degenerate_rows,
+                           normalise_rows, planar_normals, rotation_minimising_normals)
+
+CLOSEST_SAMPLES = 16  # Per Bezier curve, in the index of the nearest point queries
+CLOSEST_CANDIDATES = 4  # Number of indexed samples refined per nearest point query
+FRAME_MEMO_SIZE = 64  # Maximum number of memoised frame queries
+RMF_SAMPLES = 8  # Minimum number per Bezier curve of the samples of the rotation minimising frames
+
+
+class CurveGeometry:
+    """The geometry of a cubic Bezier spline in plain NumPy, i.e. independent of Blender. It stores the spline
+    points and their handles, the control points (p0, h0, h1, p1) of each Bezier curve, and the arc length lookup
+    table, and evaluates the spline at either spline parameters u or length fractions.
+
+    Edits only mark the affected Bezier curves as stale, and the lookup table is updated when it is next needed.
+    Geometries with identical control points share one immutable lookup table, which is copied on write.
+    Curve classes wrap an instance and sync it with Blender explicitly. Instances can be pickled, so geometry can
+    also be computed in worker threads or processes.
+    """
+
+    def __init__(self, co, handle_left, handle_right, planar: bool = True, lookup_tol: float = DEFAULT_LOOKUP_TOL):
+        """Initialise the geometry from the spline points.
+        Args:
+            co: An (n_points, 3) array of spline point locations.
+            handle_left: An (n_points, 3) array of left handle locations.
+            handle_right: An (n_points, 3) array of right handle locations.
+            planar: Whether the spline lies in the xy-plane. The normals of planar splines lie in the plane,
+                otherwise they are those of rotation minimising frames.
+            lookup_tol: The tolerance of the arc length lookup table, relative to the spline's length.
+        """
+        self.co: np.ndarray = None
+        self.handle_left: np.ndarray = None
+        self.handle_right: np.ndarray = None
+        self.ctrl_pts: np.ndarray = None  # (n_curves, 4, 3) control points of each Bezier curve
+        self.planar = planar
+        self._lookup_tol = lookup_tol
+        self._arc_table: ArcLengthTable = None
+        self._content_hash: bytes = None  # Hash of the control points; None if stale
+        self._stale_curves: set[int] = None  # Bezier curves whose lengths are stale; None if all are stale
+        self._closest_index: tuple[cKDTree, np.ndarray, np.ndarray] = None  # Sample tree, curve indices, params
+        self._frame_memo: dict[tuple[bytes, bool], tuple[np.ndarray, ...]] = {}  # Results of frame_at()
+        self._rmf: tuple[np.ndarray, np.ndarray] = None  # Spline params and normals of the rotation min. frames
+
+        self.set_points(co, handle_left, handle_right)
+
+    @classmethod
+    def from_control_points(cls, ctrl_pts: np.ndarray, **kwargs):
+        """Creates the geometry from an (n_curves, 4, 3) array of control points. The outer handles of the first
+        and last spline points are collapsed onto the points.
+        """
+        ctrl_pts = np.asarray(ctrl_pts, dtype=float)
+        co = np.concatenate((ctrl_pts[:, 0], ctrl_pts[-1:, 3]))
+        handle_left = np.concatenate((ctrl_pts[:1, 0], ctrl_pts[:, 2]))
+        handle_right = np.concatenate((ctrl_pts[:, 1], ctrl_pts[-1:, 3]))
+        return cls(co, handle_left, handle_right, **kwargs)
+
+    # Properties ------------------------------------------------------------------------------------------- #
+
+    @property
+    def num_curves(self) -> int:
+        """The number of Bezier curves."""
+        return len(self.ctrl_pts)
+
+    @property
+    def num_points(self) -> int:
+        """The number of spline points."""
+        return len(self.co)
+
+    @property
+    def arc_table(self) -> ArcLengthTable:
+        """The arc length lookup table, which is updated first if it is stale."""
+        self.update()
+        return self._arc_table
+
+    @property
+    def length(self) -> float:
+        """The total length of the spline."""
+        return self.arc_table.length
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether the first and last spline points coincide."""
+        return bool(np.allclose(self.co[0], self.co[-1]))
+
+    @property
+    def content_hash(self) -> bytes:
+        """A hash of the control points, which identifies geometries with the same shape."""
+        if self._content_hash is None:
+            self._content_hash = control_points_hash(self.ctrl_pts)
+        return self._content_hash
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the lookup table must be updated before it can be used."""
+        return self._stale_curves is None or len(self._stale_curves) > 0
+
+    # Modifiers -------------------------------------------------------------------------------------------- #
+
+    def set_points(self, co, handle_left, handle_right):
+        """Replaces all spline points and their handles. The number of points may change."""
+        co, handle_left, handle_right = \
+            (np.array(a, dtype=float).reshape(-1, 3) for a in (co, handle_left, handle_right))
+        assert len(co) > 1, 'A spline must contain at least 2 points.'
+        assert len(co) == len(handle_left) == len(handle_right), 'Expected both handles for each spline point.'
+        self.co, self.handle_left, self.handle_right = co, handle_left, handle_right
+
+        self.ctrl_pts = np.empty((len(co) - 1, 4, 3))
+        self.ctrl_pts[:, 0] = co[:-1]
+        self.ctrl_pts[:, 1] = handle_right[:-1]
+        self.ctrl_pts[:, 2] = handle_left[1:]
+        self.ctrl_pts[:, 3] = co[1:]
+        self.mark_stale()
+
+    def set_point(self, pt_index: int, co=None, handle_left=None, handle_right=None) -> list[int]:
+        """Updates a single spline point and/or its handles.
+        Args:
+            pt_index: The index of the spline point.
+            co: The new location of the point, if it changed.
+            handle_left: The new location of the left handle, if it changed.
+            handle_right: The new location of the right handle, if it changed.
+        Returns:
+            The indices of the Bezier curves adjacent to the spline point, which are marked as stale.
+        """
+        num_pts = self.num_points
+        pt_index %= num_pts
+        if co is not None:
+            self.co[pt_index] = co
+        if handle_left is not None:
+            self.handle_left[pt_index] = handle_left
+        if handle_right is not None:
+            self.handle_right[pt_index] = handle_right
+
+        bzr_indices = []
+        if pt_index > 0:
+            self.ctrl_pts[pt_index - 1, 2] = self.handle_left[pt_index]
+            self.ctrl_pts[pt_index - 1, 3] = self.co[pt_index]
+            bzr_indices.append(pt_index - 1)
+        if pt_index < num_pts - 1:
+            self.ctrl_pts[pt_index, 0] = self.co[pt_index]
+            self.ctrl_pts[pt_index, 1] = self.handle_right[pt_index]
+            bzr_indices.append(pt_index)
+
+        self.mark_stale(bzr_indices)
+        return bzr_indices
+
+    def mark_stale(self, bzr_indices: list[int] = None):
+        """Marks the lengths of the given Bezier curves (or of all curves, if None) as stale. The index of the
+        nearest point queries and the memoised frames are discarded."""
+        self._closest_index = None
+        self._frame_memo = {}
+        self._rmf = None
+        self._content_hash = None
+        if bzr_indices is None:
+            self._stale_curves = None
+        elif self._stale_curves is not None:
+            self._stale_curves.update(bzr_indices)
+
+    def update(self):
+        """Brings the lookup table up to date. Only the stale Bezier curves are updated, unless the table must be
+        rebuilt (e.g. because the number of curves changed)."""
+        if not self.is_stale:
+            return self
+
+        stale_curves, self._stale_curves = self._stale_curves, set()
+        table = self._arc_table
+        if stale_curves is None or table is None or table.num_curves != self.num_curves:
+            self._arc_table = shared_table(self.ctrl_pts, self._lookup_tol, self.content_hash)
+        else:
+            self._arc_table = table.unshared()
+            self._arc_table.update_curves(self.ctrl_pts, sorted(stale_curves))
+        return self
+
+    # Queries ---------------------------------------------------------------------------------------------- #
+
+    def spline_param(self, param: float, is_len_fraction: bool = True) -> float:
+        """Computes the spline parameter u associated to a length fraction (or returns the param itself)."""
+        assert 0.0 <= param <= 1.0, f'Parameter must be in range [0, 1]. Got: {param:.3f}'
+        if not is_len_fraction:
+            return param
+        table = self.arc_table
+        return table.u_at(param * table.length)
+
+    def spline_params(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        """Vectorised version of spline_param()."""
+        params = as_param_array(params)
+        if not is_len_fraction:
+            return params
+        table = self.arc_table
+        return table.u_from_s(params * table.length)
+
+    def len_fractions(self, spl_params) -> np.ndarray:
+        """Computes the length fractions associated to spline parameters u (the inverse of spline_params())."""
+        table = self.arc_table
+        lengths = table.s_from_u(as_param_array(spl_params))
+        return np.clip(lengths / table.length, 0.0, 1.0) if table.length > 0 else np.zeros_like(lengths)
+
+    def curve_info(self, param: float, is_len_fraction: bool = True) -> tuple[float, int]:
+        """Computes the Bezier parameter and the index of the Bezier curve associated to the given param."""
+        num_bzr = self.num_curves
+        val = self.spline_param(param, is_len_fraction) * num_bzr
+        bzr_index = min(math.floor(val), num_bzr - 1)
+        return val - bzr_index, bzr_index
+
+    def curve_infos(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorised version of curve_info(). Returns arrays of Bezier params and indices."""
+        num_bzr = self.num_curves
+        val = self.spline_params(params, is_len_fraction) * num_bzr
+        bzr_indices = np.minimum(np.floor(val).astype(int), num_bzr - 1)
+        return val - bzr_indices, bzr_indices
+
+    def points(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the points associated to an array of parameters. Returns an (N, 3) array."""
+        bzr_params, bzr_indices = self.curve_infos(params, is_len_fraction)
+        return bezier_points(self.ctrl_pts[bzr_indices], bzr_params)
+
+    def tangents(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the tangents associated to an array of parameters. Returns an (N, 3) array."""
+        bzr_params, bzr_indices = self.curve_infos(params, is_len_fraction)
+        tangs = bezier_tangents(self.ctrl_pts[bzr_indices], bzr_params)
+        return normalise_rows(tangs) if normalise else tangs
+
+    def normals(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the normals associated to an array of parameters, which are in-plane for planar splines and
+        those of the rotation minimising frames otherwise. Unless normalised, the normals have the lengths of
+        the tangents. Returns an (N, 3) array."""
+        if self.planar:
+            return planar_normals(self.tangents(params, normalise, is_len_fraction))
+        bzr_params, bzr_indices = self.curve_infos(params, is_len_fraction)
+        tangs = bezier_tangents(self.ctrl_pts[bzr_indices], bzr_params)
+        norms = self._rmf_normals((bzr_indices + bzr_params) / self.num_curves, normalise_rows(tangs))
+        return norms if normalise else norms * np.linalg.norm(tangs, axis=1, keepdims=True)
+
+    def frames(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Computes the points, unit tangents and unit normals associated to an array of parameters."""
+        bzr_params, bzr_indices = self.curve_infos(params, is_len_fraction)
+        ctrl_pts = self.ctrl_pts[bzr_indices]
+        tangs = normalise_rows(bezier_tangents(ctrl_pts, bzr_params))
+        if self.planar:
+            norms = planar_normals(tangs)
+        else:
+            norms = self._rmf_normals((bzr_indices + bzr_params) / self.num_curves, tangs)
+        return bezier_points(ctrl_pts, bzr_params), tangs, norms
+
+    def frame_at(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, ...]:
+        """Computes the points, unit tangents, unit normals and unit binormals associated to an array of
+        parameters, in one evaluation. The results are memoised until the geometry changes, as attachments
+        query the same params several times per frame. They must not be modified.
+        """
+        params = as_param_array(params)
+        key = (params.tobytes(), is_len_fraction)
+        frame = self._frame_memo.get(key)
+        if frame is None:
+            pts, tangs, norms = self.frames(params, is_len_fraction)
+            frame = (pts, tangs, norms, np.cross(tangs, norms))
+            for arr in frame:
+                arr.flags.writeable = False
+            if len(self._frame_memo) >= FRAME_MEMO_SIZE:
+                self._frame_memo = {}
+            self._frame_memo[key] = frame
+        return frame
+
+    def curvatures(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the (unsigned) curvatures associated to an array of parameters. Returns an (N,) array."""
+        bzr_params, bzr_indices = self.curve_infos(params, is_len_fraction)
+        return bezier_curvatures(self.ctrl_pts[bzr_indices], bzr_params)
+
+    def min_resolution(self, chord_tol: float) -> int:
+        """Computes the smallest number of uniform sub-divisions per Bezier curve for which the chords of every
+        curve deviate from it by at most chord_tol. See bezier_resolutions()."""
+        return int(bezier_resolutions(self.ctrl_pts, chord_tol).max())
+
+    def resample_uniform(self, n: int = None, spacing: float = None, include_tangents: bool = True):
+        """Samples points that are evenly spaced by arc length, in a single pass. See uniform_params()."""
+        params = uniform_params(self.length, n, spacing, self.is_closed)
+        bzr_params, bzr_indices = self.curve_infos(params)
+        ctrl_pts = self.ctrl_pts[bzr_indices]
+        pts = bezier_points(ctrl_pts, bzr_params)
+        if not include_tangents:
+            return pts
+        return pts, normalise_rows(fill_degenerate_rows(bezier_tangents(ctrl_pts, bzr_params)))
+
+    def closest_params(self, points, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """Finds the points on the spline closest to the given query points. Candidates are taken from a k-d tree
+        of points sampled along each Bezier curve (built on demand and discarded on edits), and refined with
+        Newton's method.
+        Args:
+            points: An (N, 2|3) array of query points.
+            is_len_fraction: Whether to return length fractions rather than spline parameters u.
+        Returns:
+            The (N,) arrays of the params of the closest points and of the distances to them.
+        """
+        queries = as_point_array(points)
+        num_queries = len(queries)
+        tree, sample_indices, sample_params = self._get_closest_index()
+        num_cands = min(CLOSEST_CANDIDATES, len(sample_params))
+        _, cands = tree.query(queries, k=num_cands)
+        cands = np.reshape(cands, (num_queries, num_cands)).ravel()
+
+        bzr_indices = sample_indices[cands]
+        ctrl_pts = self.ctrl_pts[bzr_indices]
+        cand_queries = np.repeat(queries, num_cands, axis=0)
+        bzr_params = bezier_closest_params(ctrl_pts, sample_params[cands], cand_queries)
+        dists = np.linalg.norm(bezier_points(ctrl_pts, bzr_params) - cand_queries, axis=1)
+
+        # Keep the closest of the refined candidates.
+        best = dists.reshape(num_queries, num_cands).argmin(axis=1) + num_cands * np.arange(num_queries)
+        params = (bzr_indices[best] + bzr_params[best]) / self.num_curves
+        if is_len_fraction:
+            params = self.len_fractions(params)
+        return params, dists[best]
+
+    def length_at(self, spl_param: float = 1.0) -> float:
+        """Computes the (exact) arc length up to the spline parameter u."""
+        assert 0.0 <= spl_param <= 1.0, f'Parameter must be in range [0, 1]. Got: {spl_param:.3f}'
+        return float(self.arc_table.s_from_u([spl_param])[0])
+
+    def u_from_s(self, lengths) -> np.ndarray:
+        """Computes the spline parameters associated to an array of arc lengths in [0, length]."""
+        lengths = np.atleast_1d(np.asarray(lengths, dtype=float))
+        table = self.arc_table
+        assert np.all((0.0 <= lengths) & (lengths <= table.length)), 'The lengths are out of bounds.'
+        return table.u_from_s(lengths)
+
+    # Private methods -------------------------------------------------------------------------------------- #
+
+    def _rmf_normals(self, spl_params: np.ndarray, tangents: np.ndarray) -> np.ndarray:
+        """Interpolates the normals of the rotation minimising frames at the given spline params u, and makes
+        them orthogonal to the given unit tangents."""
+        knots, normals = self._get_rmf()
+        idx = np.clip(np.searchsorted(knots, spl_params, side='right') - 1, 0, len(knots) - 2)
+        weights = ((spl_params - knots[idx]) / (knots[idx + 1] - knots[idx]))[:, None]
+        norms = (1 - weights) * normals[idx] + weights * normals[idx + 1]
+        norms -= np.einsum('ij,ij->i', norms, tangents)[:, None] * tangents
+        return normalise_rows(norms)
+
+    def _get_rmf(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the spline params u of the samples of the rotation minimising frames (the lookup table's, and
+        a minimum number per Bezier curve), and their normals, computing them if necessary. The normals of a
+        spline lying in a plane stay in that plane. Closed splines may not have matching frames at their
+        ends."""
+        if self._rmf is None:
+            num_bzr = self.num_curves
+            knots = np.union1d(self.arc_table.spl_params, np.linspace(0.0, 1.0, RMF_SAMPLES * num_bzr + 1))
+            bzr_indices = np.minimum(np.floor(knots * num_bzr).astype(int), num_bzr - 1)
+            tangs = bezier_tangents(self.ctrl_pts[bzr_indices], knots * num_bzr - bzr_indices)
+            tangs = normalise_rows(fill_degenerate_rows(tangs))
+
+            normal_0 = np.cross(self._plane_normal(), tangs[0])
+            if np.linalg.norm(normal_0) < 1e-6:
+                normal_0 = np.cross(tangs[0], (1.0, 0.0, 0.0))
+            self._rmf = (knots, rotation_minimising_normals(tangs, normal_0 / np.linalg.norm(normal_0)))
+        return self._rmf
+
+    def _plane_normal(self) -> np.ndarray:
+        """Returns the unit normal of the plane containing the control points (oriented towards +z, then +y,
+        then +x), or the z-axis if they are not coplanar."""
+        pts = self.ctrl_pts.reshape(-1, 3)
+        _, sing_vals, vecs = np.linalg.svd(pts - pts.mean(axis=0), full_matrices=False)
+        if sing_vals[-1] > 1e-9 * max(sing_vals[0], 1e-300):
+            return np.array([0.0, 0.0, 1.0])
+        normal = vecs[-1]
+        for i in (2, 1, 0):
+            if abs(normal[i]) > 1e-12:
+                return normal if normal[i] > 0 else -normal
+        return normal
+
+    def _get_closest_index(self) -> tuple[cKDTree, np.ndarray, np.ndarray]:
+        """Returns the k-d tree of points sampled along the Bezier curves, and the curve index and Bezier param
+        of each sample, building them if necessary."""
+        if self._closest_index is None:
+            t = np.linspace(0.0, 1.0, CLOSEST_SAMPLES)
+            sample_indices = np.repeat(np.arange(self.num_curves), CLOSEST_SAMPLES)
+            sample_params = np.tile(t, self.num_curves)
+            pts = bezier_points(self.ctrl_pts[sample_indices], sample_params)
+            self._closest_index = (cKDTree(pts), sample_indices, sample_params)
+        return self._closest_index
+
+
+def uniform_params(length: float, n: int = None, spacing: float = None, closed: bool = False) -> np.ndarray:
+    """Computes the length fractions of points that are evenly spaced by arc length along a curve.
+    Args:
+        length: The length of the curve.
+        n: The number of points. Exactly one of n and spacing must be given.
+        spacing: The maximum arc length between consecutive points. It is reduced so that the points are evenly
+            spaced over the whole curve.
+        closed: Whether the curve is closed, in which case the end point (which coincides with the start point)
+            is not repeated.
+    Returns:
+        An array of length fractions.
+    """
+    assert (n is None) != (spacing is None), 'Expected exactly one of n and spacing.'
+    if spacing is not None:
+        assert spacing > 0, 'The spacing must be positive.'
+        num_intervals = max(1, math.ceil(length / spacing - 1e-9))
+        n = num_intervals if closed else num_intervals + 1
+    assert n >= 1, 'Expected at least 1 point.'
+    return np.arange(n) / n if closed else np.linspace(0.0, 1.0, n)
+
+
+def offset_param(param: float, end_idx: int, offset_0: float, offset_1: float, is_joint: bool = False) -> float:
+    """Offsets the param of one end of a curve, so that the curve terminates at its attachments.
+    Args:
+        param: The length fraction of the end.
+        end_idx: The index of the end (0 or 1).
+        offset_0: The offset at the start of the curve due to its attachment, as a length fraction.
+        offset_1: The offset at the end of the curve due to its attachment, as a length fraction.
+        is_joint: Whether the attachment at this end is a joint, in which case the offsets only apply when the
+            param lies within them.
+    Returns:
+        The offset param.
+    """
+    if is_joint and offset_0 < param < 1 - offset_1:
+        offset_0 = offset_1 = 0
+    return min(param + offset_0, 1.0 - offset_1) if end_idx == 0 else max(param - offset_1, offset_0)
+
+
+def locate_lengths(lengths: np.ndarray, cumu_lengths: np.ndarray, start_offsets: np.ndarray,
+                   length_inverses: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Locates arc lengths along a chain of curves.
+    Args:
+        lengths: An array of arc lengths along the chain.
+        cumu_lengths: The arc length at the start of each curve in the chain.
+        start_offsets: The distance by which the start of each curve is offset by its attachment.
+        length_inverses: The inverse length of each curve.
+    Returns:
+        The index of the curve containing each length, and the corresponding length fraction along that curve.
+    """
+    indices = np.searchsorted(cumu_lengths, lengths, side='left') - 1
+    indices = np.clip(indices, 0, len(cumu_lengths) - 1)
+    params = (lengths + start_offsets[indices] - cumu_lengths[indices]) * length_inverses[indices]
+    return indices, np.clip(params, 0, 1)
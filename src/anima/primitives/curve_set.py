@@ -0,0 +1,308 @@
+import bpy
+import numpy as np
+from typing import Any, Optional
+from anima.globals.general import add_object
+from .arc_length import DEFAULT_LOOKUP_TOL, ArcLengthTable
+from .bezier_spline import DEFAULT_RESOLUTION, HANDLE_TYPES
+from .bezier_utils import (as_point_array, as_spline_points, bezier_lengths, bezier_points, bezier_tangents,
+                           normalise_rows, spline_points_from_control_points)
+from .curves import DEFAULT_LINE_WIDTH
+from .object import Object
+from .profiles import profile_cache
+
+
+class CurveSet(Object):
+    """A set of many cubic Bezier splines (its members), e.g. the outlines of glyphs or the lines of a plot, which
+    are rendered as the splines of a single curve datablock with one shared bevel profile.
+
+    The spline points of all members are stored as contiguous arrays (struct-of-arrays), and the Bezier curves of
+    all members share one arc length lookup table, so that points, tangents, lengths and params are computed for
+    any number of members at once. Members are trimmed individually by rewriting their Blender splines as the
+    trimmed sub-curves, since bevel factors apply to a whole datablock.
+    """
+
+    def __init__(self, members: list, width: float = DEFAULT_LINE_WIDTH, bias: float = 0.0, name: str = 'CurveSet',
+                 lookup_tol: float = DEFAULT_LOOKUP_TOL, **kwargs):
+        """Initialise a curve set with the given members.
+        Args:
+            members: A list of members, each of which is either an (N, 2|3) array of spline points (whose handles
+                are computed as Blender's 'AUTO' handles), or a tuple of the (N, 2|3) arrays of spline points and
+                of their left and right handles.
+            width: The width of all members.
+            bias: The bias of all members.
+            name: The name of the curve set object.
+            lookup_tol: The tolerance of the arc length lookup table, relative to the length of the shortest member.
+            kwargs: Additional keyword arguments for the Object base class.
+        """
+        assert len(members) > 0, 'A curve set must contain at least 1 member.'
+        co, handle_left, handle_right = [], [], []
+        for member in members:
+            pts, left, right = as_spline_points(member)
+            assert len(pts) > 1, 'A member must contain at least 2 spline points.'
+            co.append(pts)
+            handle_left.append(left)
+            handle_right.append(right)
+
+        # Blender stores single precision floats, which the arrays must mirror.
+        self._point_starts = np.concatenate(([0], np.cumsum([len(pts) for pts in co])))
+        self.co, self.handle_left, self.handle_right = \
+            (np.concatenate(a).astype(np.float32).astype(float) for a in (co, handle_left, handle_right))
+        self._lookup_tol = lookup_tol
+        self._params = np.tile([0.0, 1.0], (len(members), 1))  # Trim params (length fractions) of each member
+        self._update_curves()
+
+        # Create a single curve datablock with a spline per member.
+        curve_data = bpy.data.curves.new(name=name, type='CURVE')
+        curve_data.dimensions = '3D' if any(a[:, 2].any() for a in (self.co, self.handle_left, self.handle_right)) \
+            else '2D'
+        curve_data.resolution_u = DEFAULT_RESOLUTION
+        free = HANDLE_TYPES['FREE']
+        for start, stop in zip(self._point_starts[:-1], self._point_starts[1:]):
+            spline = curve_data.splines.new(type='BEZIER')
+            spline.bezier_points.add(count=stop - start - 1)  # contains 1 already
+            spline.bezier_points.foreach_set('handle_left_type', [free] * (stop - start))
+            spline.bezier_points.foreach_set('handle_right_type', [free] * (stop - start))
+        bl_obj = add_object(name, curve_data)
+        super().__init__(bl_object=bl_obj, name=name, **kwargs)
+        self._write_members(np.arange(self.num_members), self.co, self.handle_left, self.handle_right)
+
+        self._width = width
+        self._bias = bias
+        self.set_width(width)
+        self.set_bias(bias)
+
+    @classmethod
+    def from_arrays(cls, co: np.ndarray, handle_left: np.ndarray, handle_right: np.ndarray, point_counts,
+                    **kwargs):
+        """Creates a curve set from contiguous arrays of the spline points of all members.
+        Args:
+            co: An (N, 2|3) array of the spline points of all members, one member after the other.
+            handle_left: An (N, 2|3) array of left handle locations.
+            handle_right: An (N, 2|3) array of right handle locations.
+            point_counts: The number of spline points of each member.
+            kwargs: Additional keyword arguments for the constructor, e.g. the width.
+        Returns:
+            The new curve set.
+        """
+        co, handle_left, handle_right = (as_point_array(a) for a in (co, handle_left, handle_right))
+        assert sum(point_counts) == len(co), 'The point counts do not match the number of spline points.'
+        splits = np.cumsum(point_counts)[:-1]
+        members = list(zip(*(np.split(a, splits) for a in (co, handle_left, handle_right))))
+        return cls(members, **kwargs)
+
+    @classmethod
+    def from_control_points(cls, ctrl_pts: np.ndarray, curve_counts=None, **kwargs):
+        """Creates a curve set from the control points of Bezier curves, e.g. the segments of SVG paths.
+        Args:
+            ctrl_pts: An (n_curves, 4, 2|3) array of control points (p0, h0, h1, p1) of each Bezier curve. The
+                curves of each member must be connected.
+            curve_counts: The number of Bezier curves of each member. Defaults to one curve per member.
+            kwargs: Additional keyword arguments for the constructor, e.g. the width.
+        Returns:
+            The new curve set.
+        """
+        ctrl_pts = np.asarray(ctrl_pts, dtype=float)
+        if ctrl_pts.shape[2] == 2:
+            ctrl_pts = np.concatenate((ctrl_pts, np.zeros(ctrl_pts.shape[:2] + (1,))), axis=2)
+        curve_counts = np.ones(len(ctrl_pts), dtype=int) if curve_counts is None else np.asarray(curve_counts)
+        assert curve_counts.sum() == len(ctrl_pts), 'The curve counts do not match the number of Bezier curves.'
+        members = [spline_points_from_control_points(crvs)
+                   for crvs in np.split(ctrl_pts, np.cumsum(curve_counts)[:-1])]
+        return cls(members, **kwargs)
+
+    def set_width(self, width: float):
+        """Sets the width of all members through the shared bevel profile."""
+        self._width = width
+        self.object.data.bevel_mode = 'OBJECT'
+        self.object.data.bevel_object = profile_cache.swap(self.object.data.bevel_object, width)
+
+        # The offset of the bias depends on the width.
+        self.object.data.offset = -self._bias * 0.5 * width
+        return self
+
+    def set_bias(self, bias: float):
+        """Sets the bias of all members (see Curve.set_bias())."""
+        self._bias = bias
+        self.object.data.offset = -bias * 0.5 * self._width
+        return self
+
+    def trim(self, param_0=0.0, param_1=1.0, members=None):
+        """Trims members to the portions between two length fractions. The Blender splines of the members are
+        rewritten as the trimmed sub-curves, keeping their numbers of spline points.
+        Args:
+            param_0: The start param of the members, or an array of one start param per member.
+            param_1: The end param of the members, or an array of one end param per member.
+            members: The indices of the members to trim. Defaults to all members.
+        """
+        members = np.arange(self.num_members) if members is None else np.atleast_1d(np.asarray(members, dtype=int))
+        params = np.empty((len(members), 2))
+        params[:, 0], params[:, 1] = param_0, param_1
+        assert np.all((0.0 <= params) & (params <= 1.0)), 'Parameters must be in range [0, 1].'
+        assert np.all(params[:, 0] <= params[:, 1]), 'The start params must not exceed the end params.'
+        self._params[members] = params
+
+        # Each member is split at its trim params and at the ends of the Bezier curves in between. The resulting
+        # sub-curves are split further, into equal parts, until there are as many as the member has Bezier curves.
+        num_crvs = self._curve_counts[members]
+        curve_starts = self._curve_starts[members]
+        spl_params = self.spline_params(np.repeat(members, 2), params.ravel()).reshape(-1, 2) * num_crvs[:, None]
+        first = np.minimum(np.floor(spl_params[:, 0]).astype(int), num_crvs - 1)
+        last = np.maximum(np.ceil(spl_params[:, 1]).astype(int) - 1, first)
+        piece_counts = last - first + 1
+        piece_members = np.repeat(np.arange(len(members)), piece_counts)
+        piece_offsets = np.arange(len(piece_members)) - np.repeat(np.cumsum(piece_counts) - piece_counts, piece_counts)
+        pieces = first[piece_members] + piece_offsets
+        t_0 = np.clip(spl_params[piece_members, 0] - pieces, 0.0, 1.0)
+        t_1 = np.clip(spl_params[piece_members, 1] - pieces, 0.0, 1.0)
+
+        extra, rest = np.divmod(num_crvs - piece_counts, piece_counts)
+        part_counts = 1 + extra[piece_members] + (piece_offsets < rest[piece_members])
+        part_offsets = np.arange(part_counts.sum()) - np.repeat(np.cumsum(part_counts) - part_counts, part_counts)
+        crv_indices = np.repeat(curve_starts[piece_members] + pieces, part_counts)
+        s, t = np.repeat(t_0, part_counts), np.repeat(t_1 - t_0, part_counts) / np.repeat(part_counts, part_counts)
+        s, t = s + part_offsets * t, s + (part_offsets + 1) * t
+
+        # The sub-curve of a cubic Bezier curve over [s, t] has the Hermite data of the curve at s and t.
+        ctrl_pts = self._ctrl_pts[crv_indices]
+        pts_0, pts_1 = bezier_points(ctrl_pts, s), bezier_points(ctrl_pts, t)
+        tangs_0, tangs_1 = ((t - s)[:, None] / 3 * bezier_tangents(ctrl_pts, u) for u in (s, t))
+        sub_ctrl_pts = np.stack((pts_0, pts_0 + tangs_0, pts_1 - tangs_1, pts_1), axis=1)
+
+        # Convert into spline points, member by member.
+        crv_counts = np.concatenate(([0], np.cumsum(num_crvs)))
+        spline_pts = [spline_points_from_control_points(sub_ctrl_pts[i:j])
+                      for i, j in zip(crv_counts[:-1], crv_counts[1:])]
+        self._write_members(members, *(np.concatenate(a) for a in zip(*spline_pts)))
+        return self
+
+    def lengths(self, members=None) -> np.ndarray:
+        """Returns the lengths of the given members (all by default), untrimmed."""
+        return self._member_lengths if members is None else self._member_lengths[members]
+
+    def spline_params(self, members, params) -> np.ndarray:
+        """Computes the spline params u of the given members associated to length fractions.
+        Args:
+            members: An array of member indices (or a single index).
+            params: An array of length fractions in [0, 1] (or a single one), broadcast against the members.
+        Returns:
+            An array of spline params in [0, 1], relative to the members.
+        """
+        members, params = self._broadcast(members, params)
+        table = self._arc_table
+        num_crvs, curve_starts = self._curve_counts[members], self._curve_starts[members]
+        lengths = table.cumu_lengths[curve_starts] + params * self._member_lengths[members]
+        val = table.u_from_s(lengths) * self._num_curves - curve_starts
+        return np.clip(val / num_crvs, 0.0, 1.0)
+
+    def len_fractions(self, members, spl_params) -> np.ndarray:
+        """Computes the length fractions of the given members associated to spline params u (the inverse of
+        spline_params())."""
+        members, spl_params = self._broadcast(members, spl_params)
+        table = self._arc_table
+        curve_starts = self._curve_starts[members]
+        global_params = (curve_starts + spl_params * self._curve_counts[members]) / self._num_curves
+        lengths = table.s_from_u(global_params) - table.cumu_lengths[curve_starts]
+        member_lengths = self._member_lengths[members]
+        return np.clip(np.divide(lengths, member_lengths, out=np.zeros_like(lengths), where=member_lengths > 0),
+                       0.0, 1.0)
+
+    def points(self, members, params) -> np.ndarray:
+        """Computes the points of the given members associated to length fractions. Returns an (N, 3) array."""
+        crv_indices, bzr_params = self._curve_infos(members, params)
+        return bezier_points(self._ctrl_pts[crv_indices], bzr_params)
+
+    def tangents(self, members, params, normalise=False) -> np.ndarray:
+        """Computes the tangents of the given members associated to length fractions. Returns an (N, 3) array."""
+        crv_indices, bzr_params = self._curve_infos(members, params)
+        tangs = bezier_tangents(self._ctrl_pts[crv_indices], bzr_params)
+        return normalise_rows(tangs) if normalise else tangs
+
+    # Property getters/setters ----------------------------------------------------------------------------- #
+
+    @property
+    def num_members(self) -> int:
+        """The number of members."""
+        return len(self._point_starts) - 1
+
+    @property
+    def params(self) -> np.ndarray:
+        """The (n_members, 2) array of the trim params of each member."""
+        return self._params.copy()
+
+    @property
+    def width(self) -> float:
+        return self._width
+
+    @width.setter
+    def width(self, w: float):
+        self.set_width(w)
+
+    @property
+    def bias(self) -> float:
+        return self._bias
+
+    @bias.setter
+    def bias(self, b: float):
+        self.set_bias(b)
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None):
+        """Create a deep copy of the curve set, which shares the bevel profile of its width."""
+        new_copy = super().__deepcopy__(memo)
+        new_copy.object.data.bevel_object = profile_cache.acquire(self._width)
+        return new_copy
+
+    # Private methods -------------------------------------------------------------------------------------- #
+
+    def _update_curves(self):
+        """Computes the control points of the Bezier curves of all members, and their arc length lookup table."""
+        point_counts = np.diff(self._point_starts)
+        self._curve_counts = point_counts - 1
+        self._curve_starts = np.concatenate(([0], np.cumsum(self._curve_counts)[:-1]))
+        self._num_curves = int(self._curve_counts.sum())
+
+        # The last point of each member does not start a curve.
+        starts = np.ones(len(self.co), dtype=bool)
+        starts[self._point_starts[1:] - 1] = False
+        starts = np.flatnonzero(starts)
+        self._ctrl_pts = np.stack((self.co[starts], self.handle_right[starts], self.handle_left[starts + 1],
+                                   self.co[starts + 1]), axis=1)
+
+        # The tolerance of the lookup table is relative to its total length, hence to that of all members.
+        curve_lengths = bezier_lengths(self._ctrl_pts)
+        self._member_lengths = np.add.reduceat(curve_lengths, self._curve_starts)
+        total = self._member_lengths.sum()
+        positive = self._member_lengths[self._member_lengths > 0]
+        tol = self._lookup_tol * (positive.min() / total if len(positive) > 0 else 1.0)
+        self._arc_table = ArcLengthTable(self._ctrl_pts, tol)
+        self._member_lengths = np.add.reduceat(self._arc_table.curve_lengths, self._curve_starts)
+
+    def _curve_infos(self, members, params) -> tuple[np.ndarray, np.ndarray]:
+        """Locates the given length fractions of the members. Returns the indices of the Bezier curves (in the
+        set) and the Bezier params."""
+        members, params = self._broadcast(members, params)
+        num_crvs = self._curve_counts[members]
+        val = self.spline_params(members, params) * num_crvs
+        bzr_indices = np.minimum(np.floor(val).astype(int), num_crvs - 1)
+        return self._curve_starts[members] + bzr_indices, val - bzr_indices
+
+    def _broadcast(self, members, params) -> tuple[np.ndarray, np.ndarray]:
+        members, params = np.broadcast_arrays(np.atleast_1d(np.asarray(members, dtype=int)),
+                                              np.atleast_1d(np.asarray(params, dtype=float)))
+        assert members.ndim == 1, 'Expected 1D arrays of members and params.'
+        assert np.all((0 <= members) & (members < self.num_members)), 'Member index out of range.'
+        assert np.all((0.0 <= params) & (params <= 1.0)), 'Parameters must be in range [0, 1].'
+        return members, params
+
+    def _write_members(self, members: np.ndarray, co: np.ndarray, handle_left: np.ndarray,
+                       handle_right: np.ndarray):
+        """Writes the spline points of the given members (contiguous arrays, in the same order) to their Blender
+        splines in bulk."""
+        splines = self.object.data.splines
+        counts = np.diff(self._point_starts)[members]
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        for member, i, j in zip(members.tolist(), offsets[:-1], offsets[1:]):
+            bpts = splines[member].bezier_points
+            bpts.foreach_set('co', co[i:j].ravel())
+            bpts.foreach_set('handle_left', handle_left[i:j].ravel())
+            bpts.foreach_set('handle_right', handle_right[i:j].ravel())
+        self.object.data.update_tag()
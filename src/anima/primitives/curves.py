@@ -1,7 +1,16 @@
+import math
+import numpy as np
+from scipy.spatial import cKDTree
 from .object import Object
 from .attachments import Attachment
-from anima.globals.general import Vector, reciprocal
+from .bezier_utils import (DEFAULT_INTERSECTION_TOL, INTERSECTION_PARAM_TOL, as_param_array, as_point_array,
+                           bezier_intersections, fill_degenerate_rows, normalise_rows)
+from .curve_geometry import offset_param, uniform_params
+from .deferred import DEFERRED_UPDATES, schedule_update, update_stats
+from anima.globals.general import SMALL_OFFSET, Vector, are_vectors_close, reciprocal
 from abc import abstractmethod
+from contextlib import contextmanager
+from typing import Any, Optional
 
 
 # Line widths
@@ -10,6 +19,10 @@ NORMAL_LINE_WIDTH = DEFAULT_LINE_WIDTH
 THIN_LINE_WIDTH = 0.5 * NORMAL_LINE_WIDTH
 THICK_LINE_WIDTH = 1.5 * NORMAL_LINE_WIDTH
 
+# Number of samples of the generic nearest point queries
+CLOSEST_SAMPLES = 257
+GOLDEN_SECTION_ITERATIONS = 40
+
 # Dash and gap lengths
 DEFAULT_DASH_LENGTH = 0.1
 DEFAULT_GAP_LENGTH = 0.02
@@ -24,6 +37,10 @@ class Curve(Object):
                  name: str = 'Curve', **kwargs):
         super().__init__(bl_object=bl_object, name=name, **kwargs)
 
+        self._pending_updates: set[str] = set()  # Deferred updates (see DEFERRED_UPDATES)
+        self._pending_params: dict[int, float] = {}  # Params set during a batch edit, keyed by end index
+        self._batch_depth = 0
+        self._revision = 0  # Incremented whenever a geometry or length update is requested
         self._width = width
         self._bias = bias
         self._param_0 = 0.0
@@ -37,11 +54,11 @@ class Curve(Object):
         self._update_length()
 
     def set_param_0(self, param: float):
-        self._set_param(param, 0)
+        self._set_or_defer_param(param, 0)
         return self
 
     def set_param_1(self, param: float):
-        self._set_param(param, 1)
+        self._set_or_defer_param(param, 1)
         return self
 
     def set_attachment_0(self, attmnt: type[Attachment]):
@@ -52,6 +69,29 @@ class Curve(Object):
         self._set_attachment(attmnt, 1)
         return self
 
+    def flush(self):
+        """Performs all pending (deferred) updates of the curve, in dependency order. Updates are otherwise
+        performed when a query needs them, or when flush_pending_updates() is called at the end of a frame."""
+        self._flush_updates(*DEFERRED_UPDATES)
+        return self
+
+    @contextmanager
+    def batch_edit(self):
+        """A context within which edits to the curve (handles, points, width, bias and params) are only recorded.
+        On exit, all resulting updates are performed once, in dependency order. Queries made within the context
+        still return up-to-date results.
+
+        Usage:
+            with curve.batch_edit():
+                curve.width = 0.05
+                curve.param_1 = 0.5
+        """
+        self._begin_batch()
+        try:
+            yield self
+        finally:
+            self._end_batch()
+
     def make_dashed(self, dash_len: float = DEFAULT_DASH_LENGTH, gap_len: float = DEFAULT_GAP_LENGTH,
                     offset: float = 0.0):
         """Instantiates and returns the dashed version of this curve. Note: DashedCurve hides this curve."""
@@ -94,6 +134,103 @@ class Curve(Object):
         norm = self.normal(t, normalise)
         return tang.cross(norm)
 
+    def points(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the points on the curve associated to an array of parameters. Returns an (N, 3) array.
+        Derived classes should override this with a vectorised implementation."""
+        assert is_len_fraction, f'Curve {self.name} only supports length-fraction parameters.'
+        return np.array([self.point(t) for t in as_param_array(params)], dtype=float).reshape(-1, 3)
+
+    def tangents(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the tangents of the curve associated to an array of parameters. Returns an (N, 3) array."""
+        assert is_len_fraction, f'Curve {self.name} only supports length-fraction parameters.'
+        return np.array([self.tangent(t, normalise) for t in as_param_array(params)],
+                        dtype=float).reshape(-1, 3)
+
+    def normals(self, params, normalise=False, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the normals of the curve associated to an array of parameters. Returns an (N, 3) array."""
+        assert is_len_fraction, f'Curve {self.name} only supports length-fraction parameters.'
+        return np.array([self.normal(t, normalise) for t in as_param_array(params)],
+                        dtype=float).reshape(-1, 3)
+
+    def frames(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Computes the points, unit tangents and unit normals of the curve associated to an array of
+        parameters. Each is returned as an (N, 3) array."""
+        pts = self.points(params, is_len_fraction)
+        tangs = normalise_rows(self.tangents(params, is_len_fraction=is_len_fraction))
+        norms = normalise_rows(self.normals(params, is_len_fraction=is_len_fraction))
+        return pts, tangs, norms
+
+    def frame_at(self, params, is_len_fraction: bool = True) -> tuple[np.ndarray, ...]:
+        """Computes the points, unit tangents, unit normals and unit binormals of the curve associated to an
+        array of parameters, in one evaluation. Each is returned as an (N, 3) array."""
+        pts, tangs, norms = self.frames(params, is_len_fraction)
+        return pts, tangs, norms, np.cross(tangs, norms)
+
+    def resample_uniform(self, n: int = None, spacing: float = None, include_tangents: bool = True):
+        """Samples points that are evenly spaced by arc length along the curve. If the curve is closed, the end
+        point is not repeated. Derived classes should override this with a single-pass implementation.
+        Args:
+            n: The number of points. Exactly one of n and spacing must be given.
+            spacing: The maximum arc length between consecutive points. It is reduced so that the points are
+                evenly spaced over the whole curve.
+            include_tangents: Whether to also return the unit tangents at the points.
+        Returns:
+            An (N, 3) array of points, and an (N, 3) array of unit tangents if include_tangents is True.
+        """
+        params = uniform_params(self._length, n, spacing, self.is_closed())
+        pts = self.points(params)
+        if not include_tangents:
+            return pts
+        return pts, normalise_rows(fill_degenerate_rows(self.tangents(params)))
+
+    def closest_param(self, points) -> np.ndarray:
+        """Finds the params (length fractions) of the points on the curve closest to the given query points.
+        Args:
+            points: An (N, 2|3) array of query points.
+        Returns:
+            An (N,) array of params.
+        """
+        return self._closest_params(points)[0]
+
+    def distance_to(self, points) -> np.ndarray:
+        """Computes the distances from the given query points to the curve.
+        Args:
+            points: An (N, 2|3) array of query points.
+        Returns:
+            An (N,) array of distances.
+        """
+        return self._closest_params(points)[1]
+
+    def intersect(self, other: 'Curve', tol: float = DEFAULT_INTERSECTION_TOL) -> tuple[np.ndarray, np.ndarray]:
+        """Finds the points where the curve crosses another one, using the Bezier curves of both.
+        Args:
+            other: Another curve.
+            tol: The distance below which the curves are considered to touch.
+        Returns:
+            The (N,) arrays of the params (length fractions) of the intersections on this curve and on the
+            other one, sorted along this curve.
+        """
+        assert other is not self, 'Self-intersections are not supported.'
+        indices_0, t_0, indices_1, t_1 = bezier_intersections(self._bezier_control_points(),
+                                                              other._bezier_control_points(), tol)
+        params_0 = self._params_from_bezier(indices_0, t_0)
+        params_1 = other._params_from_bezier(indices_1, t_1)
+
+        # Drop the intersections on the parts of the curves that are not visible, and those found twice where
+        # the Bezier curves of different parts meet.
+        valid = ~(np.isnan(params_0) | np.isnan(params_1))
+        params_0, params_1 = params_0[valid], params_1[valid]
+        order = np.lexsort((params_1, params_0))
+        params_0, params_1 = params_0[order], params_1[order]
+        keep = np.ones(len(params_0), dtype=bool)
+        tol = INTERSECTION_PARAM_TOL
+        keep[1:] = (np.diff(params_0) > tol) | (np.abs(np.diff(params_1)) > tol)
+        return params_0[keep], params_1[keep]
+
+    def is_closed(self) -> bool:
+        """Whether the start and end points of the curve coincide."""
+        return are_vectors_close(self.point(0), self.point(1))
+
     @abstractmethod
     def length(self, t: float = 1.0) -> float:
         """Computes the length along the curve up to the paramater t."""
@@ -101,6 +238,10 @@ class Curve(Object):
 
     def curvature(self, t: float) -> float:
         """Computes the curvature of the curve at the paramater t."""
+        return float(self.curvatures([t])[0])
+
+    def curvatures(self, params, is_len_fraction: bool = True) -> np.ndarray:
+        """Computes the curvatures of the curve associated to an array of parameters. Returns an (N,) array."""
         raise Exception(f'Cannot yet compute curvature for curve {self.name}.')
 
     # Property getters/setters ----------------------------------------------------------------------------- #
@@ -126,10 +267,32 @@ class Curve(Object):
         assert -1.0 <= b <= 1.0, 'The bias must be in the range [-1, 1].'
         self.set_bias(b)
 
+    @property
+    def _length(self) -> float:
+        """The curve's stored length. Any pending geometry/length updates are performed first."""
+        if self._pending_updates:
+            self._flush_updates('geometry', 'length')
+        return self._stored_length
+
+    @_length.setter
+    def _length(self, length: float):
+        self._stored_length = length
+
+    @property
+    def _length_inverse(self) -> float:
+        """The inverse of the curve's stored length. Any pending geometry/length updates are performed first."""
+        if self._pending_updates:
+            self._flush_updates('geometry', 'length')
+        return self._stored_length_inverse
+
+    @_length_inverse.setter
+    def _length_inverse(self, length_inverse: float):
+        self._stored_length_inverse = length_inverse
+
     @property
     def param_0(self) -> float:
         """Get the curve's param_0."""
-        return self._param_0
+        return self._pending_params.get(0, self._param_0)
 
     @param_0.setter
     def param_0(self, param: float):
@@ -139,7 +302,7 @@ class Curve(Object):
     @property
     def param_1(self) -> float:
         """Get the curve's param_1."""
-        return self._param_1
+        return self._pending_params.get(1, self._param_1)
 
     @param_1.setter
     def param_1(self, param: float):
@@ -166,23 +329,69 @@ class Curve(Object):
         """Set the curve's attachment_1."""
         self.set_attachment_1(attmnt)
 
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None):
+        """Create a deep copy of the curve. Pending updates are performed first, so that they are not shared."""
+        self.flush()
+        new_copy = super().__deepcopy__(memo)
+        new_copy._batch_depth = 0
+        return new_copy
+
     # Private methods -------------------------------------------------------------------------------------- #
 
+    def _defer_update(self, kind: str):
+        """Marks an update of the given kind (see DEFERRED_UPDATES) as pending, rather than performing it."""
+        update_stats.requested[kind] += 1
+        if kind in ('geometry', 'length'):
+            self._revision += 1
+        if not self._pending_updates:
+            schedule_update(self)
+        self._pending_updates.add(kind)
+
+    def _flush_updates(self, *kinds: str):
+        """Performs the given kinds of updates, if pending, in dependency order. Each update is unmarked before
+        it is performed, so that queries made during the update do not trigger it again."""
+        pending = self._pending_updates
+        for kind, method in DEFERRED_UPDATES.items():
+            if kind in kinds and kind in pending:
+                pending.discard(kind)
+                update_stats.performed[kind] += 1
+                getattr(self, method)()
+
     @abstractmethod
     def _set_param(self, param: float, end_idx: int):
         assert end_idx in {0, 1}, 'The end index must be either 0 or 1.'
         setattr(self, f'_param_{end_idx}', param)
         self._update_attachment(end_idx)
 
+    def _set_or_defer_param(self, param: float, end_idx: int):
+        if self._batch_depth > 0:
+            self._pending_params[end_idx] = param
+            self._defer_update('params')
+        else:
+            self._set_param(param, end_idx)
+
+    def _update_params(self):
+        pending_params, self._pending_params = self._pending_params, {}
+        for end_idx, param in sorted(pending_params.items()):
+            self._set_param(param, end_idx)
+
+    def _begin_batch(self):
+        self._batch_depth += 1
+
+    def _end_batch(self):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+
     def _set_both_params(self, param: float):
         self.set_param_0(param)
         self.set_param_1(param)
 
     def _update_param_0(self):
-        self.set_param_0(self._param_0)
+        self.set_param_0(self.param_0)
 
     def _update_param_1(self):
-        self.set_param_1(self._param_1)
+        self.set_param_1(self.param_1)
 
     def _set_attachment(self, attmnt: type[Attachment], end_idx: int):
         setattr(self, f'_attachment_{end_idx}', attmnt)
@@ -200,6 +409,33 @@ class Curve(Object):
     def _attachments(self):
         return [self._attachment_0, self._attachment_1]
 
+    def _place_endcap(self, end_idx: int):
+        """Places and orients the endcap (if any) attached at the given end of the curve, so that it continues
+        the curve from the point where the curve is terminated."""
+        from .endcaps import Endcap
+        attmt = getattr(self, f'_attachment_{end_idx}')
+        if not isinstance(attmt, Endcap):
+            return
+
+        param = getattr(self, f'_param_{end_idx}')
+        param_offs = self._compute_offset_param(param, end_idx)
+        pts, tangs, norms, binorms = self.frame_at([param, param_offs])
+        pt = Vector(pts[0])
+        y_dir = pt - Vector(pts[1])
+
+        # Set location, appearing above the curve.
+        pt.z += SMALL_OFFSET
+        bias_offs = -self._bias * 0.5 * self._width * Vector(norms[1])
+        attmt.location = pt + bias_offs
+
+        # Set orientation
+        sgn = 1 if end_idx == 1 else -1
+        if math.isclose(param, param_offs, rel_tol=1e-4):
+            y_dir = sgn * Vector(tangs[1])
+        x_dir = y_dir.cross(Vector(binorms[1]))
+
+        attmt.set_orientation(x_dir, y_dir)
+
     def _update_attachment_0(self):
         self._update_attachment(0)
 
@@ -222,17 +458,12 @@ class Curve(Object):
         return self._compute_end_offset(1, is_distance)
 
     def _compute_offset_param(self, param: float, end_idx: int) -> float:
-        # Compute end offsets.
+        # Compute end offsets. If the attachment is a joint, only need to apply offset at the ends.
+        from .joints import Joint
         attmt = getattr(self, f'_attachment_{end_idx}')
         offs_0 = self._compute_end_offset(0, is_distance=False)
         offs_1 = self._compute_end_offset(1, is_distance=False)
-
-        # If the attachment is a joint, only need to apply offset at the ends.
-        from .joints import Joint
-        if isinstance(attmt, Joint) and offs_0 < param < 1 - offs_1:
-            offs_0 = offs_1 = 0
-
-        return min(param + offs_0, 1.0 - offs_1) if end_idx == 0 else max(param - offs_1, offs_0)
+        return offset_param(param, end_idx, offs_0, offs_1, is_joint=isinstance(attmt, Joint))
 
     def _compute_offset_param_0(self, param: float) -> float:
         return self._compute_offset_param(param, 0)
@@ -240,6 +471,38 @@ class Curve(Object):
     def _compute_offset_param_1(self, param: float) -> float:
         return self._compute_offset_param(param, 1)
 
+    def _closest_params(self, points) -> tuple[np.ndarray, np.ndarray]:
+        """Computes the params of the closest points and the distances to them. The nearest of a fixed set of
+        samples is refined by a golden section search between its neighbouring samples. Derived classes should
+        override this with an indexed implementation."""
+        queries = as_point_array(points)
+        samples = np.linspace(0.0, 1.0, CLOSEST_SAMPLES)
+        _, idx = cKDTree(self.points(samples)).query(queries)
+        lo = samples[np.maximum(idx - 1, 0)]
+        hi = samples[np.minimum(idx + 1, CLOSEST_SAMPLES - 1)]
+
+        def dists(params):
+            return np.linalg.norm(self.points(params) - queries, axis=1)
+
+        ratio = 0.5 * (math.sqrt(5) - 1)
+        for _ in range(GOLDEN_SECTION_ITERATIONS):
+            mid_0 = hi - ratio * (hi - lo)
+            mid_1 = lo + ratio * (hi - lo)
+            left = dists(mid_0) < dists(mid_1)
+            hi = np.where(left, mid_1, hi)
+            lo = np.where(left, lo, mid_0)
+        params = 0.5 * (lo + hi)
+        return params, dists(params)
+
+    def _bezier_control_points(self) -> np.ndarray:
+        """Returns the (N, 4, 3) control points of the Bezier curves that make up the curve."""
+        raise Exception(f'Cannot yet compute intersections for curve {self.name}.')
+
+    def _params_from_bezier(self, bzr_indices: np.ndarray, bzr_params: np.ndarray) -> np.ndarray:
+        """Converts Bezier curve indices and params (see _bezier_control_points()) to length fractions. Points
+        which are not visible are mapped to NaN."""
+        raise Exception(f'Cannot yet compute intersections for curve {self.name}.')
+
     def _update_length(self):
         self._length = self.length()
         self._length_inverse = reciprocal(self._length)
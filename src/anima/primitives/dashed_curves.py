@@ -59,6 +59,36 @@ class DashedCurve(Curve):
     def normal(self, t: float, normalise=False) -> Vector:
         return self._base_curve.normal(t, normalise)
 
+    def points(self, params, is_len_fraction: bool = True):
+        return self._base_curve.points(params, is_len_fraction)
+
+    def tangents(self, params, normalise=False, is_len_fraction: bool = True):
+        return self._base_curve.tangents(params, normalise, is_len_fraction)
+
+    def normals(self, params, normalise=False, is_len_fraction: bool = True):
+        return self._base_curve.normals(params, normalise, is_len_fraction)
+
+    def frames(self, params, is_len_fraction: bool = True):
+        return self._base_curve.frames(params, is_len_fraction)
+
+    def curvatures(self, params, is_len_fraction: bool = True):
+        return self._base_curve.curvatures(params, is_len_fraction)
+
+    def frame_at(self, params, is_len_fraction: bool = True):
+        return self._base_curve.frame_at(params, is_len_fraction)
+
+    def resample_uniform(self, n: int = None, spacing: float = None, include_tangents: bool = True):
+        return self._base_curve.resample_uniform(n, spacing, include_tangents)
+
+    def _closest_params(self, points):
+        return self._base_curve._closest_params(points)
+
+    def _bezier_control_points(self):
+        return self._base_curve._bezier_control_points()
+
+    def _params_from_bezier(self, bzr_indices, bzr_params):
+        return self._base_curve._params_from_bezier(bzr_indices, bzr_params)
+
     def length(self, t: float = 1.0) -> float:
         return self._base_curve.length(t)
 
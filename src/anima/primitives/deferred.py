@@ -0,0 +1,76 @@
+"""
+Deferred geometry updates. Edits to curves only record which of their updates are pending, and the updates are
+performed when a query needs them, or when flush_pending_updates() is called. The Updater calls it at the end of
+each frame change, and registers it to run before rendering and saving. Outside of these, e.g. at the end of a
+script that builds a scene without an Updater, flush_pending_updates() must be called explicitly, otherwise
+pending joint geometry and bevel factors are not applied to Blender.
+
+Objects with pending updates are referenced strongly until they are flushed, so that their updates are not lost
+if the objects themselves are discarded before then.
+"""
+from collections import Counter
+
+# Kinds of deferred updates, in dependency order, and the methods that perform them.
+DEFERRED_UPDATES = {
+    'geometry': '_update_geometry',
+    'length': '_update_length',
+    'params': '_update_params',
+    'attachments': '_update_attachments',
+}
+
+_pending_objects: dict[int, object] = {}  # Objects with pending updates, keyed by id
+
+
+class UpdateStats:
+    """
+    Counts how many geometry updates were requested and how many were actually performed. Updates are
+    deferred until they are needed, so repeated edits between two queries only trigger a single update.
+
+    Usage:
+        update_stats.reset()
+        # ... edit curves ...
+        flush_pending_updates()
+        update_stats.print_stats()
+    """
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.requested = Counter()
+        self.performed = Counter()
+
+    def avoided(self, kind: str = None) -> int:
+        """The number of updates that were avoided, either of the given kind or in total."""
+        if kind is None:
+            return sum(self.requested.values()) - sum(self.performed.values())
+        return self.requested[kind] - self.performed[kind]
+
+    def reset(self):
+        """Reset all counters."""
+        self.requested.clear()
+        self.performed.clear()
+
+    def print_stats(self):
+        """Print the number of requested, performed and avoided updates of each kind."""
+        for kind in DEFERRED_UPDATES:
+            print(f'{kind}: {self.requested[kind]} requested, {self.performed[kind]} performed, '
+                  f'{self.avoided(kind)} avoided')
+
+
+# Single instance for global access
+update_stats = UpdateStats()
+
+
+def schedule_update(obj):
+    """Registers an object with pending updates, so that they are performed by flush_pending_updates()."""
+    _pending_objects[id(obj)] = obj
+
+
+def flush_pending_updates(*args):
+    """Performs the pending updates of all objects. This is called at the end of each frame change (see
+    Updater) and before rendering or saving, but can also be called explicitly. The arguments are ignored,
+    so that this can be used as a Blender handler."""
+    while _pending_objects:
+        objs = list(_pending_objects.values())
+        _pending_objects.clear()
+        for obj in objs:
+            obj.flush()
@@ -6,11 +6,12 @@ from .bezier_spline import BezierSpline
 from .points import Point
 from .attachments import Attachment
 from anima.primitives.mesh import Mesh
-from anima.globals.general import Vector, Euler, UnitZ, are_vectors_close
+from anima.globals.general import Vector, Matrix, UnitZ, are_vectors_close
 
 DEFAULT_FILLET_FACTOR = 0.0
 DEFAULT_RADIUS_FACTOR = 0.5
 DEFAULT_NUM_SUBDIV = 15
+JOINT_PLANE_TOL = 1e-6  # Length of the cross product of the tangents below which they are parallel
 
 
 class Joint(Attachment, Curve, Mesh):
@@ -68,6 +69,7 @@ class Joint(Attachment, Curve, Mesh):
         self._vertex_angles = []
         self._offset_distance = 0.0
         self._orientation = 1  # 1 if CW turn, else -1
+        self._up = UnitZ  # Normal of the plane of the joint
 
         # Set the joint type
         self._type = None
@@ -83,27 +85,52 @@ class Joint(Attachment, Curve, Mesh):
 
     def set_width(self, width: float):
         self._width = width
-        self._update_geometry()
+        self._defer_update('geometry')
         return self
 
     def set_bias(self, bias: float):
         self._bias = bias
-        self._update_geometry()
+        self._defer_update('geometry')
         return self
 
     def point(self, t: float) -> Vector:
-        return self._path.point(t)
+        return self._joint_path().point(t)
 
     def tangent(self, t: float, normalise=False) -> Vector:
-        return self._path.tangent(t, normalise)
+        return self._joint_path().tangent(t, normalise)
 
     def normal(self, t: float, normalise=False) -> Vector:
-        return self._path.normal(t, normalise)
+        return self._joint_path().normal(t, normalise)
+
+    def points(self, params, is_len_fraction: bool = True):
+        return self._joint_path().points(params, is_len_fraction)
+
+    def tangents(self, params, normalise=False, is_len_fraction: bool = True):
+        return self._joint_path().tangents(params, normalise, is_len_fraction)
+
+    def normals(self, params, normalise=False, is_len_fraction: bool = True):
+        return self._joint_path().normals(params, normalise, is_len_fraction)
+
+    def curvatures(self, params, is_len_fraction: bool = True):
+        return self._joint_path().curvatures(params, is_len_fraction)
+
+    def frame_at(self, params, is_len_fraction: bool = True):
+        return self._joint_path().frame_at(params, is_len_fraction)
 
     def length(self, u: float = 1.0) -> float:
-        return self._path.length(u)
+        return self._joint_path().length(u)
+
+    def _closest_params(self, points):
+        return self._joint_path()._closest_params(points)
+
+    def _bezier_control_points(self):
+        return self._joint_path()._bezier_control_points()
+
+    def _params_from_bezier(self, bzr_indices, bzr_params):
+        return self._joint_path()._params_from_bezier(bzr_indices, bzr_params)
 
     def offset_distance(self):
+        self._flush_updates('geometry')
         return self._offset_distance
 
     # Private methods -------------------------------------------------------------------------------------- #
@@ -142,12 +169,12 @@ class Joint(Attachment, Curve, Mesh):
             n_subdiv = self._num_subdiv
             angle = n1.angle(n2)
             delta = angle / n_subdiv
-            eul = Euler((0.0, 0.0, sgn * delta), 'XYZ')
+            rot = Matrix.Rotation(sgn * delta, 3, self._up)
             v = n2.copy()
 
             verts.extend([p1, p2, p3])
             for i in range(n_subdiv - 1):
-                v.rotate(eul)
+                v.rotate(rot)
                 p = c + r * v
                 verts.append(p)
             verts.extend([p5, p6])
@@ -192,6 +219,7 @@ class Joint(Attachment, Curve, Mesh):
         p7 = p1 + hw * n1
         p8 = p1 + hw * n2
         self._update_path([p7, p0, p8])
+        self._defer_update('length')
 
         # self.update_param_0()
         # self.update_param_1()
@@ -200,16 +228,19 @@ class Joint(Attachment, Curve, Mesh):
         curve_0 = self.connections[0]
         curve_1 = self.connections[1]
 
-        p0 = curve_0.point(1)  # End of curve 1
-        assert are_vectors_close(p0, curve_1.point(0)), \
-            f"The curves must coincide at the joint. {p0} --- {(p0 - curve_1.point(0)).magnitude:.3e}"
+        pts_0, tangs_0, _, binorms_0 = curve_0.frame_at([1.0])  # End of curve 1
+        pts_1, tangs_1, _, _ = curve_1.frame_at([0.0])
+        p0 = Vector(pts_0[0])
+        assert are_vectors_close(p0, Vector(pts_1[0])), \
+            f"The curves must coincide at the joint. {p0} --- {(p0 - Vector(pts_1[0])).magnitude:.3e}"
 
-        t0 = curve_0.tangent(1, normalise=True)
-        t1 = curve_1.tangent(0, normalise=True)
-        sgn = 1 if t0.cross(t1).dot(UnitZ) < 0 else -1
+        t0 = Vector(tangs_0[0])
+        t1 = Vector(tangs_1[0])
+        up = self._compute_up(t0, t1, Vector(binorms_0[0]))
+        sgn = 1 if t0.cross(t1).dot(up) < 0 else -1
 
-        n1 = sgn * UnitZ.cross(t0)
-        n2 = sgn * UnitZ.cross(t1)
+        n1 = sgn * up.cross(t0)
+        n2 = sgn * up.cross(t1)
         n3 = -(n1 + n2)
         denom = abs(n3.dot(n1))
         if not math.isclose(denom, 0):
@@ -219,6 +250,7 @@ class Joint(Attachment, Curve, Mesh):
 
         # Store orientation.
         self._orientation = sgn
+        self._up = up
 
         # Compute points 1 and 4.
         w0, w1 = self._compute_widths()
@@ -233,6 +265,16 @@ class Joint(Attachment, Curve, Mesh):
 
         return p0, c, r, p1, p4, n1, n2, n3
 
+    @staticmethod
+    def _compute_up(t0: Vector, t1: Vector, binormal: Vector) -> Vector:
+        """Computes the normal of the plane of the joint, which contains both unit tangents. If they are
+        parallel, the binormal of the first curve is used. Joints of curves in the xy-plane lie in that plane."""
+        axis = t0.cross(t1)
+        up = binormal
+        if axis.length > JOINT_PLANE_TOL:
+            up = axis.normalized() if axis.dot(binormal) >= 0 else -axis.normalized()
+        return UnitZ if are_vectors_close(up, UnitZ) else up
+
     def _compute_widths(self):
         w = self._width
         b = self._bias
@@ -242,13 +284,13 @@ class Joint(Attachment, Curve, Mesh):
             w0, w1 = w1, w0
         return w0, w1
 
+    def _joint_path(self) -> BezierSpline:
+        """The joint path, after performing any pending geometry update."""
+        self._flush_updates('geometry')
+        return self._path
+
     def _update_path(self, points):
-        path = self._path
-        pts = path._spline_points()
-        pts[0].co = points[0]
-        pts[1].co = points[1]
-        pts[2].co = points[2]
-        path._update_length()
+        self._path._set_spline_points(points)
 
     def _set_param(self, param: float, end_idx: int):
         super()._set_param(param, end_idx)
@@ -268,6 +310,7 @@ class Joint(Attachment, Curve, Mesh):
         if type not in [Joint.Type.MITER, Joint.Type.BEVEL, Joint.Type.ROUND]:
             raise Exception(f'Unsupported joint type: {type}')
 
+        self._flush_updates('geometry')
         verts_init = self._frame_points
         faces_init = self._frame_faces
 
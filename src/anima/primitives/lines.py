@@ -1,12 +1,15 @@
+from .analytic_geometry import PolylineGeometry
 from .curves import DEFAULT_LINE_WIDTH
 from .bezier_curve import BezierCurve
 from anima.globals.general import Vector, make_3d_vector
 
 
 class Segment(BezierCurve):
+    """A straight segment. Its length, points, tangents and params are computed in closed form (see
+    PolylineGeometry), as long as its handles are not moved."""
+
     def __init__(self, point_0, point_1, width=DEFAULT_LINE_WIDTH, bias=0.0, name='Segment', **kwargs):
-        super().__init__(point_0, point_1, width=width, bias=bias, name=name,
-                         num_lookup_pts=2, **kwargs)
+        super().__init__(point_0, point_1, width=width, bias=bias, name=name, **kwargs)
         # Place handles at 1/3rd and 2/3rd of the way between the points.
         # This makes the Bezier parameter equivalent to the length fraction parameter.
         p0 = Vector(point_0)
@@ -15,6 +18,9 @@ class Segment(BezierCurve):
         self.handle_0 = vect
         self.handle_1 = -vect
 
+    def _create_geometry(self, co, handle_left, handle_right, **kwargs) -> PolylineGeometry:
+        return PolylineGeometry(co, handle_left, handle_right, **kwargs)
+
 
 class Ray(Segment):
     def __init__(self, point, direction, width=DEFAULT_LINE_WIDTH, bias=0.0, name='Ray', **kwargs):
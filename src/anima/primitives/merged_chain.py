@@ -0,0 +1,144 @@
+import numpy as np
+from .bezier_spline import BezierSpline
+from .bezier_utils import as_spline_points, fill_degenerate_rows, normalise_rows
+from .curves import DEFAULT_LINE_WIDTH
+
+FILLET_RADIUS_FACTOR = 0.05  # Radius of the fillets of round joints, relative to the width
+MAX_FILLET_FRACTION = 0.25  # Maximum fraction of the chords of the adjacent Bezier curves taken up by a fillet
+JOINT_ANGLE_TOL = 1e-3  # Angle (in radians) between the tangents at a joint below which they are aligned
+JOINT_TYPES = ('ROUND', 'MITER')
+
+
+class MergedCurveChain(BezierSpline):
+    """A chain of curves merged into a single Blender spline, i.e. one curve object (and its bevel profile)
+    rather than an object and a profile per curve and a mesh and a hidden path per joint, as for a CurveChain.
+    This keeps the depsgraph and viewport responsive for chains of hundreds of curves. The chain has the param,
+    width, bias and attachment behaviour of a Bezier spline, whose length fractions span all curves.
+
+    Blender sweeps the profile of a spline through its corners with miter joints. Round joints are made by
+    replacing each corner by a small circular fillet, around which Blender sweeps the profile; its radius is a
+    small fraction of the width (see FILLET_RADIUS_FACTOR), so the curves are only shortened negligibly. The
+    fillets are part of the spline, so the joints are trimmed by the params along with the curves, and they are
+    rebuilt when the width changes. Bevel joints cannot be made this way.
+    """
+
+    def __init__(self, curves: list, width: float = DEFAULT_LINE_WIDTH, bias: float = 0.0, joint_type: str = 'ROUND',
+                 name: str = 'MergedCurveChain', **kwargs):
+        """Initialise a merged chain of the given curves.
+        Args:
+            curves: A list of consecutive curves, each of which is either a BezierSpline (whose geometry is copied,
+                and which is hidden), an (N, 2|3) array of spline points (whose handles are computed as Blender's
+                'AUTO' handles), or a tuple of the arrays of spline points and of their left and right handles.
+            width: The width of the chain.
+            bias: The bias of the chain.
+            joint_type: The type of the joints between curves, either 'ROUND' or 'MITER'.
+            name: The name of the chain object.
+            kwargs: Additional keyword arguments for the BezierSpline base class.
+        """
+        assert len(curves) > 0, 'A chain must contain at least 1 curve.'
+        joint_type = joint_type.upper()
+        if joint_type == 'BEVEL':
+            raise Exception(f'Cannot yet merge chains with bevel joints: {name}.')
+        assert joint_type in JOINT_TYPES, f'Unsupported joint type: {joint_type}'
+        self._joint_type = joint_type
+
+        # The spline points of the curves are kept, to rebuild the fillets when the width changes.
+        self._splines: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        for c in curves:
+            if isinstance(c, BezierSpline):
+                geom = c.geometry
+                self._splines.append((geom.co.copy(), geom.handle_left.copy(), geom.handle_right.copy()))
+                c.hide()
+            else:
+                self._splines.append(as_spline_points(c))
+        self._fillet_width = width  # Width for which the fillets were built
+        co, handle_left, handle_right = merge_splines(self._splines, self._fillet_radius(width))
+        super().__init__(co, width=width, bias=bias, name=name, handle_left=handle_left,
+                         handle_right=handle_right, **kwargs)
+
+    def set_width(self, width: float):
+        """Sets the width of the chain, and rebuilds the fillets of round joints, whose radius depends on it."""
+        if self._joint_type == 'ROUND' and width != self._fillet_width:
+            self._fillet_width = width
+            spline_pts = merge_splines(self._splines, self._fillet_radius(width))
+            self._geometry.set_points(*(a.astype(np.float32).astype(float) for a in spline_pts))  # As in Blender
+            self.sync_to_blender()
+
+            # The bevel factors of the params move with the spline params.
+            self._update_param_0()
+            self._update_param_1()
+        return super().set_width(width)
+
+    # Property getters/setters ----------------------------------------------------------------------------- #
+
+    @property
+    def joint_type(self) -> str:
+        """The type of the joints between curves, either 'ROUND' or 'MITER'."""
+        return self._joint_type
+
+    # Private methods -------------------------------------------------------------------------------------- #
+
+    def _fillet_radius(self, width: float) -> float:
+        """The radius of the fillets of the joints, which is 0 for miter joints."""
+        return FILLET_RADIUS_FACTOR * width if self._joint_type == 'ROUND' else 0.0
+
+
+def merge_splines(splines: list[tuple[np.ndarray, np.ndarray, np.ndarray]], fillet_radius: float = 0.0) \
+        -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merges consecutive splines into one. The end point of each spline must coincide with the start point of
+    the next one. At corners, i.e. where the tangents of consecutive splines differ, the splines are either
+    joined directly, or connected by a circular fillet (approximated by one Bezier curve) if a radius is given.
+    Args:
+        splines: A list of tuples of the (N, 3) arrays of spline points and of their left and right handles.
+        fillet_radius: The radius of the fillets, or 0 to join the splines directly. Fillets are made smaller
+            where they would take up too much of the adjacent Bezier curves (see MAX_FILLET_FRACTION).
+    Returns:
+        The (M, 3) arrays of spline points and of their left and right handles of the merged spline.
+    """
+    for (co_0, _, _), (co_1, _, _) in zip(splines, splines[1:]):
+        assert np.allclose(co_0[-1], co_1[0], rtol=0.0, atol=1e-6), \
+            'The end point of each curve must be the start point of the next one.'
+    co, handle_left, handle_right = (np.concatenate([s[i] for s in splines]) for i in range(3))
+    ends = np.cumsum([len(s[0]) for s in splines])[:-1] - 1  # Index of the end point of each spline but the last
+    if len(ends) == 0:
+        return co, handle_left, handle_right
+
+    # Unit tangents at the ends of the splines, falling back onto the other control points if handles collapse.
+    p_0, p_1 = co[ends], co[ends + 1]
+    tangs_0 = _end_tangents(p_0, handle_left[ends], handle_right[ends - 1], co[ends - 1])
+    tangs_1 = _end_tangents(p_1, handle_right[ends + 1], handle_left[ends + 2], co[ends + 2], sign=-1)
+    angles = np.arccos(np.clip(np.einsum('ij,ij->i', tangs_0, tangs_1), -1.0, 1.0))
+
+    # Fillets replace each end point by two points, at which the curves are cut, approximately, along their
+    # tangents. The fillets are cut short where the curves are short.
+    corner = (angles > JOINT_ANGLE_TOL) & (fillet_radius > 0)
+    chords = np.minimum(np.linalg.norm(p_0 - co[ends - 1], axis=1), np.linalg.norm(co[ends + 2] - p_1, axis=1))
+    cut_lens = np.minimum(fillet_radius * np.tan(0.5 * np.minimum(angles, np.pi - JOINT_ANGLE_TOL)),
+                          MAX_FILLET_FRACTION * chords)
+    radii = cut_lens / np.tan(0.5 * np.maximum(angles, JOINT_ANGLE_TOL))
+    handle_lens = (4 / 3 * np.tan(0.25 * angles) * radii)[:, None]
+    cuts_0, cuts_1 = cut_lens[:, None] * tangs_0, cut_lens[:, None] * tangs_1
+    co[ends[corner]] -= cuts_0[corner]
+    handle_left[ends[corner]] -= cuts_0[corner]
+    handle_right[ends[corner]] = co[ends[corner]] + (handle_lens * tangs_0)[corner]
+    co[ends[corner] + 1] += cuts_1[corner]
+    handle_right[ends[corner] + 1] += cuts_1[corner]
+    handle_left[ends[corner] + 1] = co[ends[corner] + 1] - (handle_lens * tangs_1)[corner]
+
+    # Elsewhere, the end point of each spline is merged with the start point of the next one.
+    handle_right[ends[~corner]] = handle_right[ends[~corner] + 1]
+    keep = np.ones(len(co), dtype=bool)
+    keep[ends[~corner] + 1] = False
+    return co[keep], handle_left[keep], handle_right[keep]
+
+
+def _end_tangents(pts: np.ndarray, handles: np.ndarray, far_handles: np.ndarray, far_pts: np.ndarray,
+                  sign: int = 1) -> np.ndarray:
+    """Computes the unit tangents at the ends of Bezier curves, pointing along the curves' direction. The
+    tangent is along the adjacent handle, or along the other control points if it collapses onto the end point.
+    """
+    tangs = sign * (pts - handles)
+    for other in (far_handles, far_pts):
+        degenerate = np.linalg.norm(tangs, axis=1) < 1e-12
+        tangs[degenerate] = sign * (pts - other)[degenerate]
+    return normalise_rows(fill_degenerate_rows(tangs))
@@ -7,6 +7,8 @@ from anima.globals.easybpy import apply_scale
 from anima.globals.general import Vector, Matrix, Euler, is_animable, add_object, \
     deepcopy_object, make_active, deselect_all, ebpy, outer_product
 
+ORTHOGONALITY_TOL = 1e-6  # Maximum dot product of unit axes considered orthogonal
+
 
 class Object(ABC):
     """
@@ -223,12 +225,12 @@ class Object(ABC):
         """
         x_axis = Vector(x_axis)
         y_axis = Vector(y_axis)
-        assert math.isclose(x_axis.dot(y_axis), 0), \
-            "X and Y axes are not orthogonal."
 
-        # Compute orthonormal basis
+        # Compute orthonormal basis. Axes computed in 3D are only orthogonal up to rounding.
         x_axis.normalize()
         y_axis.normalize()
+        assert math.isclose(x_axis.dot(y_axis), 0, abs_tol=ORTHOGONALITY_TOL), \
+            "X and Y axes are not orthogonal."
         z_axis = x_axis.cross(y_axis)
         z_axis.normalize()
 
@@ -0,0 +1,148 @@
+import numpy as np
+from anima.globals.general import Vector
+from .analytic_geometry import PolylineGeometry, polyline_spline_points
+from .bezier_spline import BezierSpline
+from .bezier_utils import as_point_array
+from .curves import DEFAULT_LINE_WIDTH
+
+
+class PolySpline(BezierSpline):
+    """A polyline, i.e. a chain of straight segments, backed by a single Blender POLY spline. Blender does not
+    subdivide its segments (whereas Bezier curves are subdivided resolution_u times each), and its arc length
+    queries are computed from the cumulative segment lengths (see PolylineGeometry). Closed polylines (polygons)
+    are cyclic splines. It supports the width, bias, param and attachment API of Bezier splines, but has no
+    handles.
+    """
+
+    def __init__(self, vertices: list[Vector | tuple] | np.ndarray, width: float = DEFAULT_LINE_WIDTH,
+                 bias: float = 0.0, closed: bool = False, name: str = 'PolySpline', **kwargs):
+        """Initialise a polyline with the given vertices.
+        Args:
+            vertices: A list of 2D or 3D points, or an (N, 2|3) array, defining the polyline.
+            width: The width of the polyline.
+            bias: The bias of the polyline.
+            closed: Whether the last vertex is connected to the first one, forming a polygon.
+            name: The name of the polyline object.
+            kwargs: Additional keyword arguments for the Curve base class.
+        """
+        vertices = as_point_array(vertices)
+        assert len(vertices) > (2 if closed else 1), \
+            f'A {"closed" if closed else "open"} polyline must contain at least {3 if closed else 2} vertices.'
+        self._closed = closed
+
+        # The geometry has a Bezier curve per segment, including the closing one.
+        if closed:
+            vertices = np.concatenate((vertices, vertices[:1]))
+        co, handle_left, handle_right = polyline_spline_points(vertices)
+        super().__init__(co, width=width, bias=bias, name=name, handle_left=handle_left,
+                         handle_right=handle_right, **kwargs)
+
+    def sync_to_blender(self):
+        """Writes the geometry's vertices to the underlying Blender spline, and moves the handles of the geometry
+        back onto the segments. This must be called after the geometry is edited directly, i.e. outside of
+        Blender."""
+        geom = self._geometry
+        vertices = self._blender_vertices(geom.co)
+        points = self._spline_points()
+        if len(vertices) < len(points):
+            points = self._replace_spline(len(vertices))
+        self._write_vertices(points, vertices)
+        geom.set_points(*polyline_spline_points(geom.co))
+        self.object.data.update_tag()
+        self._defer_update('length')
+        return self
+
+    def reverse(self):
+        """Reverses the order of the vertices, so that the start point becomes the end point."""
+        self._geometry.set_points(*polyline_spline_points(self.geometry.co[::-1]))
+        return self.sync_to_blender()
+
+    # Bezier geometry modifiers, which do not apply to poly splines ---------------------------------------- #
+
+    def set_left_handle(self, point_index: int, location, relative: bool = True):
+        raise Exception(f'Cannot set handles for poly spline {self.name}.')
+
+    def set_right_handle(self, point_index: int, location, relative: bool = True):
+        raise Exception(f'Cannot set handles for poly spline {self.name}.')
+
+    def set_left_handle_type(self, point_index: int, type: str):
+        raise Exception(f'Cannot set handle types for poly spline {self.name}.')
+
+    def set_right_handle_type(self, point_index: int, type: str):
+        raise Exception(f'Cannot set handle types for poly spline {self.name}.')
+
+    # Property getters/setters ----------------------------------------------------------------------------- #
+
+    @property
+    def closed(self) -> bool:
+        """Whether the polyline is closed, i.e. a polygon."""
+        return self._closed
+
+    # Private methods -------------------------------------------------------------------------------------- #
+
+    def _create_spline(self, curve_data, co: np.ndarray, handle_left: np.ndarray, handle_right: np.ndarray,
+                       type_values: list[int], adjust: bool) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        curve_data.resolution_u = 1
+        spline = curve_data.splines.new(type='POLY')
+        spline.use_cyclic_u = self._closed
+        self._write_vertices(spline.points, self._blender_vertices(co))
+        return co, handle_left, handle_right
+
+    def _create_geometry(self, co, handle_left, handle_right, **kwargs) -> PolylineGeometry:
+        return PolylineGeometry(co, handle_left, handle_right, **kwargs)
+
+    def _blender_vertices(self, co: np.ndarray) -> np.ndarray:
+        """The vertices of the Blender spline, which omits the closing vertex of polygons."""
+        return co[:-1] if self._closed else co
+
+    @staticmethod
+    def _write_vertices(points, vertices: np.ndarray):
+        """Writes the vertices to the points of the POLY spline in bulk, adding points if necessary."""
+        if len(vertices) > len(points):
+            points.add(count=len(vertices) - len(points))
+        points.foreach_set('co', np.column_stack((vertices, np.ones(len(vertices)))).ravel())
+
+    def _read_spline_points(self, bpts=None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Reads the vertices of the POLY spline in bulk, and computes the spline points of the geometry."""
+        points = self._spline_points() if bpts is None else bpts
+        co = np.empty(4 * len(points))
+        points.foreach_get('co', co)
+        vertices = co.reshape(-1, 4)[:, :3]
+        if self._closed:
+            vertices = np.concatenate((vertices, vertices[:1]))
+        return polyline_spline_points(vertices)
+
+    def _replace_spline(self, num_pts: int):
+        splines = self.object.data.splines
+        splines.remove(splines[0])
+        spline = splines.new(type='POLY')
+        spline.use_cyclic_u = self._closed
+        spline.points.add(count=num_pts - 1)
+        return spline.points
+
+    def _spline_points(self):
+        return self.object.data.splines[0].points
+
+    def _set_spline_points(self, points: list[Vector | tuple]):
+        """Moves all vertices to the given locations and updates the stored geometry."""
+        vertices = as_point_array(points)
+        spline_points = self._spline_points()
+        assert len(vertices) == len(spline_points), 'Expected a location for each vertex.'
+        if vertices[:, 2].any():
+            self.object.data.dimensions = '3D'
+        self._write_vertices(spline_points, vertices)
+
+        # Geometry changed, so update stored values.
+        self.sync_from_blender()
+
+    def _sync_point_from_blender(self, pt_index: int):
+        self.sync_from_blender()
+
+    def _get_handle(self, side: str, point_index: int, relative: bool = True) -> Vector:
+        raise Exception(f'Cannot get handles for poly spline {self.name}.')
+
+    def _set_handle(self, side: str, point_index: int, location, relative: bool = True):
+        raise Exception(f'Cannot set handles for poly spline {self.name}.')
+
+    def _set_handle_type(self, side: str, point_index: int, type: str):
+        raise Exception(f'Cannot set handle types for poly spline {self.name}.')
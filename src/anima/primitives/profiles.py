@@ -0,0 +1,93 @@
+"""
+Shared bevel profiles. The width of a curve is set by sweeping a line segment (its bevel profile) along it, and
+curves of the same width share one profile object, so that dashes, glyph segments and the curves of chains do
+not each add a profile to the scene. Profiles are reference counted, and removed once no curve uses them.
+"""
+import bpy
+import numpy as np
+from anima.globals.general import add_line_segment
+
+
+class ProfileCache:
+    """
+    Bevel profile objects keyed by width. Widths are compared in single precision, as Blender stores them.
+
+    Usage:
+        curve_data.bevel_mode = 'OBJECT'
+        curve_data.bevel_object = profile_cache.swap(curve_data.bevel_object, width)
+    """
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._profiles: dict[float, bpy.types.Object] = {}  # Profile objects, keyed by width
+        self._ref_counts: dict[int, int] = {}  # Number of users of each profile, keyed by its Blender pointer
+        self._widths: dict[int, float] = {}  # Width of each profile, keyed by its Blender pointer
+
+    def acquire(self, width: float) -> bpy.types.Object:
+        """Returns the profile of the given width, creating it if necessary, and adds a reference to it."""
+        key = float(np.float32(width))
+        profile = self._profiles.get(key)
+        if profile is None or not self._is_valid(profile):
+            self._purge()
+            hw = 0.5 * key
+            profile = add_line_segment('profile', (-hw, 0), (hw, 0))  # Centred about the origin
+            profile.hide_viewport = profile.hide_render = True
+            self._profiles[key] = profile
+            self._ref_counts[profile.as_pointer()] = 0
+            self._widths[profile.as_pointer()] = key
+        self._ref_counts[profile.as_pointer()] += 1
+        return profile
+
+    def release(self, profile: bpy.types.Object):
+        """Removes a reference to the given profile, which is deleted once it has no references left. Objects that
+        are not in the cache are ignored."""
+        if profile is None or not self._is_valid(profile):
+            return
+        ptr = profile.as_pointer()
+        if ptr not in self._ref_counts:
+            return
+        self._ref_counts[ptr] -= 1
+        if self._ref_counts[ptr] > 0:
+            return
+
+        del self._ref_counts[ptr]
+        del self._profiles[self._widths.pop(ptr)]
+        data = profile.data
+        bpy.data.objects.remove(profile, do_unlink=True)
+        bpy.data.curves.remove(data)
+
+    def swap(self, profile: bpy.types.Object, width: float) -> bpy.types.Object:
+        """Releases the given profile (if any) and acquires the one of the given width, which is returned."""
+        new_profile = self.acquire(width)
+        self.release(profile)
+        return new_profile
+
+    def ref_count(self, profile: bpy.types.Object) -> int:
+        """The number of references to the given profile."""
+        return self._ref_counts.get(profile.as_pointer(), 0)
+
+    def __len__(self) -> int:
+        """The number of profiles in the cache."""
+        return len(self._profiles)
+
+    def _purge(self):
+        """Forgets the profiles that were removed from Blender other than through the cache."""
+        for key, profile in list(self._profiles.items()):
+            if not self._is_valid(profile):
+                del self._profiles[key]
+        self._ref_counts = {ptr: n for ptr, n in self._ref_counts.items() if self._widths[ptr] in self._profiles}
+        self._widths = {ptr: w for ptr, w in self._widths.items() if w in self._profiles}
+
+    @staticmethod
+    def _is_valid(profile: bpy.types.Object) -> bool:
+        """Whether the profile object still exists, i.e. was not removed from Blender (e.g. by clearing the
+        scene)."""
+        try:
+            profile.name
+        except ReferenceError:
+            return False
+        return True
+
+
+# Single instance for global access
+profile_cache = ProfileCache()
@@ -0,0 +1,102 @@
+import math
+import pytest
+import numpy as np
+from anima.primitives.analytic_geometry import (AnalyticGeometry, EllipticalArcGeometry, PolylineGeometry,
+                                                elliptical_arc_control_points, polyline_spline_points)
+from anima.primitives.bezier_utils import spline_points_from_control_points
+from anima.primitives.curve_geometry import CurveGeometry
+
+
+def arc_geometries(*args) -> tuple[EllipticalArcGeometry, CurveGeometry]:
+    """Returns the analytic geometry of an elliptical arc, and the generic geometry of its Bezier spline."""
+    spline_pts = spline_points_from_control_points(elliptical_arc_control_points(*args))
+    return EllipticalArcGeometry(*spline_pts, *args), CurveGeometry(*spline_pts, lookup_tol=1e-9)
+
+
+class TestPolylineGeometry:
+    def setup_method(self):
+        self.geom = PolylineGeometry(*polyline_spline_points([(1.0, 1.0, 0.0), (4.0, 5.0, 0.0)]))
+
+    def test_closed_forms(self):
+        geom = self.geom
+        params = np.linspace(0, 1, 11)
+        assert geom.is_analytic
+        assert geom.length == 5.0
+        assert np.array_equal(geom.spline_params(params), params)
+        assert np.allclose(geom.points(params), (1, 1, 0) + params[:, None] * (3, 4, 0))
+        assert np.allclose(geom.tangents(params, normalise=True), (0.6, 0.8, 0))
+        assert np.allclose(geom.curvatures(params), 0)
+
+        # The lookup table is never built.
+        assert geom._arc_table is None
+
+    def test_edit(self):
+        # Moving a handle bends the segment, so the generic implementation takes over.
+        geom = self.geom
+        geom.set_point(0, handle_right=(3, 1, 0))
+        assert not geom.is_analytic
+        assert geom.length > 5.0
+        assert not np.allclose(geom.spline_params([0.5]), 0.5)
+
+    def test_polyline(self):
+        # Segments of lengths 3, 0 and 1.
+        vertices = np.array([(0, 0, 0), (3, 0, 0), (3, 0, 0), (3, 1, 0)], dtype=float)
+        geom = PolylineGeometry(*polyline_spline_points(vertices))
+        bezier = CurveGeometry(*polyline_spline_points(vertices), lookup_tol=1e-9)
+        params = np.linspace(0, 1, 41)
+        assert geom.is_analytic
+        assert geom.length == 4.0
+        assert np.allclose(geom.spline_params([0.0, 0.375, 0.75, 0.875, 1.0]), [0, 1 / 6, 2 / 3, 5 / 6, 1])
+        assert np.allclose(geom.points(params), bezier.points(params), atol=1e-6)
+        assert np.allclose(geom.len_fractions(geom.spline_params(params)), params)
+        assert np.allclose(geom.tangents([0.5, 0.9], normalise=True), [(1, 0, 0), (0, 1, 0)])
+
+    def test_incomplete_subclass(self):
+        # Subclasses must implement all the closed forms.
+        class SegmentGeometry(AnalyticGeometry):
+            def _matches_shape(self) -> bool:
+                return True
+
+        with pytest.raises(TypeError):
+            SegmentGeometry(*polyline_spline_points([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)]))
+
+
+class TestEllipticalArcGeometry:
+    @pytest.mark.parametrize('args', [((1, 2), 2.0, 2.0, 0.3, 4.0), ((0, 0), 3.0, 1.0, 0.0, 2 * math.pi),
+                                      ((0, 0, 1), 1.0, 2.5, 2.0, -1.0)])
+    def test_closed_forms(self, args):
+        # The closed forms match the Bezier approximation up to its error.
+        geom, bezier = arc_geometries(*args)
+        params = np.linspace(0, 1, 101)
+        assert geom.is_analytic
+        assert geom.num_curves == math.ceil(abs(args[4] - args[3]) / (math.pi / 4))
+        assert geom.length == pytest.approx(bezier.length, rel=1e-5)
+        assert np.allclose(geom.spline_params(params), bezier.spline_params(params), atol=1e-5)
+        assert np.allclose(geom.points(params), bezier.points(params), atol=2e-5)
+        assert np.allclose(geom.tangents(params, normalise=True), bezier.tangents(params, normalise=True), atol=2e-4)
+        assert np.allclose(geom.len_fractions(geom.spline_params(params)), params, atol=1e-12)
+        assert geom._arc_table is None
+
+    def test_circle(self):
+        geom, _ = arc_geometries((0, 0), 2.0, 2.0, 0.0, math.pi)
+        params = np.linspace(0, 1, 11)
+        angles = math.pi * params
+        assert geom.length == pytest.approx(2 * math.pi)
+        assert np.allclose(geom.points(params), np.stack((2 * np.cos(angles), 2 * np.sin(angles), 0 * angles), axis=1))
+        assert np.allclose(geom.curvatures(params), 0.5)
+
+        # Bezier params are mapped to angles exactly, so the Bezier points lie at the analytic angles.
+        pts = CurveGeometry.points(geom, params)
+        assert np.allclose(np.arctan2(pts[:, 1], pts[:, 0]) % (2 * math.pi), angles % (2 * math.pi), atol=1e-12)
+
+    def test_ellipse_length(self):
+        # Ramanujan's approximation is accurate to ~1e-10 for this eccentricity.
+        geom, _ = arc_geometries((0, 0), 3.0, 2.0, 0.0, 2 * math.pi)
+        h = (3 - 2)**2 / (3 + 2)**2
+        assert geom.length == pytest.approx(math.pi * 5 * (1 + 3 * h / (10 + math.sqrt(4 - 3 * h))), rel=1e-9)
+
+    def test_edit(self):
+        geom, _ = arc_geometries((0, 0), 1.0, 1.0, 0.0, math.pi)
+        geom.set_point(1, co=geom.co[1] * 1.1)
+        assert not geom.is_analytic
+        assert geom.length != pytest.approx(math.pi, rel=1e-4)
@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+from anima.primitives.arc_length import DEFAULT_LOOKUP_TOL, ArcLengthTable
+
+
+class TestArcLengthTable:
+    def setup_method(self):
+        rng = np.random.default_rng(3)
+        self.ctrl_pts = rng.uniform(-5, 5, size=(20, 4, 3))
+        self.ctrl_pts[:, :, 2] = 0.0
+        self.line = np.array([[[0, 0, 0], [1, 0, 0], [2, 0, 0], [3, 0, 0]]], dtype=float)
+
+    def test_tolerance(self):
+        for tol in (1e-3, 1e-5, 1e-7):
+            table = ArcLengthTable(self.ctrl_pts, tol)
+            s = np.linspace(0, table.length, 10001)
+            err = np.abs(table.s_from_u(table.u_from_s(s)) - s).max()
+            assert err < 2 * tol * table.length
+
+    def test_adaptive_size(self):
+        # The table should stay small for simple curves, and grow as the tolerance is tightened.
+        assert len(ArcLengthTable(self.line)) == 3
+        sizes = [len(ArcLengthTable(self.ctrl_pts, tol)) for tol in (1e-3, 1e-5, 1e-7)]
+        assert sizes[0] < sizes[1] < sizes[2]
+
+    def test_monotone_inverse(self):
+        table = ArcLengthTable(self.ctrl_pts)
+        u = table.u_from_s(np.linspace(0, table.length, 10001))
+        assert np.all(np.diff(u) >= 0)
+        assert u[0] == 0.0
+        assert u[-1] == 1.0
+
+    def test_spline_points(self):
+        # Spline points should be mapped exactly.
+        table = ArcLengthTable(self.ctrl_pts)
+        n = len(self.ctrl_pts)
+        u = np.arange(n + 1) / n
+        assert np.allclose(table.u_from_s(table.s_from_u(u)), u, atol=1e-12)
+        assert np.allclose(table.cumu_lengths, table.s_from_u(u[:-1]))
+
+    def test_scalar_query(self):
+        table = ArcLengthTable(self.ctrl_pts)
+        s = np.random.rand(20) * table.length
+        u = table.u_from_s(s)
+        for s_i, u_i in zip(s, u):
+            assert table.u_at(s_i) == pytest.approx(u_i, abs=1e-14)
+
+    def test_straight_line(self):
+        table = ArcLengthTable(self.line)
+        assert table.length == pytest.approx(3.0)
+        assert np.allclose(table.u_from_s([0.0, 0.75, 1.5, 3.0]), [0.0, 0.25, 0.5, 1.0])
+
+    def test_update_curves(self):
+        # Updating only the changed curves should agree with a full rebuild, up to the lookup tolerance.
+        table = ArcLengthTable(self.ctrl_pts.copy())
+        ctrl_pts = self.ctrl_pts.copy()
+        ctrl_pts[4, 1:] += (1.0, -2.0, 0.0)
+        ctrl_pts[5, 0] = ctrl_pts[4, 3]
+        ctrl_pts[12, 2] *= 2.0
+        table.update_curves(ctrl_pts, [4, 5, 12])
+
+        ref = ArcLengthTable(ctrl_pts)
+        assert table.length == pytest.approx(ref.length, rel=1e-12)
+        assert np.allclose(table.curve_lengths, ref.curve_lengths, rtol=1e-12)
+        assert np.allclose(table.cumu_lengths, ref.cumu_lengths, rtol=1e-12)
+        assert np.allclose(table.s_from_u(ref.spl_params), ref.len_params, rtol=1e-12)
+        s = np.linspace(0, ref.length, 10001)
+        assert np.abs(table.s_from_u(table.u_from_s(s)) - s).max() < 2 * DEFAULT_LOOKUP_TOL * ref.length
@@ -0,0 +1,59 @@
+import math
+import pytest
+import numpy as np
+from anima.primitives.arcs import Arc, EllipticalArc
+from anima.primitives.chains import CurveChain
+from anima.primitives.dashed_curves import DashedCurve
+from anima.primitives.lines import Segment
+from tests.test_utils import assert_vectors_equal
+
+
+class TestArc:
+    def setup_method(self):
+        self.arc = Arc((1, 0), 2.0, 0.0, math.pi / 2)
+        self.ellipse = EllipticalArc((0, 0), 3.0, 1.0)
+
+    def test_blender_spline(self):
+        bpts = self.arc.object.data.splines[0].bezier_points
+        assert len(bpts) == 3
+        assert self.arc.object.data.dimensions == '2D'
+        assert_vectors_equal(bpts[0].co, (3, 0, 0))
+        assert_vectors_equal(bpts[2].co, (1, 2, 0))
+        assert len(self.ellipse.object.data.splines[0].bezier_points) == 9
+        assert self.ellipse.is_closed()
+
+    def test_closed_forms(self):
+        arc = self.arc
+        assert arc.geometry.is_analytic
+        assert arc.length() == pytest.approx(math.pi)
+        assert_vectors_equal(arc.point(0.5), (1 + math.sqrt(2), math.sqrt(2), 0), 5)
+        assert np.allclose(arc.points([0.5]), (1 + math.sqrt(2), math.sqrt(2), 0))
+        assert np.allclose(arc.tangents([0.5], normalise=True), (-math.sqrt(0.5), math.sqrt(0.5), 0))
+        assert np.allclose(arc.curvatures([0.2, 0.8]), 0.5)
+        assert self.ellipse.length() == pytest.approx(13.364893220555259, rel=1e-12)
+
+    def test_bevel_factors(self):
+        # The bevel factors are the Bezier params at the analytic angles.
+        arc = self.arc
+        arc.set_param_1(1 / 3)
+        bevel_factor = arc.object.data.bevel_factor_end
+        assert bevel_factor == pytest.approx(arc.geometry.spline_param(1 / 3), abs=1e-7)
+        assert_vectors_equal(arc.point(1 / 3), (1 + math.sqrt(3), 1, 0), 5)
+
+    def test_edit(self):
+        # Editing the spline falls back onto the Bezier geometry.
+        arc = self.arc
+        arc.set_right_handle(0, (0, 2, 0))
+        assert not arc.geometry.is_analytic
+        assert arc.length() > math.pi
+
+    def test_chain(self):
+        seg = Segment((0, 0), (3, 0))
+        arc = Arc((4, 0), 1.0, math.pi, 1.5 * math.pi)
+        chain = CurveChain([seg, arc])
+        assert chain.length() == pytest.approx(3 + math.pi / 2)
+        assert np.allclose(chain.points([1.0]), (4, -1, 0))
+
+        dashed = DashedCurve(Arc((0, 0), 1.0, 0.0, math.pi))
+        assert dashed.length() == pytest.approx(math.pi)
+        assert np.allclose(dashed.points([0.5]), (0, 1, 0))
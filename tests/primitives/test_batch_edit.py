@@ -0,0 +1,42 @@
+import pytest
+from anima.primitives.chains import CurveChain
+from anima.primitives.deferred import flush_pending_updates, update_stats
+from anima.primitives.lines import Segment
+from tests.test_utils import assert_vectors_equal
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_batch_edit(self):
+        ref = CurveChain([Segment((0, 0), (1, 0)), Segment((1, 0), (1, 1)), Segment((1, 1), (2, 1))])
+        ref.set_width(0.05)
+        ref.set_param_0(0.2)
+        ref.set_param_1(0.7)
+        flush_pending_updates()
+        update_stats.reset()
+
+        # Edits within the context should only be recorded.
+        with self.chain.batch_edit():
+            for w in (0.01, 0.02, 0.03, 0.04, 0.05):
+                self.chain.set_width(w)
+            for t in (0.1, 0.3, 0.5, 0.7):
+                self.chain.param_1 = t
+            self.chain.param_0 = 0.2
+            assert self.chain.param_1 == 0.7
+            assert self.crv3.param_1 == 1.0
+            assert update_stats.performed['geometry'] == 0
+            assert update_stats.performed['params'] == 0
+
+        # On exit, each update should have been performed once, with the same result as the eager edits.
+        assert update_stats.performed['geometry'] == 2
+        assert update_stats.performed['params'] == 1
+        for c, c_ref in zip(self.chain._all_entities, ref._all_entities):
+            assert c.param_0 == pytest.approx(c_ref.param_0)
+            assert c.param_1 == pytest.approx(c_ref.param_1)
+            assert c.width == c_ref.width
+        assert_vectors_equal(self.chain.point(0.7), ref.point(0.7))
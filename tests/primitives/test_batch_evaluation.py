@@ -0,0 +1,68 @@
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.lines import Segment
+from tests.test_utils import assert_death, assert_vectors_equal
+
+
+class TestBezierSpline:
+    def setup_method(self):
+        self.spline1 = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        self.spline1.set_resolution(100)
+        self.spline1.set_left_handle(2, (-2.0, 0))
+
+    def test_batch_evaluation(self):
+        spline = self.spline1
+        params = np.concatenate(([0.0, 1.0], np.random.rand(50)))
+
+        # Batch queries should agree with the scalar queries.
+        pts = spline.points(params)
+        tangs = spline.tangents(params, normalise=True)
+        norms = spline.normals(params)
+        assert pts.shape == tangs.shape == norms.shape == (len(params), 3)
+        for i, t in enumerate(params):
+            assert_vectors_equal(pts[i], spline.point(t), places=5)
+            assert_vectors_equal(tangs[i], spline.tangent(t, normalise=True), places=4)
+            assert_vectors_equal(norms[i], spline.normal(t), places=4)
+
+        # Frames should consist of the points and unit tangents/normals.
+        f_pts, f_tangs, f_norms = spline.frames(params)
+        assert np.allclose(f_pts, pts)
+        assert np.allclose(f_tangs, tangs)
+        assert np.allclose(np.linalg.norm(f_norms, axis=1), 1.0)
+
+        # Raw Bezier parameters should map uniformly to the segments.
+        raw_pts = spline.points([0.0, 0.5, 1.0], is_len_fraction=False)
+        for i in range(3):
+            assert_vectors_equal(raw_pts[i], spline.spline_point(i).co, places=5)
+
+        # Death tests
+        assert_death(spline.points, [0.5, -0.1])
+        assert_death(spline.tangents, [1.1])
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_batch_evaluation(self):
+        chain = self.chain
+        params = np.concatenate(([0.0, 1.0], np.random.rand(50)))
+
+        pts = chain.points(params)
+        tangs = chain.tangents(params)
+        f_pts, f_tangs, f_norms = chain.frames(params)
+        for i, t in enumerate(params):
+            assert_vectors_equal(pts[i], chain.point(t), places=5)
+            assert_vectors_equal(tangs[i], chain.tangent(t), places=4)
+            assert_vectors_equal(f_norms[i], chain.normal(t, normalise=True), places=4)
+        assert np.allclose(f_pts, pts)
+
+        # Raw parameters should map uniformly to the curves, skipping joints.
+        raw_pts = chain.points([0.0, 1/3, 2/3, 1.0], is_len_fraction=False)
+        for i, crv in enumerate([self.crv1, self.crv2, self.crv3]):
+            assert_vectors_equal(raw_pts[i], crv.point(0), places=5)
+        assert_vectors_equal(raw_pts[3], self.crv3.point(1), places=5)
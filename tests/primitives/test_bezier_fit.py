@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+from anima.primitives.bezier_fit import fit_bezier_spline
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.curve_geometry import CurveGeometry
+
+
+class TestBezierFit:
+    def setup_method(self):
+        x = np.linspace(0, 10, 5000)
+        self.pts = np.stack([x, np.sin(x) * np.exp(-x / 5), np.zeros_like(x)], axis=1)
+
+    @pytest.mark.parametrize('tol', [1e-2, 1e-3, 1e-4])
+    def test_tolerance(self, tol):
+        co, handle_left, handle_right = fit_bezier_spline(self.pts, tol)
+        assert len(co) < len(self.pts) / 100
+        assert np.allclose(co[[0, -1]], self.pts[[0, -1]])
+
+        # All samples lie within the tolerance of the spline.
+        geom = CurveGeometry(co, handle_left, handle_right)
+        assert geom.closest_params(self.pts)[1].max() <= tol * (1 + 1e-6)
+
+    def test_continuity(self):
+        # The handles of the inner spline points are aligned, so the spline is G1 continuous.
+        co, handle_left, handle_right = fit_bezier_spline(self.pts, 1e-4)
+        left = handle_left[1:-1] - co[1:-1]
+        right = handle_right[1:-1] - co[1:-1]
+        cosines = np.einsum('ij,ij->i', left, right) / np.linalg.norm(left, axis=1) / np.linalg.norm(right, axis=1)
+        assert np.allclose(cosines, -1)
+
+    def test_3d(self):
+        t = np.linspace(0, 4 * np.pi, 1000)
+        pts = np.stack([np.cos(t), np.sin(t), t / 5], axis=1)
+        co, handle_left, handle_right = fit_bezier_spline(pts, 1e-4)
+        assert CurveGeometry(co, handle_left, handle_right, planar=False).closest_params(pts)[1].max() <= 1e-4
+
+    def test_few_points(self):
+        # Two points give a straight segment, and duplicates are ignored.
+        co, handle_left, handle_right = fit_bezier_spline([(0, 0), (0, 0), (3, 0)], 1e-3)
+        assert np.allclose(co, [(0, 0, 0), (3, 0, 0)])
+        assert np.allclose(handle_right[0], (1, 0, 0))
+        assert np.allclose(handle_left[1], (2, 0, 0))
+
+
+class TestBezierSplineFit:
+    def test_fit(self):
+        x = np.linspace(0, 5, 2000)
+        spline = BezierSpline.fit(np.stack([x, np.sin(x)], axis=1), tolerance=1e-3, width=0.05)
+        assert spline.compression_ratio > 100
+        assert len(spline.object.data.splines[0].bezier_points) == 2000 / spline.compression_ratio
+        assert spline.width == 0.05
+        assert spline.distance_to(np.stack([x, np.sin(x)], axis=1)).max() < 1.001e-3
@@ -0,0 +1,141 @@
+import pytest
+import numpy as np
+from anima.primitives.arc_length import sharing_stats
+from anima.primitives.bezier_spline import BezierSpline
+from tests.test_utils import assert_death, assert_vectors_equal
+
+
+class TestBezierSpline:
+    def setup_method(self):
+        self.spline1 = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        self.spline1.set_resolution(100)
+        self.spline1.set_left_handle(2, (-2.0, 0))
+
+        self.length2 = 6
+        self.spline2 = BezierSpline(
+            [(0, 0), (1, 0), (3, 0), (self.length2, 0)])
+
+    def test_control_point_cache(self):
+        spline = self.spline2
+
+        # Edits through Anima should invalidate the cached control points.
+        spline.set_left_handle(3, (-1.0, 1.0))
+        ctrl_pts = spline.geometry.ctrl_pts
+        assert ctrl_pts.shape == (3, 4, 3)
+        assert_vectors_equal(ctrl_pts[2, 2], (self.length2 - 1.0, 1.0, 0.0), places=6)
+        end_pt = spline.point(1.0)
+
+        # Edits made directly in Blender are only picked up after an explicit sync.
+        spline.spline_point(3).co = (self.length2, 1.0, 0.0)
+        assert_vectors_equal(spline.point(1.0), end_pt)
+        spline.sync_from_blender()
+        assert_vectors_equal(spline.point(1.0), (self.length2, 1.0, 0.0), places=6)
+
+    def test_u_from_s(self):
+        spline = self.spline1
+        lengths = np.linspace(0, spline.length(), 25)
+        spl_params = spline.u_from_s(lengths)
+        for l, u in zip(lengths, spl_params):
+            assert spline.length(u) == pytest.approx(l, abs=1e-4 * spline.length())
+
+        # A tighter tolerance should produce a more accurate inverse.
+        accurate = BezierSpline([(0, 0), (3, 1), (7, -1)], lookup_tol=1e-9)
+        accurate.set_left_handle(2, (-2.0, 0))
+        for l, u in zip(lengths, accurate.u_from_s(lengths)):
+            assert accurate.length(u) == pytest.approx(l, abs=1e-8 * accurate.length())
+
+        # Death tests
+        assert_death(spline.u_from_s, [-0.1])
+        assert_death(spline.u_from_s, [spline.length() + 0.1])
+
+    def test_incremental_length_update(self):
+        spline = BezierSpline([(i, (-1)**i) for i in range(10)])
+        builds = sharing_stats.builds
+
+        # Editing a handle should only update the lookup table of the adjacent Bezier curves. The first edit
+        # copies the shared table, and later ones update the copy in place.
+        spline.set_right_handle(4, (0.5, 1.0))
+        table = spline.geometry.arc_table
+        assert not table.is_shared
+        spline.set_left_handle(9, (-1.0, 0.0))
+        assert spline.geometry.arc_table is table
+        assert sharing_stats.builds == builds
+        length = spline.length()
+        points = spline.points(np.linspace(0, 1, 11))
+
+        spline.sync_from_blender()
+        assert spline.length() == pytest.approx(length, rel=1e-12)
+        assert np.allclose(spline.points(np.linspace(0, 1, 11)), points, atol=1e-12)
+
+    def test_sync_to_blender(self):
+        # Edits to the geometry should only be written to Blender on an explicit sync.
+        spline = self.spline2
+        spline.geometry.set_point(1, co=(1.0, 2.0, 0.0), handle_right=(1.5, 2.0, 0.0))
+        spline.sync_to_blender()
+        assert_vectors_equal(spline.spline_point(1).co, (1.0, 2.0, 0.0))
+
+        geom = spline.geometry
+        co, ctrl_pts = geom.co.copy(), geom.ctrl_pts.copy()
+        spline.sync_from_blender()
+        assert np.allclose(spline.geometry.co, co)
+        assert np.allclose(spline.geometry.ctrl_pts, ctrl_pts)
+        assert_vectors_equal(spline.point(1.0), co[-1], places=6)
+
+    def test_sync_to_blender_handle_types(self):
+        # Existing handle types should be kept, with Blender adjusting the handles that are not 'FREE'.
+        spline = BezierSpline([(0, 0), (1, 1), (2, 0), (3, 1)])
+        spline.set_both_handle_types(1, 'VECTOR')
+        spline.geometry.set_point(2, co=(2.0, -1.0, 0.0))
+        spline.sync_to_blender()
+        assert spline.spline_point(1).handle_left_type == 'VECTOR'
+        assert spline.spline_point(2).handle_left_type == 'AUTO'
+        hl, hr = spline._read_spline_points()[1:]
+        assert np.allclose(hl, spline.geometry.handle_left)
+        assert np.allclose(hr, spline.geometry.handle_right)
+
+        # A geometry with fewer points should replace the Blender spline.
+        spline.geometry.set_points(*(a[:2] for a in (spline.geometry.co, hl, hr)))
+        spline.sync_to_blender()
+        assert len(spline._spline_points()) == 2
+        assert_vectors_equal(spline.point(1.0), (1.0, 1.0, 0.0), places=6)
+
+    def test_from_arrays(self):
+        rng = np.random.default_rng(3)
+        co = rng.uniform(-1, 1, size=(40, 2))
+        spline = BezierSpline.from_arrays(co)
+        assert spline.geometry.num_points == 40
+        assert_vectors_equal(spline.spline_point(7).co, (*co[7], 0.0), places=6)
+
+        # The computed 'AUTO' handles should be identical to those computed by Blender.
+        bpts = spline._spline_points()
+        for i in (0, 11, 39):
+            bpts[i].handle_left_type = 'AUTO'
+        hl, hr = spline._read_spline_points()[1:]
+        assert np.array_equal(hl, spline.geometry.handle_left)
+        assert np.array_equal(hr, spline.geometry.handle_right)
+        assert bpts[5].handle_right_type == 'AUTO'
+
+        # Given handles should be written as they are, with the given handle types.
+        co3 = np.column_stack((co, np.zeros(40)))
+        spline = BezierSpline.from_arrays(co3, co3 - (0.1, 0, 0), co3 + (0.1, 0, 0))
+        assert_vectors_equal(spline.spline_point(3).handle_right, co3[3] + (0.1, 0, 0), places=6)
+        assert spline.spline_point(3).handle_right_type == 'FREE'
+        assert_vectors_equal(spline.point(1.0), co3[-1], places=6)
+        types = ['VECTOR', 'ALIGNED'] * 20
+        spline = BezierSpline.from_arrays(co3, co3, co3, handle_types=types)
+        assert [spline.spline_point(i).handle_left_type for i in range(2)] == types[:2]
+
+        # Handles that are not 'FREE' should be adjusted by Blender, and the geometry should follow.
+        for handle_type in ('VECTOR', 'AUTO'):
+            spline = BezierSpline.from_arrays(co3, co3 - (0.3, 0, 0), co3 + (0.3, 0, 0), handle_types=handle_type)
+            spline.set_right_handle(0, (0.1, 0.2))
+            hl, hr = spline._read_spline_points()[1:]
+            assert np.allclose(hl, spline.geometry.handle_left)
+            assert np.allclose(hr, spline.geometry.handle_right)
+        spline = BezierSpline.from_arrays(co, handle_types=['AUTO'] * 40)
+        assert np.allclose(spline._read_spline_points()[1], spline.geometry.handle_left)
+
+        # Death tests
+        assert_death(BezierSpline.from_arrays, co, co)
+        assert_death(BezierSpline.from_arrays, co, handle_types='FREE')
+        assert_death(BezierSpline.from_arrays, co[:1])
@@ -0,0 +1,91 @@
+import pytest
+import numpy as np
+from scipy import integrate
+from anima.primitives.bezier_utils import bezier_intersections, bezier_lengths, bezier_points, bezier_speeds
+
+
+def quad_length(ctrl_pts: np.ndarray, t_0: float = 0.0, t_1: float = 1.0) -> float:
+    """Reference arc length using adaptive quadrature (as previously used by BezierSpline)."""
+    def integrand(t):
+        return bezier_speeds(ctrl_pts[None], np.array([[t]]))[0, 0]
+    return integrate.quad(integrand, t_0, t_1, epsabs=1e-12, epsrel=1e-12, limit=200)[0]
+
+
+class TestBezierLengths:
+    def setup_method(self):
+        rng = np.random.default_rng(7)
+        self.ctrl_pts = rng.uniform(-5, 5, size=(50, 4, 3))
+        self.ctrl_pts[:, :, 2] = 0.0
+
+        # A curve with a cusp, for which the speed vanishes in the interior.
+        self.cusp = np.array([[[0, 0, 0], [2, 2, 0], [0, 2, 0], [2, 0, 0]]], dtype=float)
+
+    def test_full_lengths(self):
+        lengths = bezier_lengths(self.ctrl_pts)
+        for crv, l in zip(self.ctrl_pts, lengths):
+            assert l == pytest.approx(quad_length(crv), rel=1e-8)
+
+    def test_sub_interval_lengths(self):
+        rng = np.random.default_rng(11)
+        t = np.sort(rng.uniform(0, 1, size=(len(self.ctrl_pts), 2)), axis=1)
+        lengths = bezier_lengths(self.ctrl_pts, t[:, 0], t[:, 1])
+        for crv, (t_0, t_1), l in zip(self.ctrl_pts, t, lengths):
+            assert l == pytest.approx(quad_length(crv, t_0, t_1), rel=1e-8, abs=1e-12)
+
+    def test_adaptive_subdivision(self):
+        # A fixed-order rule alone is inaccurate near a cusp, but subdivision should recover the accuracy.
+        ref = quad_length(self.cusp[0])
+        coarse = bezier_lengths(self.cusp, tol=None)[0]
+        fine = bezier_lengths(self.cusp)[0]
+        assert abs(fine - ref) < abs(coarse - ref)
+        assert fine == pytest.approx(ref, rel=1e-8)
+
+    def test_straight_line(self):
+        ctrl_pts = np.array([[[0, 0, 0], [1, 0, 0], [2, 0, 0], [3, 0, 0]]], dtype=float)
+        assert bezier_lengths(ctrl_pts)[0] == pytest.approx(3.0, rel=1e-14)
+        assert bezier_lengths(ctrl_pts, 0.0, 0.5)[0] == pytest.approx(1.5, rel=1e-14)
+
+
+class TestBezierIntersections:
+    @staticmethod
+    def wiggly_curves(ys: np.ndarray) -> np.ndarray:
+        """Bezier curves whose x coordinates are linear in the params, with the given control point ys."""
+        xs = np.linspace(0, 10, len(ys))
+        pts = np.stack([xs, ys, np.zeros_like(xs)], axis=1)
+        return np.stack([pts[0:-1:3], pts[1::3], pts[2::3], pts[3::3]], axis=1)
+
+    def test_crossings(self):
+        x = np.linspace(0, 10, 301)
+        ctrl_0 = self.wiggly_curves(np.sin(3 * x))
+        ctrl_1 = self.wiggly_curves(np.cos(2.7 * x))
+        indices_0, t_0, indices_1, t_1 = bezier_intersections(ctrl_0, ctrl_1)
+        assert np.allclose(bezier_points(ctrl_0[indices_0], t_0), bezier_points(ctrl_1[indices_1], t_1),
+                           atol=1e-9)
+
+        # Both batches share the x coordinates, so the crossings are the sign changes of the differences of ys.
+        t = np.tile(np.linspace(0, 1, 1001)[:-1], len(ctrl_0))
+        indices = np.repeat(np.arange(len(ctrl_0)), 1000)
+        diffs = bezier_points(ctrl_0[indices], t)[:, 1] - bezier_points(ctrl_1[indices], t)[:, 1]
+        assert len(t_0) == np.count_nonzero(np.sign(diffs[1:]) != np.sign(diffs[:-1]))
+
+    def test_shared_end_points(self):
+        # Crossing at the common end point of two consecutive curves is reported once.
+        ctrl_0 = self.wiggly_curves(np.array([1, 1, 1, 0, -1, -1, -1], dtype=float))
+        ctrl_1 = self.wiggly_curves(np.zeros(4))
+        indices_0, t_0, indices_1, t_1 = bezier_intersections(ctrl_0, ctrl_1)
+        assert len(t_0) == 1
+        assert indices_0[0] + t_0[0] == pytest.approx(1.0)
+        assert t_1[0] == pytest.approx(0.5)
+
+    def test_tangential(self):
+        # The curves meet at a triple root, which should be reported once.
+        ctrl_0 = np.array([[[0, 0, 0], [1, 2, 0], [2, -2, 0], [3, 0, 0]]], dtype=float)
+        ctrl_1 = np.array([[[0, -1, 0], [1, 3, 0], [2, -3, 0], [3, 1, 0]]], dtype=float)
+        indices_0, t_0, indices_1, t_1 = bezier_intersections(ctrl_0, ctrl_1)
+        assert len(t_0) == 1
+        assert t_0[0] == pytest.approx(0.5, abs=1e-3)
+
+    def test_disjoint(self):
+        ctrl_0 = self.wiggly_curves(np.zeros(4))
+        ctrl_1 = self.wiggly_curves(np.ones(4))
+        assert all(len(a) == 0 for a in bezier_intersections(ctrl_0, ctrl_1))
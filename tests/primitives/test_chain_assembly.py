@@ -0,0 +1,39 @@
+import math
+import pytest
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.lines import Segment
+from anima.primitives.poly_spline import PolySpline
+from tests.test_utils import assert_vectors_equal
+
+
+class TestCurveChainAssembly:
+    def test_assemble(self):
+        # A square (with a reversed side and a small gap) and an open polyline, unordered.
+        square = [Segment((1, 0), (1, 1)), Segment((0, 0), (1, 0)), Segment((0, 1), (0, 0)),
+                  Segment((0, 1), (1, 1.0001))]
+        polyline = [Segment((5, 1), (6, 0)), PolySpline([(3, 0), (4, 1), (5, 1)])]
+        chains = CurveChain.assemble([square[0], polyline[0], square[1], square[3], polyline[1], square[2]],
+                                     tol=1e-3)
+        assert len(chains) == 2
+
+        open_chain, closed_chain = chains
+        assert open_chain._curves == polyline
+        assert open_chain.length() == pytest.approx(1 + 2 * math.sqrt(2))
+        assert not open_chain.is_closed()
+        assert_vectors_equal(open_chain.point(0.0), (6, 0, 0), 5)
+        assert_vectors_equal(polyline[1].point(1.0), (3, 0, 0), 5)
+
+        assert len(closed_chain._curves) == 4
+        assert closed_chain.length() == pytest.approx(4.0, abs=1e-3)
+        assert_vectors_equal(closed_chain.point(0.0), closed_chain.point(1.0), 5)
+        for crv_1, crv_2 in zip(closed_chain._curves, closed_chain._curves[1:]):
+            assert_vectors_equal(crv_1.point(1.0), crv_2.point(0.0), 6)
+        assert_vectors_equal(square[3].point(0.0), (1, 1, 0), 5)
+
+        # A reversed spline keeps its shape.
+        spline = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        points = spline.points([0.0, 0.3, 1.0])
+        spline.reverse()
+        assert np.allclose(spline.points([1.0, 0.7, 0.0]), points, atol=1e-5)
@@ -0,0 +1,40 @@
+import pytest
+import numpy as np
+from anima.primitives.chains import CurveChain
+from anima.primitives.deferred import flush_pending_updates, update_stats
+from anima.primitives.lines import Segment
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_incremental_length_update(self):
+        chain = self.chain
+        chain.length()
+        flush_pending_updates()
+        update_stats.reset()
+
+        # A width change only changes the joints (and their paths), so the lengths of the curves are not updated.
+        revisions = [c._revision for c in chain._curves]
+        chain.set_width(0.1)
+        cumu_lengths = chain._cumu_lengths
+        assert chain.length() == pytest.approx(3.0)
+        assert [c._revision for c in chain._curves] == revisions
+        assert update_stats.performed['length'] == 5  # The joints, their paths and the chain
+        assert not np.allclose(chain._cumu_lengths, cumu_lengths)
+
+        # A curve edit is picked up by the next update of the chain, which only reads that curve and its
+        # neighbours again, and agrees with a full update.
+        self.crv3.set_right_handle(1, (1.0, 0.0))
+        assert chain.length() == pytest.approx(3.0)
+        chain.set_bias(0.0)
+        assert chain.length() > 3.0
+        incremental = chain._cumu_lengths.copy(), chain._start_offsets.copy(), chain._length
+        chain._entity_revisions = None
+        chain._update_length()
+        assert np.allclose(chain._cumu_lengths, incremental[0]) and np.allclose(chain._start_offsets, incremental[1])
+        assert chain._length == pytest.approx(incremental[2])
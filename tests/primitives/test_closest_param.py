@@ -0,0 +1,46 @@
+import pytest
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.lines import Segment
+
+
+class TestBezierSpline:
+    def setup_method(self):
+        self.spline1 = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        self.spline1.set_resolution(100)
+        self.spline1.set_left_handle(2, (-2.0, 0))
+
+    def test_closest_param(self):
+        spline = self.spline1
+        params = np.linspace(0, 1, 7)
+        assert np.allclose(spline.closest_param(spline.points(params)), params, atol=1e-6)
+        assert np.allclose(spline.distance_to(spline.points(params)), 0, atol=1e-6)
+
+        # The index is rebuilt after edits.
+        query = [(0.5, 3, 0)]
+        dist = spline.distance_to(query)[0]
+        spline.set_right_handle(0, (0, 4, 0))
+        brute = np.linalg.norm(spline.points(np.linspace(0, 1, 20001)) - query, axis=1).min()
+        assert spline.distance_to(query)[0] < dist
+        assert spline.distance_to(query)[0] == pytest.approx(brute, abs=1e-4)
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_closest_param(self):
+        chain = self.chain
+        chain.set_width(0.05)
+        params = np.linspace(0, 1, 13)
+        pts = chain.points(params)
+        assert np.allclose(chain.closest_param(pts), params, atol=1e-5)
+        assert np.allclose(chain.distance_to(pts), 0, atol=1e-6)
+
+        # Queries off the plane of the chain.
+        queries = pts + np.array([0, 0, 0.5])
+        assert np.allclose(chain.distance_to(queries), 0.5, atol=1e-6)
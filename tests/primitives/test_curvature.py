@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.deferred import flush_pending_updates
+from anima.primitives.lines import Segment
+
+
+class TestBezierSpline:
+    def setup_method(self):
+        self.spline1 = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        self.spline1.set_resolution(100)
+        self.spline1.set_left_handle(2, (-2.0, 0))
+
+        self.length2 = 6
+        self.spline2 = BezierSpline(
+            [(0, 0), (1, 0), (3, 0), (self.length2, 0)])
+
+    def test_curvature(self):
+        assert self.spline2.curvature(0.5) == pytest.approx(0.0)
+        curvs = self.spline1.curvatures(np.linspace(0, 1, 11))
+        assert curvs.shape == (11,)
+        assert self.spline1.curvature(0.3) == pytest.approx(curvs[3])
+
+    def test_auto_resolution(self):
+        self.spline2.auto_resolution()
+        assert self.spline2.resolution == 1
+
+        spline = self.spline1
+        spline.auto_resolution(1e-3)
+        res = spline.resolution
+        assert 1 < res < 100
+        spline.auto_resolution(1e-4)
+        assert spline.resolution > res
+
+        # The resolution should follow geometry changes, until it is set explicitly.
+        spline.set_right_handle(1, (0.1, 0.0))
+        assert spline.resolution == spline.geometry.min_resolution(1e-4)
+        spline.set_resolution(12)
+        spline.set_right_handle(1, (3.0, 0.0))
+        flush_pending_updates()
+        assert spline.resolution == 12
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_curvature(self):
+        self.chain.set_width(0.05)
+        params = np.linspace(0, 1, 31)
+        curvs = self.chain.curvatures(params)
+        assert curvs.shape == (31,)
+        assert np.allclose(curvs[:5], 0.0)
+        assert self.chain.curvature(params[20]) == pytest.approx(curvs[20])
@@ -0,0 +1,197 @@
+import os
+import pickle
+import subprocess
+import sys
+import pytest
+import numpy as np
+from anima.primitives.arc_length import sharing_stats
+from anima.primitives.bezier_utils import auto_handles
+from anima.primitives.curve_geometry import CurveGeometry, locate_lengths, offset_param, uniform_params
+
+
+class TestCurveGeometry:
+    def setup_method(self):
+        rng = np.random.default_rng(5)
+        self.co = np.cumsum(rng.uniform(0, 1, size=(12, 3)), axis=0)
+        self.co[:, 2] = 0.0
+        self.handle_left = self.co - (0.3, 0.1, 0.0)
+        self.handle_right = self.co + (0.3, 0.1, 0.0)
+        self.geom = CurveGeometry(self.co, self.handle_left, self.handle_right)
+
+    def test_headless_import(self):
+        # The geometry must be usable without Blender.
+        code = 'import sys, anima.primitives.curve_geometry; assert "bpy" not in sys.modules'
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        subprocess.run([sys.executable, '-c', code], env=env, check=True)
+
+    def test_control_points(self):
+        geom = self.geom
+        assert geom.num_points == 12
+        assert geom.num_curves == 11
+        assert np.allclose(geom.ctrl_pts[3], [self.co[3], self.handle_right[3], self.handle_left[4], self.co[4]])
+
+        copy = CurveGeometry.from_control_points(geom.ctrl_pts)
+        assert np.allclose(copy.ctrl_pts, geom.ctrl_pts)
+        assert copy.length == pytest.approx(geom.length, rel=1e-12)
+
+    def test_evaluation(self):
+        geom = self.geom
+        assert np.allclose(geom.points([0.0, 1.0]), self.co[[0, -1]])
+        assert np.allclose(geom.points([6 / 11], is_len_fraction=False), self.co[6])
+        assert geom.length_at(6 / 11) == pytest.approx(geom.arc_table.cumu_lengths[6], rel=1e-12)
+
+        # Length fractions should map to the corresponding arc lengths.
+        params = np.linspace(0, 1, 21)
+        s = np.array([geom.length_at(u) for u in geom.spline_params(params)])
+        assert np.allclose(s, params * geom.length, atol=1e-4 * geom.length)
+
+        pts, tangs, norms = geom.frames(params)
+        assert np.allclose(pts, geom.points(params))
+        assert np.allclose(np.einsum('ij,ij->i', tangs, norms), 0.0)
+
+    def test_set_point(self):
+        geom = self.geom
+        geom.arc_table  # Build the table
+        assert not geom.is_stale
+        assert geom.set_point(4, co=(5.0, 1.0, 0.0)) == [3, 4]
+        assert geom.set_point(-1, handle_left=(0.0, 0.0, 0.0)) == [10]
+        assert geom.is_stale
+
+        ref = CurveGeometry(geom.co, geom.handle_left, geom.handle_right)
+        assert np.allclose(geom.ctrl_pts, ref.ctrl_pts)
+        assert geom.length == pytest.approx(ref.length, rel=1e-12)
+        assert not geom.is_stale
+
+    def test_shared_table(self):
+        # Geometries with the same control points share one immutable lookup table.
+        table = self.geom.arc_table
+        sharing_stats.reset()
+        geom = CurveGeometry(self.co, self.handle_left, self.handle_right)
+        assert geom.content_hash == self.geom.content_hash
+        assert geom.arc_table is table and table.is_shared
+        assert sharing_stats.shares == 1 and sharing_stats.saved_bytes == table.nbytes
+
+        # Editing one of them copies the table on write, leaving the other one unchanged.
+        length = self.geom.length
+        geom.set_point(3, handle_right=self.handle_right[3] + (1.0, 0.0, 0.0))
+        assert geom.content_hash != self.geom.content_hash
+        assert geom.length > length and self.geom.length == length
+        assert geom.arc_table is not table and self.geom.arc_table is table
+        assert sharing_stats.copies == 1
+
+    def test_pickle(self):
+        geom = pickle.loads(pickle.dumps(self.geom))
+        params = np.linspace(0, 1, 11)
+        assert np.allclose(geom.points(params), self.geom.points(params))
+
+    def test_offset_param(self):
+        assert offset_param(0.0, 0, 0.1, 0.2) == pytest.approx(0.1)
+        assert offset_param(1.0, 1, 0.1, 0.2) == pytest.approx(0.8)
+        assert offset_param(0.9, 0, 0.1, 0.2) == pytest.approx(0.8)
+        assert offset_param(0.5, 1, 0.1, 0.2, is_joint=True) == 0.5
+        assert offset_param(0.95, 1, 0.1, 0.2, is_joint=True) == pytest.approx(0.75)
+
+    def test_resample_uniform(self):
+        geom = self.geom
+        pts, tangs = geom.resample_uniform(n=25)
+        assert len(pts) == 25
+        assert np.allclose(pts[[0, -1]], self.co[[0, -1]])
+        assert np.allclose(np.linalg.norm(tangs, axis=1), 1.0)
+
+        # Consecutive points should be equally far apart along the spline.
+        s = [geom.length_at(u) for u in geom.spline_params(np.linspace(0, 1, 25))]
+        assert np.allclose(np.diff(s), geom.length / 24, atol=1e-4 * geom.length)
+        assert np.allclose(geom.resample_uniform(n=25, include_tangents=False), pts)
+
+        # A closed spline should not repeat its start point.
+        square = CurveGeometry([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 0)],
+                               [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 0)],
+                               [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 0)])
+        assert square.is_closed
+        pts = square.resample_uniform(spacing=0.5, include_tangents=False)
+        assert np.allclose(pts, [(0, 0, 0), (0.5, 0, 0), (1, 0, 0), (1, 0.5, 0),
+                                 (1, 1, 0), (0.5, 1, 0), (0, 1, 0), (0, 0.5, 0)])
+
+    def test_curvature(self):
+        # A Bezier approximation of a quarter circle should have (nearly) constant curvature.
+        r, k = 2.0, 0.5522847498
+        arc = CurveGeometry.from_control_points([[(r, 0, 0), (r, k * r, 0), (k * r, r, 0), (0, r, 0)]])
+        assert np.allclose(arc.curvatures(np.linspace(0, 1, 11)), 1 / r, rtol=0.03)
+
+        line = CurveGeometry.from_control_points([[(0, 0, 0), (1, 0, 0), (2, 0, 0), (3, 0, 0)]])
+        assert np.allclose(line.curvatures([0.0, 0.5, 1.0]), 0.0)
+
+    def test_min_resolution(self):
+        line = CurveGeometry.from_control_points([[(0, 0, 0), (1, 0, 0), (2, 0, 0), (3, 0, 0)]])
+        assert line.min_resolution(1e-3) == 1
+
+        # The chords of the tessellation should deviate from the curve by at most the tolerance.
+        geom = self.geom
+        for tol in (1e-2, 1e-3):
+            res = geom.min_resolution(tol)
+            u = np.linspace(0, 1, geom.num_curves * res + 1)
+            knots = geom.points(u, is_len_fraction=False)
+            mids = geom.points(0.5 * (u[1:] + u[:-1]), is_len_fraction=False)
+            assert np.linalg.norm(mids - 0.5 * (knots[1:] + knots[:-1]), axis=1).max() <= tol
+            assert geom.min_resolution(tol / 4) > res
+
+    def test_closest_params(self):
+        geom = self.geom
+        rng = np.random.default_rng(0)
+        queries = rng.uniform(-1, 8, (50, 3))
+        queries[:, 2] = 0
+        params, dists = geom.closest_params(queries)
+
+        # Compare against a dense brute force search.
+        samples = np.linspace(0, 1, 20001)
+        pts = geom.points(samples)
+        brute = np.linalg.norm(pts[None] - queries[:, None], axis=2).min(axis=1)
+        assert np.all(dists <= brute + 1e-9)
+        assert np.allclose(dists, brute, atol=1e-4)
+        assert np.allclose(np.linalg.norm(geom.points(params) - queries, axis=1), dists)
+
+        # Points on the curve are found at their own params.
+        params_on = np.linspace(0, 1, 9)
+        params, dists = geom.closest_params(geom.points(params_on))
+        assert np.allclose(params, params_on, atol=1e-6)
+        assert np.allclose(dists, 0, atol=1e-9)
+
+    def test_rotation_minimising_frames(self):
+        t = np.linspace(0, 4 * np.pi, 41)
+        params = np.linspace(0, 1, 2001)
+
+        # Along a helix, the normals are orthonormal to the tangents and do not twist about them.
+        co = np.stack([np.cos(t), np.sin(t), 0.2 * t], axis=1)
+        geom = CurveGeometry(co, *auto_handles(co), planar=False)
+        _, tangs, norms = geom.frames(params)
+        assert np.allclose(np.einsum('ij,ij->i', tangs, norms), 0)
+        assert np.allclose(np.linalg.norm(norms, axis=1), 1)
+        binorms = np.cross(tangs, norms)
+        twists = np.einsum('ij,ij->i', np.diff(norms, axis=0), binorms[:-1])
+        assert np.abs(twists).max() < 0.05 * np.abs(np.diff(norms, axis=0)).max()
+
+        # The normals of a spline lying in a plane stay in that plane.
+        co = np.stack([t, np.zeros_like(t), np.sin(t)], axis=1)
+        geom = CurveGeometry(co, co - (0.1, 0, 0), co + (0.1, 0, 0), planar=False)
+        assert np.allclose(geom.normals(params, normalise=True)[:, 1], 0)
+
+        # In the xy-plane, they match the in-plane normals.
+        co = self.co
+        geom = CurveGeometry(co, self.handle_left, self.handle_right, planar=False)
+        assert np.allclose(geom.normals(params, normalise=True), self.geom.normals(params, normalise=True))
+
+    def test_uniform_params(self):
+        assert np.allclose(uniform_params(1.0, n=3), [0.0, 0.5, 1.0])
+        assert np.allclose(uniform_params(1.0, n=4, closed=True), [0.0, 0.25, 0.5, 0.75])
+        assert np.allclose(uniform_params(1.0, spacing=0.3), np.linspace(0, 1, 5))
+        assert np.allclose(uniform_params(1.0, spacing=0.25), np.linspace(0, 1, 5))
+        with pytest.raises(AssertionError):
+            uniform_params(1.0)
+        with pytest.raises(AssertionError):
+            uniform_params(1.0, n=3, spacing=0.5)
+
+    def test_locate_lengths(self):
+        indices, params = locate_lengths(np.array([0.0, 0.5, 1.5, 3.0]), np.array([0.0, 1.0, 2.0]),
+                                         np.zeros(3), np.ones(3))
+        assert indices.tolist() == [0, 0, 1, 2]
+        assert np.allclose(params, [0.0, 0.5, 0.5, 1.0])
@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.bezier_utils import bezier_points
+from anima.primitives.curve_set import CurveSet
+from tests.test_utils import assert_death
+
+
+class TestCurveSet:
+    def setup_method(self):
+        self.members = [[(0, 0), (3, 1), (7, -1)], [(0, 2), (1, 2)], [(0, 0), (1, 1), (2, 0), (3, 1)]]
+        self.curve_set = CurveSet(self.members, width=0.1, bias=0.5)
+        self.splines = [BezierSpline(pts) for pts in self.members]
+
+    def test_blender_data(self):
+        data = self.curve_set.object.data
+        assert self.curve_set.num_members == 3
+        assert len(data.splines) == 3
+        assert [len(s.bezier_points) for s in data.splines] == [3, 2, 4]
+        assert data.dimensions == '2D'
+        assert data.bevel_object is not None
+        assert data.offset == pytest.approx(-0.025)
+
+        # Only one bevel profile is shared by all members.
+        self.curve_set.set_width(0.2)
+        assert self.curve_set.width == 0.2
+        assert data.offset == pytest.approx(-0.05)
+        assert len(data.bevel_object.data.splines[0].bezier_points) == 2
+        for spline, bl_spline in zip(self.splines, data.splines):
+            co = np.array([bpt.co for bpt in spline.object.data.splines[0].bezier_points])
+            assert np.allclose([bpt.co for bpt in bl_spline.bezier_points], co)
+
+    def test_queries(self):
+        curve_set = self.curve_set
+        lengths = [spline.length() for spline in self.splines]
+        assert np.allclose(curve_set.lengths(), lengths, rtol=1e-6)
+        assert curve_set.lengths([1])[0] == pytest.approx(1.0)
+
+        params = np.linspace(0, 1, 7)
+        for i, spline in enumerate(self.splines):
+            members = np.full(len(params), i)
+            assert np.allclose(curve_set.points(members, params), spline.points(params), atol=1e-4)
+            assert np.allclose(curve_set.tangents(members, params, normalise=True),
+                               spline.tangents(params, normalise=True), atol=1e-3)
+            spl_params = curve_set.spline_params(members, params)
+            assert np.allclose(spl_params, spline.geometry.spline_params(params), atol=1e-4)
+            assert np.allclose(curve_set.len_fractions(members, spl_params), params, atol=1e-4)
+
+        # Members and params are broadcast.
+        assert curve_set.points([0, 1, 2], 1.0).shape == (3, 3)
+        assert np.allclose(curve_set.points(1, [0.0, 0.5]), [(0, 2, 0), (0.5, 2, 0)])
+        assert_death(curve_set.points, 3, 0.5)
+        assert_death(curve_set.points, 0, 1.5)
+
+    def test_trim(self):
+        curve_set = self.curve_set
+        curve_set.trim(0.25, 0.75, members=[0, 1])
+        assert np.allclose(curve_set.params, [(0.25, 0.75), (0.25, 0.75), (0.0, 1.0)])
+
+        # The trimmed members keep their number of spline points, and span the trimmed portions.
+        data = curve_set.object.data
+        assert [len(s.bezier_points) for s in data.splines] == [3, 2, 4]
+        for i in range(2):
+            bpts = data.splines[i].bezier_points
+            ends = curve_set.points([i, i], [0.25, 0.75])
+            assert np.allclose([bpts[0].co, bpts[-1].co], ends, atol=1e-4)
+            co = np.array([bpt.co for bpt in bpts])
+            ctrl_pts = np.stack((co[:-1], [bpt.handle_right for bpt in bpts[:-1]],
+                                 [bpt.handle_left for bpt in bpts[1:]], co[1:]), axis=1)
+            samples = bezier_points(ctrl_pts.repeat(5, axis=0), np.tile(np.linspace(0, 1, 5), len(ctrl_pts)))
+            dists = np.linalg.norm(samples[:, None] - curve_set.points(np.full(201, i), np.linspace(0, 1, 201)),
+                                   axis=2)
+            assert dists.min(axis=1).max() < 0.05
+        assert np.allclose([bpt.co for bpt in data.splines[2].bezier_points],
+                           [(0, 0, 0), (1, 1, 0), (2, 0, 0), (3, 1, 0)])
+
+        # Trimming to a point collapses the member, and trimming to [0, 1] restores it.
+        curve_set.trim(0.5, 0.5, members=1)
+        assert np.allclose([bpt.co for bpt in data.splines[1].bezier_points], [(0.5, 2, 0)] * 2)
+        curve_set.trim()
+        for spline, bl_spline in zip(self.splines, data.splines):
+            co = np.array([bpt.co for bpt in spline.object.data.splines[0].bezier_points])
+            assert np.allclose([bpt.co for bpt in bl_spline.bezier_points], co, atol=1e-5)
+        assert_death(curve_set.trim, 0.6, 0.4)
+
+    def test_from_control_points(self):
+        ctrl_pts = np.array([[(0, 0), (1, 0), (2, 1), (3, 1)], [(3, 1), (4, 1), (5, 0), (6, 0)],
+                             [(0, 5), (1, 5), (2, 5), (3, 5)]], dtype=float)
+        curve_set = CurveSet.from_control_points(ctrl_pts, curve_counts=[2, 1], width=0.05)
+        assert [len(s.bezier_points) for s in curve_set.object.data.splines] == [3, 2]
+        assert curve_set.lengths()[1] == pytest.approx(3.0)
+        assert np.allclose(curve_set.points([0, 1], [0.5, 0.5]), [(3, 1, 0), (1.5, 5, 0)], atol=1e-4)
+
+        co = np.array([(0, 0), (1, 0), (0, 1), (1, 1), (2, 1)], dtype=float)
+        curve_set = CurveSet.from_arrays(co, co, co, point_counts=[2, 3])
+        assert np.allclose(curve_set.lengths(), [1.0, 2.0])
@@ -0,0 +1,45 @@
+import pytest
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.deferred import flush_pending_updates, update_stats
+from anima.primitives.lines import Segment
+
+
+class TestBezierSpline:
+    def test_deferred_updates(self):
+        spline = BezierSpline([(i, (-1)**i) for i in range(10)])
+        flush_pending_updates()
+        update_stats.reset()
+
+        # Handle edits should only mark the length as stale, and a query should update it once.
+        for i in range(10):
+            spline.set_both_handle_types(i, 'VECTOR')
+        assert update_stats.performed['length'] == 0
+        assert spline.length() == pytest.approx(9 * np.sqrt(5))
+        assert update_stats.performed['length'] == 1
+        assert update_stats.avoided('length') == 19
+
+        # Nothing should be left to do after the query.
+        flush_pending_updates()
+        assert update_stats.performed['length'] == 1
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_deferred_updates(self):
+        flush_pending_updates()
+        update_stats.reset()
+
+        # Repeated width changes should only update the joint geometries and chain length once.
+        for w in (0.01, 0.02, 0.03, 0.04, 0.05):
+            self.chain.set_width(w)
+        assert update_stats.performed['geometry'] == 0
+        assert self.chain.length() == pytest.approx(3.0)
+        assert update_stats.performed['geometry'] == 2
+        assert update_stats.avoided('geometry') == update_stats.requested['geometry'] - 2 >= 8
@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+from anima.globals.general import Vector
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.endcaps import ArrowEndcap
+from anima.primitives.lines import Segment
+from tests.test_utils import assert_vectors_equal
+
+
+class TestBezierSpline:
+    def setup_method(self):
+        self.spline1 = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        self.spline1.set_resolution(100)
+        self.spline1.set_left_handle(2, (-2.0, 0))
+
+    def test_frame_at(self):
+        spline = self.spline1
+        params = np.linspace(0, 1, 9)
+        pts, tangs, norms, binorms = spline.frame_at(params)
+        assert np.allclose(pts, spline.points(params))
+        assert np.allclose(tangs, spline.tangents(params, normalise=True))
+        assert np.allclose(norms, spline.normals(params, normalise=True))
+        assert np.allclose(binorms, [(0, 0, 1)] * len(params))
+
+        # Results are memoised until the geometry changes.
+        assert spline.frame_at(params)[0] is pts
+        spline.set_right_handle(0, (0, 4, 0))
+        assert not np.allclose(spline.frame_at(params)[1], tangs)
+
+    def test_3d(self):
+        t = np.linspace(0, 4 * np.pi, 21)
+        spline = BezierSpline(np.stack([np.cos(t), np.sin(t), 0.2 * t], axis=1))
+        assert spline.object.data.dimensions == '3D'
+        assert self.spline1.object.data.dimensions == '2D'
+
+        nm = spline.normal(0.5, normalise=True)
+        assert nm.length == pytest.approx(1.0)
+        assert nm.dot(spline.tangent(0.5, normalise=True)) == pytest.approx(0.0, abs=1e-6)
+
+        # Endcaps are placed on 3D splines.
+        spline.set_attachment_1(ArrowEndcap())
+        spline.param_1 = 0.7
+        assert_vectors_equal(spline._attachment_1.location, spline.point(0.7), places=3)
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_frame_at(self):
+        chain = self.chain
+        chain.set_width(0.05)
+        params = np.linspace(0, 1, 13)
+        pts, tangs, norms, binorms = chain.frame_at(params)
+        assert np.allclose(pts, chain.points(params))
+        assert np.allclose(tangs, chain.tangents(params, normalise=True))
+        assert np.allclose(np.cross(binorms, tangs), norms)
+
+    def test_3d(self):
+        chain = CurveChain([Segment((0, 0, 0), (1, 0, 1)), Segment((1, 0, 1), (1, 1, 2))], width=0.05)
+        joint = chain._joints[0]
+        up = joint._up
+        assert abs(up.dot(Vector((1, 1, -1)).normalized())) == pytest.approx(1.0)
+
+        # The joint lies in the plane of the tangents, through the end points of the curves.
+        for v in joint.object.data.vertices:
+            assert (v.co - Vector((1, 0, 1))).dot(up) == pytest.approx(0.0, abs=1e-6)
@@ -0,0 +1,40 @@
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.lines import Segment
+from tests.test_utils import assert_death
+
+
+class TestBezierSpline:
+    def setup_method(self):
+        self.spline1 = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        self.spline1.set_resolution(100)
+        self.spline1.set_left_handle(2, (-2.0, 0))
+
+        self.length2 = 6
+        self.spline2 = BezierSpline(
+            [(0, 0), (1, 0), (3, 0), (self.length2, 0)])
+
+    def test_intersect(self):
+        params_1, params_2 = self.spline1.intersect(self.spline2)
+        assert len(params_1) == 2
+        assert np.all(np.diff(params_1) > 0)
+        assert np.allclose(self.spline1.points(params_1), self.spline2.points(params_2), atol=1e-5)
+        assert_death(self.spline1.intersect, self.spline1)
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_intersect(self):
+        chain = self.chain
+        chain.set_width(0.05)
+        cross = BezierSpline([(0.5, -1), (1.5, 2)])
+        params_0, params_1 = chain.intersect(cross)
+        assert np.allclose(params_0, np.array([5/6, 3/2, 13/6]) / 3, atol=1e-6)
+        assert np.allclose(params_1, [1/3, 1/2, 2/3], atol=1e-6)
+        assert np.allclose(chain.points(params_0), cross.points(params_1), atol=1e-4)
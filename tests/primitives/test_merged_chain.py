@@ -0,0 +1,81 @@
+import math
+import pytest
+import numpy as np
+from anima.primitives.chains import CurveChain
+from anima.primitives.deferred import flush_pending_updates
+from anima.primitives.lines import Segment
+from anima.primitives.merged_chain import MergedCurveChain
+from tests.test_utils import assert_death, assert_vectors_equal
+
+
+class TestMergedCurveChain:
+    def setup_method(self):
+        self.segments = [Segment((0, 0), (1, 0)), Segment((1, 0), (1, 1)), Segment((1, 1), (2, 1))]
+        self.chain = CurveChain.merged(self.segments, width=0.1)
+
+    def test_blender_spline(self):
+        # A single spline, with a fillet at each corner.
+        data = self.chain.object.data
+        assert len(data.splines) == 1
+        assert len(data.splines[0].bezier_points) == 6
+        assert data.bevel_object is not None
+        assert all(s.object.hide_viewport and s.object.hide_render for s in self.segments)
+
+        # Miter joints merge the end points of the curves.
+        miter = MergedCurveChain([[(0, 0), (1, 0)], [(1, 0), (1, 1)], [(1, 1), (2, 1)]], joint_type='miter')
+        assert len(miter.object.data.splines[0].bezier_points) == 4
+        assert miter.length() == pytest.approx(3.0)
+        assert_death(MergedCurveChain, [[(0, 0), (1, 0)], [(2, 0), (3, 0)]])
+        assert_death(MergedCurveChain, [[(0, 0), (1, 0)]], joint_type='square')
+        with pytest.raises(Exception, match='Cannot yet merge'):
+            MergedCurveChain([[(0, 0), (1, 0)], [(1, 0), (1, 1)]], joint_type='bevel')
+
+    def test_geometry(self):
+        # The fillets shorten each corner by (2 - pi/2) times their radius.
+        chain = self.chain
+        radius = 0.05 * 0.1
+        assert chain.length() == pytest.approx(3.0 - 2 * (2 - math.pi / 2) * radius, abs=1e-5)
+        assert_vectors_equal(chain.point(0.5), (1, 0.5, 0), 4)
+        assert np.allclose(chain.tangents([0.25, 0.75], normalise=True), [(1, 0, 0), (1, 0, 0)], atol=1e-6)
+
+        # The tangent turns continuously around the corners.
+        tangs = chain.tangents(np.linspace(0.32, 0.35, 301), normalise=True)
+        assert np.einsum('ij,ij->i', tangs[1:], tangs[:-1]).min() > 0.9
+
+    def test_params_width_bias(self):
+        chain = self.chain
+        chain.set_param_0(0.2)
+        chain.set_param_1(0.5)
+        chain.set_width(0.2)
+        chain.set_bias(1.0)
+        flush_pending_updates()
+        data = chain.object.data
+        assert data.bevel_factor_start == pytest.approx(chain.geometry.spline_param(0.2), abs=1e-6)
+        assert data.bevel_factor_end == pytest.approx(chain.geometry.spline_param(0.5), abs=1e-6)
+        assert data.offset == pytest.approx(-0.1)
+
+    def test_width_change(self):
+        # The fillets are rebuilt for the new width, as if the chain had been created with it.
+        chain = self.chain
+        chain.set_width(0.4)
+        expected = MergedCurveChain([Segment(s.point(0), s.point(1)) for s in self.segments], width=0.4)
+        for a, b in zip((chain.geometry.co, chain.geometry.handle_left, chain.geometry.handle_right),
+                        (expected.geometry.co, expected.geometry.handle_left, expected.geometry.handle_right)):
+            assert np.allclose(a, b, atol=1e-6)
+        bpts = chain.object.data.splines[0].bezier_points
+        assert len(bpts) == 6
+        assert np.allclose([bpt.co for bpt in bpts], expected.geometry.co, atol=1e-6)
+        assert chain.length() == pytest.approx(3.0 - 2 * (2 - math.pi / 2) * 0.05 * 0.4, abs=1e-5)
+
+        # The bevel factors follow the rebuilt spline.
+        chain.set_param_1(0.5)
+        chain.set_width(0.1)
+        flush_pending_updates()
+        assert chain.object.data.bevel_factor_end == pytest.approx(chain.geometry.spline_param(0.5), abs=1e-6)
+        assert chain.length() == pytest.approx(3.0 - 2 * (2 - math.pi / 2) * 0.05 * 0.1, abs=1e-5)
+
+        # Miter joints do not depend on the width.
+        miter = MergedCurveChain([[(0, 0), (1, 0)], [(1, 0), (1, 1)]], joint_type='miter')
+        co = miter.geometry.co.copy()
+        miter.set_width(0.5)
+        assert np.array_equal(miter.geometry.co, co)
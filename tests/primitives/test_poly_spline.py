@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+from anima.primitives.endcaps import ArrowEndcap
+from anima.primitives.poly_spline import PolySpline
+from tests.test_utils import assert_vectors_equal
+
+
+class TestPolySpline:
+    def setup_method(self):
+        self.poly = PolySpline([(0, 0), (3, 0), (3, 4)], width=0.1)
+        self.polygon = PolySpline([(0, 0), (1, 0), (1, 1), (0, 1)], closed=True)
+
+    def test_blender_spline(self):
+        data = self.poly.object.data
+        assert data.splines[0].type == 'POLY'
+        assert data.resolution_u == 1
+        assert len(data.splines[0].points) == 3
+        assert data.bevel_object is not None
+        assert self.polygon.object.data.splines[0].use_cyclic_u
+        assert len(self.polygon.object.data.splines[0].points) == 4
+
+    def test_arc_length(self):
+        poly = self.poly
+        assert poly.geometry.is_analytic
+        assert poly.length() == 7.0
+        assert np.allclose(poly.points([0.0, 3 / 7, 0.5, 1.0]), [(0, 0, 0), (3, 0, 0), (3, 0.5, 0), (3, 4, 0)])
+        assert np.allclose(poly.tangents([0.2, 0.8], normalise=True), [(1, 0, 0), (0, 1, 0)])
+        assert self.polygon.length() == 4.0
+        assert self.polygon.is_closed()
+        assert np.allclose(self.polygon.points([0.875]), (0, 0.5, 0))
+
+    def test_params(self):
+        # Blender spreads the bevel factors uniformly over the segments.
+        poly = self.poly
+        poly.set_param_0(1.5 / 7)
+        poly.set_param_1(0.5)
+        assert poly.object.data.bevel_factor_start == pytest.approx(0.25)
+        assert poly.object.data.bevel_factor_end == pytest.approx(0.5625)
+
+    def test_width_bias_attachment(self):
+        poly = self.poly
+        poly.set_attachment_1(ArrowEndcap())
+        assert_vectors_equal(poly.attachment_1.object.location, (3, 4, 0), 3)
+        poly.set_width(0.2)
+        poly.set_bias(1.0)
+        assert poly.width == 0.2
+        assert poly.object.data.offset == pytest.approx(-0.1)
+        poly.flush()
+        assert_vectors_equal(poly.attachment_1.object.location, (3.1, 4, 0), 3)
+
+    def test_edit(self):
+        polygon = self.polygon
+        polygon._set_spline_points([(0, 0), (2, 0), (2, 2), (0, 2)])
+        assert polygon.length() == 8.0
+
+        # Poly splines have no handles.
+        for method, arg in ((polygon.set_left_handle, (1, 1)), (polygon.set_right_handle, (1, 1)),
+                            (polygon.set_left_handle_type, 'FREE'), (polygon.set_both_handle_types, 'AUTO')):
+            with pytest.raises(Exception, match='poly spline'):
+                method(0, arg)
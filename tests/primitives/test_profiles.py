@@ -0,0 +1,29 @@
+import pytest
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.dashed_curves import DashedCurve
+from anima.primitives.profiles import profile_cache
+
+
+class TestProfileCache:
+    def test_shared_profile(self):
+        # Curves of the same width, including the dashes of a dashed curve, share one bevel profile.
+        spline = BezierSpline([(0, 0), (1, 1), (2, 0)], width=0.123)
+        profile = spline.object.data.bevel_object
+        assert BezierSpline([(0, 1), (1, 1)], width=0.123).object.data.bevel_object == profile
+        dashed = DashedCurve(spline, width=0.123, dash_len=0.2, gap_len=0.1)
+        assert all(d.curve.object.data.bevel_object == profile for d in dashed._dashes)
+        num_refs = profile_cache.ref_count(profile)
+        assert num_refs > len(dashed._dashes)
+        pts = [bpt.co.x for bpt in profile.data.splines[0].bezier_points]
+        assert pts == pytest.approx([-0.0615, 0.0615])
+
+        # Changing the width swaps the profile, and releases the previous one.
+        num_profiles = len(profile_cache)
+        spline.set_width(0.321)
+        assert spline.object.data.bevel_object != profile
+        assert len(profile_cache) == num_profiles + 1
+        assert profile_cache.ref_count(profile) == num_refs - 1
+        assert [bpt.co.x for bpt in profile.data.splines[0].bezier_points] == pytest.approx([-0.0615, 0.0615])
+        spline.set_width(0.123)
+        assert spline.object.data.bevel_object == profile
+        assert len(profile_cache) == num_profiles
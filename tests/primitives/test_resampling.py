@@ -0,0 +1,56 @@
+import numpy as np
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.chains import CurveChain
+from anima.primitives.dashed_curves import DashedCurve
+from anima.primitives.lines import Segment
+from tests.test_utils import assert_death, assert_vectors_equal
+
+
+class TestBezierSpline:
+    def setup_method(self):
+        self.spline1 = BezierSpline([(0, 0), (3, 1), (7, -1)])
+        self.spline1.set_resolution(100)
+        self.spline1.set_left_handle(2, (-2.0, 0))
+
+        self.length2 = 6
+        self.spline2 = BezierSpline(
+            [(0, 0), (1, 0), (3, 0), (self.length2, 0)])
+
+    def test_resample_uniform(self):
+        pts, tangs = self.spline1.resample_uniform(n=11)
+        params = np.linspace(0, 1, 11)
+        assert np.allclose(pts, self.spline1.points(params), atol=1e-6)
+        assert np.allclose(tangs, self.spline1.tangents(params, normalise=True), atol=1e-6)
+
+        pts = self.spline2.resample_uniform(spacing=1.0, include_tangents=False)
+        assert np.allclose(pts[:, 0], np.arange(self.length2 + 1), atol=1e-4)
+
+        # Dashed curves are sampled along their base curve.
+        dashed = DashedCurve(self.spline2, dash_len=0.2, gap_len=0.1)
+        assert np.allclose(dashed.resample_uniform(spacing=1.0, include_tangents=False), pts)
+
+        # Death tests
+        assert_death(self.spline1.resample_uniform)
+        assert_death(self.spline1.resample_uniform, 5, 0.1)
+
+
+class TestCurveChain:
+    def setup_method(self):
+        self.crv1 = Segment((0, 0), (1, 0))
+        self.crv2 = Segment((1, 0), (1, 1))
+        self.crv3 = Segment((1, 1), (2, 1))
+        self.chain = CurveChain([self.crv1, self.crv2, self.crv3])
+
+    def test_resample_uniform(self):
+        chain = self.chain
+        chain.set_width(0.05)
+        pts, tangs = chain.resample_uniform(spacing=0.1)
+        assert len(pts) == 31
+        assert_vectors_equal(pts[0], chain.point(0))
+        assert_vectors_equal(pts[-1], chain.point(1))
+        assert np.allclose(pts, chain.points(np.linspace(0, 1, 31)))
+
+        # Tangents should be well-defined, including at the joints.
+        _, tangs = chain.resample_uniform(n=301)
+        assert np.all(np.isfinite(tangs))
+        assert np.allclose(np.linalg.norm(tangs, axis=1), 1.0)
@@ -0,0 +1,29 @@
+import pytest
+from anima.primitives.arc_length import sharing_stats
+from anima.primitives.bezier_spline import BezierSpline
+from anima.primitives.dashed_curves import DashedCurve
+
+
+class TestDashedCurve:
+    def test_shared_table(self, capsys):
+        # The dashes of a dashed curve are copies of the same spline, so they share its lookup table.
+        spline = BezierSpline([(0, 0), (1, 1), (2, 0)])
+        table = spline.geometry.arc_table
+        sharing_stats.reset()
+        dashed = DashedCurve(spline, dash_len=0.2, gap_len=0.1)
+        assert len(dashed._dashes) > 5
+        assert all(d.curve.geometry.arc_table is table for d in dashed._dashes)
+
+        # The savings are those of building the table once per dash.
+        num_dashes = len(dashed._dashes)
+        assert sharing_stats.builds == 0 and sharing_stats.shares == num_dashes
+        assert sharing_stats.saved_bytes == num_dashes * table.nbytes
+        assert table.build_time > 0.0
+        assert sharing_stats.saved_time == pytest.approx(num_dashes * table.build_time)
+        sharing_stats.print_stats()
+        assert f'0 built, {num_dashes} shared' in capsys.readouterr().out
+
+        # Editing a dash copies the table.
+        dash = dashed._dashes[0].curve
+        dash.set_right_handle(0, (0.5, 0.0))
+        assert dash.geometry.arc_table is not table and spline.geometry.arc_table is table